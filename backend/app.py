@@ -2,11 +2,28 @@
 """
 Flask app (backend) wiring for Career & Skills Advisor
 This keeps existing templates/static untouched to preserve design.
+
+``create_app(config)`` builds the app and loads everything read-only that
+requests need (career catalog and its compiled indexes, compiled templates,
+the precomputed advice corpus).
+Under ``gunicorn --preload`` (see gunicorn.conf.py) that happens once in the
+master and workers share it copy-on-write; ``reinit_after_fork()`` then
+recreates the per-process parts.
+
+For a fast cold start the Vertex AI SDK is imported on a thread once the
+first request arrives (``VERTEX_SDK_IMPORT=eager`` imports it in preload
+instead), and templates load from an on-disk bytecode cache
+(``JINJA_CACHE_DIR``, filled by build_assets.py).
 """
 import os
+import asyncio
+import json
+import random
 import sys
+import time
 from datetime import datetime
-from flask import Flask, render_template, request, session, redirect, url_for
+from jinja2 import FileSystemBytecodeCache
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify, Response, stream_with_context
 
 # Resolve project root
 CURRENT_DIR = os.path.dirname(__file__)
@@ -18,23 +35,36 @@ if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
 # Import domain logic from existing src
-from career_advisor import CareerAdvisor
+from career_advisor import ADVICE_POOL, ADVICE_TIMEOUT, CareerAdvisor
+from catalog import get_catalog, thaw
+from result_store import create_result_store
+from page_cache import PageCache
+from assets import AssetManifest
+from stage_metrics import StageMetrics, stage
+from request_profiler import RequestProfiler
+from vector_scoring import NUMPY_AVAILABLE
+from analysis_memo import analysis_memo, canonical_profile, profile_fingerprint
+from advice_cache import advice_cache
+from advice_corpus import ADVICE_CORPUS_PATH, advice_corpus
+import gcloud_ai
+import startup_timeline
+
+startup_timeline.mark('imports done')
+
+# Upper bound on profiles accepted by /api/assess/batch
+BATCH_MAX_PROFILES = int(os.environ.get('BATCH_MAX_PROFILES', '1000'))
+
+# Compiled templates persist here across restarts ('' disables the cache)
+JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR', os.path.join(PROJECT_ROOT, '.jinja_cache'))
 
-# App with template/static folders pointing to existing frontend assets
-app = Flask(
-    __name__,
-    template_folder=os.path.join(PROJECT_ROOT, 'templates'),
-    static_folder=os.path.join(PROJECT_ROOT, 'static'),
-    static_url_path='/static'
-)
-app.secret_key = os.environ.get('SECRET_KEY', 'career-advisor-secret-key-change-in-production')
 
 class WebCareerAdvisor(CareerAdvisor):
     """Web-compatible version of the CareerAdvisor"""
     def __init__(self):
         super().__init__()
-    
+
     def process_user_data(self, form_data):
+        """Process user data from web form"""
         self.user_profile = {
             "name": form_data.get('name', ''),
             "education": form_data.get('education', ''),
@@ -45,115 +75,430 @@ class WebCareerAdvisor(CareerAdvisor):
             "timeline": form_data.get('timeline', '')
         }
         return self.user_profile
-    
-    def get_analysis_results(self):
+
+    def get_analysis_results(self, career_suggestions=None):
+        """Get complete analysis results for web display
+
+        The advice depends only on the profile, so its model call starts
+        first and runs in the background while the analysis stages run
+        here; one ADVICE_TIMEOUT deadline, counted from the start, bounds
+        the whole request instead of following the analysis.
+        """
+        if not self.user_profile:
+            return None
+        deadline = time.monotonic() + ADVICE_TIMEOUT
+        started = self.start_advice()
+        results = self._build_results(career_suggestions, None)
+        with stage('advice'):
+            results['advice'] = self.finish_advice(started, deadline - time.monotonic())[0]
+        return results
+
+    def start_analysis(self, career_suggestions=None):
+        """Analysis results with the AI advice left pending, for the results page
+
+        Known or local advice is filled in at once. Otherwise the model call
+        keeps running in the background, ``advice`` is None and
+        ``advice_deadline`` (wall-clock, so any worker can honour it) tells
+        ``finish_analysis`` how long it may still wait.
+        """
+        if not self.user_profile:
+            return None
+        deadline = time.time() + ADVICE_TIMEOUT
+        started = self.start_advice()
+        results = self._build_results(career_suggestions, None)
+        _, advice, pending, remote = started
+        if advice[0] or not (pending or remote):
+            results['advice'] = self.finish_advice(started, 0)[0]
+        else:
+            results['advice_deadline'] = deadline
+        return results
+
+    def finish_analysis(self, results):
+        """``start_analysis`` results with the advice filled in
+
+        Only the generation ``start_analysis`` started is waited for, through
+        the advice cache (shared in this process, polled from L2 in others);
+        none is started here, so a reconnecting EventSource cannot trigger
+        another model call. If it failed, the advice is local.
+        """
+        self.user_profile = results['user_profile']
+        started = self.start_advice(submit=False)
+        with stage('advice'):
+            advice = self.finish_advice(started, results.get('advice_deadline', 0) - time.time())[0]
+        finished = {key: value for key, value in results.items() if key != 'advice_deadline'}
+        finished['advice'] = advice
+        return finished
+
+    async def start_analysis_async(self, career_suggestions=None):
+        """``start_analysis()`` for the async app"""
         if not self.user_profile:
             return None
-        strengths, growth_areas = self.analyze_profile()
-        career_suggestions = self.suggest_careers()
+        deadline = time.time() + ADVICE_TIMEOUT
+        started = await self.start_advice_async()
+        results = self._build_results(career_suggestions, None)
+        _, text, task, _ = started
+        if text or task is None:
+            results['advice'] = await self.finish_advice_async(started, 0)
+        else:
+            results['advice_deadline'] = deadline
+        return results
+
+    async def finish_analysis_async(self, results):
+        """``finish_analysis()`` for the async app"""
+        self.user_profile = results['user_profile']
+        started = await self.start_advice_async(submit=False)
+        with stage('advice'):
+            advice = await self.finish_advice_async(started, results.get('advice_deadline', 0) - time.time())
+        finished = {key: value for key, value in results.items() if key != 'advice_deadline'}
+        finished['advice'] = advice
+        return finished
+
+    async def get_analysis_results_async(self, career_suggestions=None):
+        if not self.user_profile:
+            return None
+        deadline = time.monotonic() + ADVICE_TIMEOUT
+        started = await self.start_advice_async()
+        results = self._build_results(career_suggestions, None)
+        with stage('advice'):
+            results['advice'] = await self.finish_advice_async(started, deadline - time.monotonic())
+        return results
+
+    def _build_results(self, career_suggestions, advice):
+        """Assemble the results dict around the advice (None while it is pending)"""
+        if career_suggestions is None and analysis_memo.enabled and self.career_data is self.catalog.data:
+            analysis = self._memoized_analysis()
+        else:
+            analysis = self._analyze(career_suggestions)
+        return {
+            'user_profile': self.user_profile,
+            **analysis,
+            'advice': advice,
+            'analysis_date': datetime.now().strftime('%B %d, %Y')
+        }
+
+    def _memoized_analysis(self):
+        """The analysis of the canonical profile, computed once per fingerprint"""
+        key = profile_fingerprint(self.user_profile)
+        version = self.catalog.version
+        analysis = analysis_memo.get(key, version)
+        if analysis is None:
+            profile = self.user_profile
+            self.user_profile = canonical_profile(profile)
+            try:
+                analysis = self._analyze(None)
+            finally:
+                self.user_profile = profile
+            analysis_memo.put(key, version, analysis)
+        return analysis
+
+    def _analyze(self, career_suggestions):
+        """Everything in the results that depends only on the profile"""
+        with stage('analyze'):
+            strengths, growth_areas = self.analyze_profile()
+        if career_suggestions is None:
+            with stage('score'):
+                career_suggestions = self.suggest_careers()
         all_skills = []
         for career in career_suggestions:
             all_skills.extend(career["skills"])
-        resources = self.recommend_resources(all_skills)
-        roadmap = self.create_roadmap(career_suggestions)
-        advice = self.generate_advice()
+        with stage('resources'):
+            resources = self.recommend_resources(all_skills)
+        with stage('roadmap'):
+            roadmap = self.create_roadmap(career_suggestions)
         return {
-            'user_profile': self.user_profile,
             'strengths': strengths,
             'growth_areas': growth_areas,
-            'career_suggestions': career_suggestions,
-            'recommended_skills': list(set(all_skills))[:8],
-            'resources': resources['recommended'][:6],
+            'career_suggestions': thaw(career_suggestions),
+            'recommended_skills': list(set(all_skills))[:8],  # Top 8 unique skills
+            'resources': resources['recommended'][:6],  # Top 6 resources
             'roadmap': roadmap,
-            'advice': advice,
-            'analysis_date': datetime.now().strftime('%B %d, %Y')
         }
 
-# Routes (identical to original app.py)
-@app.route('/')
-def index():
-    return render_template('index.html')
-
-@app.route('/assess', methods=['POST'])
-def assess():
-    advisor = WebCareerAdvisor()
-    user_data = advisor.process_user_data(request.form)
-    session['user_data'] = user_data
-    results = advisor.get_analysis_results()
-    if results:
-        session['results'] = results
-        return redirect(url_for('results'))
-    else:
-        return redirect(url_for('index', error='Please fill in all required fields'))
-
-@app.route('/results')
-def results():
-    if 'results' not in session:
+    def iter_batch_results(self, forms):
+        """Yield analysis results for many forms, scoring careers in one pass"""
+        profiles = [dict(self.process_user_data(form)) for form in forms]
+        # One deadline for the whole batch; advice generates while it is scored
+        deadline = time.monotonic() + ADVICE_TIMEOUT
+        started = self.start_advice(profiles)
+        with stage('score'):
+            suggestions = self.suggest_careers_batch(profiles)
+        with stage('advice'):
+            advice = self.finish_advice(started, deadline - time.monotonic())
+        for profile, career_suggestions, text in zip(profiles, suggestions, advice):
+            self.user_profile = profile
+            yield self._build_results(career_suggestions, text)
+
+    def batch_results_async(self, forms):
+        """One awaitable per form; their advice generations run concurrently."""
+        profiles = [dict(self.process_user_data(form)) for form in forms]
+        suggestions = self.suggest_careers_batch(profiles)
+        tasks = []
+        for profile, career_suggestions in zip(profiles, suggestions):
+            advisor = WebCareerAdvisor()
+            advisor.user_profile = profile
+            tasks.append(asyncio.ensure_future(advisor.get_analysis_results_async(career_suggestions)))
+        return tasks
+
+def store_advice(result_store, result_id, finished):
+    """Save ``finish_analysis`` results unless another request already did.
+
+    The first outcome stored (AI or local advice) is what every later read
+    of this submission gets; returns that advice.
+    """
+    current = result_store.get(result_id)
+    if current is not None and current['advice'] is not None:
+        return current['advice']
+    result_store.replace(result_id, finished)
+    return finished['advice']
+
+def parse_batch_payload(payload):
+    """Validate a batch request body; returns (forms, None) or (None, (error, status))."""
+    forms = payload.get('profiles') if isinstance(payload, dict) else payload
+    if not isinstance(forms, list) or not all(isinstance(form, dict) for form in forms):
+        return None, ('Expected a JSON array of profile objects', 400)
+    if len(forms) > BATCH_MAX_PROFILES:
+        return None, (f'At most {BATCH_MAX_PROFILES} profiles per request', 413)
+
+    # Coerce JSON values to form strings; lists (e.g. skills) become comma-separated
+    forms = [
+        {key: ', '.join(map(str, value)) if isinstance(value, list) else str(value)
+         for key, value in form.items() if value is not None}
+        for form in forms
+    ]
+    return forms, None
+
+def preload(app):
+    """Load read-only state before workers fork so they share its pages."""
+    catalog = get_catalog()
+    if NUMPY_AVAILABLE and os.environ.get('CAREER_SCORING_BACKEND') == 'numpy':
+        catalog.vector_scorer()
+    startup_timeline.mark('catalog loaded')
+    # Compile every template into the environment's cache
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+    startup_timeline.mark('templates compiled')
+    # Map the precomputed advice once; forked workers share the pages
+    advice_corpus.load(ADVICE_CORPUS_PATH)
+    startup_timeline.mark('advice corpus mapped')
+    if gcloud_ai.VERTEX_SDK_IMPORT == 'eager':
+        gcloud_ai.load_sdk()
+        startup_timeline.mark('vertex sdk imported')
+
+def reinit_after_fork():
+    """Recreate per-process state in a freshly forked worker.
+
+    gRPC channels and their threads do not survive fork, so Vertex AI
+    clients are dropped and rebuilt here; the random module is reseeded so
+    workers don't pick identical fallback advice.
+    """
+    startup_timeline.mark('worker forked')
+    random.seed()
+    gcloud_ai.reset_clients()
+    gcloud_ai.warmup()
+
+def _bytecode_cache():
+    if not JINJA_CACHE_DIR:
+        return None
+    try:
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+def create_app(config=None):
+    """Build the Flask app; ``config`` entries override the defaults."""
+    # App with template/static folders pointing to existing frontend assets
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(PROJECT_ROOT, 'templates'),
+        static_folder=os.path.join(PROJECT_ROOT, 'static'),
+        static_url_path='/static'
+    )
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'career-advisor-secret-key-change-in-production')
+    app.config['RESULT_STORE'] = None  # None: the RESULT_STORE environment variable
+    app.config.update(config or {})
+    bytecode_cache = _bytecode_cache()
+    if bytecode_cache is not None:
+        app.jinja_env.bytecode_cache = bytecode_cache
+
+    # Analysis results live server-side; the session cookie only holds their ID
+    result_store = create_result_store(app.config['RESULT_STORE'])
+    # Fingerprinted assets from build_assets.py (falls back to /static/ without a build)
+    assets = AssetManifest(app)
+    # Static content pages are rendered once and served with ETags
+    page_cache = PageCache(app)
+    # Per-stage latency histograms and Server-Timing headers (STAGE_METRICS=1)
+    stage_metrics = StageMetrics(app)
+    # Sampled cProfile dumps of live requests (PROFILE_REQUESTS=1 or /admin/profiler)
+    profiler = RequestProfiler(app)
+    app.extensions.update(
+        result_store=result_store,
+        assets=assets,
+        page_cache=page_cache,
+        stage_metrics=stage_metrics,
+        profiler=profiler,
+    )
+
+    first_response = []
+
+    @app.before_request
+    def on_first_request():
+        if not first_response:
+            # The server is accepting requests: bring in the heavy SDK now
+            gcloud_ai.load_sdk_in_background()
+
+    @app.after_request
+    def on_first_response(response):
+        if not first_response:
+            first_response.append(True)
+            startup_timeline.mark('first response')
+            startup_timeline.log_report()
+        return response
+
+    @app.route('/')
+    def index():
+        """Home page with career assessment form"""
+        return page_cache.render('index.html')
+
+    @app.route('/assess', methods=['POST'])
+    def assess():
+        """Process career assessment form"""
+        advisor = WebCareerAdvisor()
+        advisor.process_user_data(request.form)
+        # The advice streams in later from /results/advice
+        results = advisor.start_analysis()
+        if results:
+            # Store server-side; the session only carries the result ID
+            with stage('store'):
+                result_store.delete(session.get('result_id'))
+                session['result_id'] = result_store.put(results)
+            return redirect(url_for('results'))
+        else:
+            return redirect(url_for('index', error='Please fill in all required fields'))
+
+    @app.route('/api/assess/batch', methods=['POST'])
+    def assess_batch():
+        """JSON batch assessment: array of profiles in, analysis results out"""
+        forms, error = parse_batch_payload(request.get_json(silent=True))
+        if error:
+            message, status = error
+            return jsonify(error=message), status
+        results = WebCareerAdvisor().iter_batch_results(forms)
+
+        # Optional NDJSON streaming: one result per line as soon as it is ready
+        if request.args.get('stream') == '1' or 'application/x-ndjson' in request.headers.get('Accept', ''):
+            lines = (json.dumps(result) + '\n' for result in results)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+        return jsonify(results=list(results))
+
+    @app.route('/results')
+    def results():
+        """Display career assessment results"""
+        results = result_store.get(session.get('result_id'))
+        if results is None:
+            session.pop('result_id', None)
+            return redirect(url_for('index'))
+        with stage('render'):
+            return render_template('results.html', advice_fallback=random.choice(ADVICE_POOL), **results)
+
+    @app.route('/results/advice')
+    def results_advice():
+        """Server-sent event with the advice /results rendered as pending"""
+        result_id = session.get('result_id')
+        results = result_store.get(result_id)
+        if results is None:
+            # 204 tells EventSource not to reconnect
+            return ('', 204)
+
+        def events():
+            advice = results['advice']
+            if advice is None:
+                # Flush the headers now; the advice follows when it is ready
+                yield ': advice pending\n\n'
+                finished = WebCareerAdvisor().finish_analysis(results)
+                advice = store_advice(result_store, result_id, finished)
+            yield f"event: advice\ndata: {json.dumps({'advice': advice})}\n\n"
+
+        return Response(stream_with_context(events()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    @app.route('/about')
+    def about():
+        """About page"""
+        return page_cache.render('about.html')
+
+    @app.route('/clear')
+    def clear_session():
+        """Clear session and restart"""
+        result_store.delete(session.get('result_id'))
+        session.clear()
         return redirect(url_for('index'))
-    return render_template('results.html', **session['results'])
-
-@app.route('/about')
-def about():
-    return render_template('about.html')
-
-@app.route('/clear')
-def clear_session():
-    session.clear()
-    return redirect(url_for('index'))
-
-@app.errorhandler(404)
-def not_found(error):
-    return render_template('404.html'), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return render_template('500.html'), 500
-
-# Lightweight keep-alive/health endpoint (no design impact)
-@app.route('/_keepalive')
-def keepalive():
-    return ('', 204)
-
-# Career Pages
-@app.route('/careers/technology')
-def careers_tech():
-    return render_template('careers_tech.html')
-
-@app.route('/careers/business')
-def careers_business():
-    return render_template('careers_business.html')
-
-@app.route('/careers/design')
-def careers_design():
-    return render_template('careers_design.html')
-
-@app.route('/careers/security')
-def careers_security():
-    return render_template('careers_security.html')
-
-# Resources Pages
-@app.route('/resources/learning')
-def learning_resources():
-    return render_template('learning_resources.html')
-
-@app.route('/resources/skills')
-def skill_guides():
-    return render_template('skill_guides.html')
-
-@app.route('/resources/tips')
-def career_tips():
-    return render_template('career_tips.html')
-
-# Additional Pages
-@app.route('/blog')
-def blog():
-    return render_template('blog.html')
-
-@app.route('/contact')
-def contact():
-    return render_template('contact.html')
-
-# Expose app for WSGI
+
+    @app.errorhandler(404)
+    def not_found(error):
+        return render_template('404.html'), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return render_template('500.html'), 500
+
+    # Lightweight keep-alive/health endpoint (no design impact)
+    @app.route('/_keepalive')
+    def keepalive():
+        return ('', 204)
+
+    # AI circuit-breaker state, recent transitions and batching counters
+    @app.route('/api/ai/metrics')
+    def ai_metrics():
+        """Vertex AI breaker and micro-batching metrics"""
+        return jsonify(gcloud_ai.ai_metrics())
+
+    # Hit/miss counters of the analysis memo, the advice cache and corpus
+    @app.route('/api/cache/metrics')
+    def cache_metrics():
+        """Analysis memo, advice cache and advice corpus sizes and hit ratios"""
+        return jsonify(analysis=analysis_memo.stats(), advice=advice_cache.stats(),
+                       advice_corpus=advice_corpus.stats())
+
+    @app.route('/api/startup')
+    def startup():
+        """Milestones since process start and the Vertex AI SDK import state"""
+        return jsonify(timeline=startup_timeline.report(), vertex_sdk=gcloud_ai._sdk_state)
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus histograms of stage and request latency (STAGE_METRICS=1)"""
+        return stage_metrics.response()
+
+    @app.route('/admin/profiler', methods=['GET', 'POST'])
+    def profiler_admin():
+        """Show or change request profiling settings (PROFILER_TOKEN bearer token)"""
+        return profiler.admin()
+
+    # Career Pages
+    static_pages = {
+        '/careers/technology': ('careers_tech', 'careers_tech.html'),
+        '/careers/business': ('careers_business', 'careers_business.html'),
+        '/careers/design': ('careers_design', 'careers_design.html'),
+        '/careers/security': ('careers_security', 'careers_security.html'),
+        # Resources Pages
+        '/resources/learning': ('learning_resources', 'learning_resources.html'),
+        '/resources/skills': ('skill_guides', 'skill_guides.html'),
+        '/resources/tips': ('career_tips', 'career_tips.html'),
+        # Additional Pages
+        '/blog': ('blog', 'blog.html'),
+        '/contact': ('contact', 'contact.html'),
+    }
+    for rule, (endpoint, template) in static_pages.items():
+        app.add_url_rule(rule, endpoint, lambda template=template: page_cache.render(template))
+
+    preload(app)
+    startup_timeline.mark('app ready')
+    return app
+
+# Module-level app for WSGI servers (backend.wsgi:app) and the ASGI wrapper
+app = create_app()
+
 if __name__ == '__main__':
     print('Starting backend app...')
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+ASGI entrypoint for servers importing the app as backend.asgi:app
+
+    uvicorn backend.asgi:app --workers 2
+
+The routes that wait on Vertex AI, ``POST /assess``, ``GET /results/advice``
+and ``POST /api/assess/batch``, are served natively on the event loop: a
+request waiting for advice is a suspended coroutine, not a blocked thread, and
+``gcloud_ai.VERTEX_MAX_CONCURRENCY`` caps the outbound calls. Every other
+route is the unchanged Flask app behind asgiref's WSGI adapter.
+
+The session cookie is read and written with Flask's own signing serializer
+and cookie settings, so both halves share sessions. Form bodies are parsed
+by Werkzeug's form parser, as Flask's ``request.form`` is, and the result
+store is called on a worker thread so SQLite never blocks the loop.
+
+With ``STAGE_METRICS=1`` the native routes get the same ``Server-Timing``
+header and request histograms as Flask's. The request profiler is WSGI
+middleware and profiles only the routes Flask serves: a cProfile of one
+coroutine would also count every other request interleaved on the loop.
+"""
+import asyncio
+import io
+import json
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qsl, urlencode
+
+from asgiref.wsgi import WsgiToAsgi
+from itsdangerous import BadSignature
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import FormDataParser
+from werkzeug.http import dump_cookie, parse_options_header
+
+from backend.app import app as flask_app, WebCareerAdvisor, parse_batch_payload, store_advice
+from stage_metrics import begin_request, end_request, stage
+
+# Largest request body read into memory
+MAX_BODY = 16 * 1024 * 1024
+
+wsgi_app = WsgiToAsgi(flask_app)
+result_store = flask_app.extensions["result_store"]
+stage_metrics = flask_app.extensions["stage_metrics"]
+
+
+async def read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def request_headers(scope):
+    return {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+
+
+def parse_form(headers, body):
+    """The form fields of a urlencoded or multipart body, as ``request.form``."""
+    mimetype, options = parse_options_header(headers.get("content-type", ""))
+    parser = FormDataParser(max_form_memory_size=flask_app.config["MAX_FORM_MEMORY_SIZE"],
+                            max_form_parts=flask_app.config["MAX_FORM_PARTS"])
+    _, form, _ = parser.parse(io.BytesIO(body), mimetype, len(body), options)
+    return form
+
+
+async def respond(send, status, body=b"", headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def respond_json(send, status, data):
+    await respond(send, status, json.dumps(data).encode("utf-8"), [("Content-Type", "application/json")])
+
+
+# ---------------------------------------------------------------------------
+# Flask-compatible session cookie
+# ---------------------------------------------------------------------------
+
+def load_session(headers):
+    cookie = SimpleCookie(headers.get("cookie", ""))
+    morsel = cookie.get(flask_app.config["SESSION_COOKIE_NAME"])
+    if morsel is None:
+        return {}
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+    try:
+        return serializer.loads(morsel.value, max_age=max_age)
+    except BadSignature:
+        return {}
+
+
+def session_cookie(session):
+    interface = flask_app.session_interface
+    value = interface.get_signing_serializer(flask_app).dumps(dict(session))
+    return dump_cookie(
+        flask_app.config["SESSION_COOKIE_NAME"],
+        value,
+        domain=interface.get_cookie_domain(flask_app),
+        path=interface.get_cookie_path(flask_app),
+        secure=interface.get_cookie_secure(flask_app),
+        httponly=interface.get_cookie_httponly(flask_app),
+        samesite=interface.get_cookie_samesite(flask_app),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Async routes
+# ---------------------------------------------------------------------------
+
+async def assess(scope, receive, send):
+    headers = request_headers(scope)
+    body = await read_body(receive)
+    if body is None:
+        return await respond(send, 413)
+
+    try:
+        form = parse_form(headers, body)
+    except RequestEntityTooLarge:
+        return await respond(send, 413)
+
+    advisor = WebCareerAdvisor()
+    advisor.process_user_data(form)
+    # The advice streams in later from /results/advice
+    results = await advisor.start_analysis_async()
+    root = scope.get("root_path", "")
+    if not results:
+        query = urlencode({"error": "Please fill in all required fields"})
+        return await respond(send, 302, headers=[("Location", f"{root}/?{query}")])
+
+    session = load_session(headers)
+    with stage("store"):
+        await asyncio.to_thread(result_store.delete, session.get("result_id"))
+        session["result_id"] = await asyncio.to_thread(result_store.put, results)
+    await respond(send, 302, headers=[
+        ("Location", f"{root}/results"),
+        ("Set-Cookie", session_cookie(session)),
+        ("Vary", "Cookie"),
+    ])
+
+
+async def results_advice(scope, receive, send):
+    session = load_session(request_headers(scope))
+    result_id = session.get("result_id")
+    results = await asyncio.to_thread(result_store.get, result_id)
+    if results is None:
+        # 204 tells EventSource not to reconnect
+        return await respond(send, 204)
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ],
+    })
+    advice = results["advice"]
+    if advice is None:
+        # Flush the headers now; the advice follows when it is ready
+        await send({"type": "http.response.body", "body": b": advice pending\n\n", "more_body": True})
+        finished = await WebCareerAdvisor().finish_analysis_async(results)
+        advice = await asyncio.to_thread(store_advice, result_store, result_id, finished)
+    event = f"event: advice\ndata: {json.dumps({'advice': advice})}\n\n"
+    await send({"type": "http.response.body", "body": event.encode("utf-8")})
+
+
+async def assess_batch(scope, receive, send):
+    headers = request_headers(scope)
+    body = await read_body(receive)
+    if body is None:
+        return await respond(send, 413)
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError:
+        payload = None
+    forms, error = parse_batch_payload(payload)
+    if error:
+        message, status = error
+        return await respond_json(send, status, {"error": message})
+
+    tasks = WebCareerAdvisor().batch_results_async(forms)
+    query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    try:
+        if query.get("stream") == "1" or "application/x-ndjson" in headers.get("accept", ""):
+            # One line per result, in order, as soon as each is ready
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            })
+            for task in tasks:
+                line = json.dumps(await task) + "\n"
+                await send({"type": "http.response.body", "body": line.encode("utf-8"), "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        else:
+            await respond_json(send, 200, {"results": list(await asyncio.gather(*tasks))})
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def timed(endpoint, route):
+    """``route`` timed like its Flask endpoint when stage metrics are on.
+
+    As with a Flask streaming response, the ``Server-Timing`` header and the
+    request histogram cover the work done before the response starts.
+    """
+    async def timed_route(scope, receive, send):
+        if not stage_metrics.enabled:
+            return await route(scope, receive, send)
+        start = begin_request()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                # end_request may flush the histograms to disk
+                value = await asyncio.to_thread(end_request, start, endpoint, scope["method"], message["status"])
+                message = dict(message, headers=[*message["headers"], (b"server-timing", value.encode("latin-1"))])
+            await send(message)
+
+        await route(scope, receive, timed_send)
+    return timed_route
+
+
+# Keyed by method and path; each is timed under its Flask endpoint's name
+ROUTES = {
+    ("POST", "/assess"): timed("assess", assess),
+    ("GET", "/results/advice"): timed("results_advice", results_advice),
+    ("POST", "/api/assess/batch"): timed("assess_batch", assess_batch),
+}
+
+
+async def lifespan(receive, send):
+    from gcloud_ai import warmup
+
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await asyncio.to_thread(warmup)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    route = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+    if route is None:
+        return await wsgi_app(scope, receive, send)
+    await route(scope, receive, send)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+gunicorn gthread vs uvicorn (backend.asgi) against a local stub model.
+
+Starts ``vertex_stub.py``, then each server in turn with
+``VERTEX_PREDICT_URL`` pointing at the stub, and drives
+``POST /api/assess/batch`` (one profile per request, each with a skill of
+its own so its name-free advice signature never hits the cache) with a
+closed loop of ``--concurrency`` clients. Each server gets a fresh,
+in-process advice cache (``ADVICE_CACHE_PATH=''``), so no run inherits
+another's advice.
+
+Usage:
+    python benchmarks/bench_async.py [--concurrency 8 64 512] [--duration 10]
+        [--latency-ms 300] [--workers 2] [--threads 1]
+
+Reports requests/s, latency percentiles and the share of responses whose
+advice came from the model rather than the local fallback pool.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import PROJECT_ROOT, generate_profiles, to_form  # noqa: E402  (sets up src/ path)
+from advice_prompt import personalize  # noqa: E402
+from catalog import get_catalog  # noqa: E402
+from http_json import post_json_async  # noqa: E402
+from vertex_stub import STUB_TEXT  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout:.0f}s")
+
+
+def start(cmd, env, port):
+    proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+    except RuntimeError:
+        proc.kill()
+        raise
+    return proc
+
+
+def stop(proc):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def unique_form(form, n):
+    """``form`` with an extra skill of its own, so its advice signature is new.
+
+    The advice cache key ignores the name, so a unique name alone would hit.
+    The skill sorts first, so it is always among the signature's skills.
+    """
+    skills = ", ".join(s for s in (f"0bench{n}", form.get('skills', '')) if s)
+    return dict(form, name=f"bench-{n}", skills=skills)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def closed_loop(url, forms, concurrency, duration):
+    """``concurrency`` clients each sending their next request when the last returns."""
+    counter = itertools.count()
+    latencies, errors, ai = [], 0, 0
+    deadline = time.monotonic() + duration
+
+    async def client():
+        nonlocal errors, ai
+        while time.monotonic() < deadline:
+            n = next(counter)
+            form = unique_form(forms[n % len(forms)], n)
+            start = time.monotonic()
+            try:
+                data = await post_json_async(url, [form], timeout=60)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.monotonic() - start)
+            if data['results'][0]['advice'] == personalize(STUB_TEXT, form['name']):
+                ai += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'errors': errors,
+        'ai_share': ai / len(latencies) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 64, 512])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=1,
+                        help='gthread threads per worker (render.yaml uses the default, 1)')
+    parser.add_argument('--advice-timeout', type=float, default=2.0,
+                        help='ADVICE_TIMEOUT for both servers; above the stub latency so advice is awaited')
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    env = dict(
+        os.environ,
+        VERTEX_PREDICT_URL=f'http://127.0.0.1:{stub_port}/v1/predict',
+        ADVICE_TIMEOUT=str(args.advice_timeout),
+    )
+    servers = {
+        'gthread': lambda port: ['gunicorn', '-w', str(args.workers), '-k', 'gthread',
+                                 '--threads', str(args.threads), '-t', '120',
+                                 '-b', f'127.0.0.1:{port}', 'backend.wsgi:app'],
+        'asgi': lambda port: ['uvicorn', 'backend.asgi:app', '--workers', str(args.workers),
+                              '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+    }
+    forms = [to_form(p) for p in generate_profiles(get_catalog().data, 500)]
+
+    stub = start([sys.executable, os.path.join('benchmarks', 'vertex_stub.py'), '--port', str(stub_port),
+                  '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms)], env, stub_port)
+    try:
+        print(f"stub model latency {args.latency_ms:.0f} ± {args.jitter_ms:.0f} ms, "
+              f"{args.workers} workers, {args.duration:.0f}s per level")
+        print(f"{'server':>8} {'conc':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'errors':>7} {'ai advice':>10}")
+        for name, command in servers.items():
+            # A fresh port each, so a slow-exiting previous server can't answer
+            app_port = free_port()
+            url = f'http://127.0.0.1:{app_port}/api/assess/batch'
+            server = start(command(app_port), dict(env, ADVICE_CACHE_PATH=''), app_port)
+            try:
+                for concurrency in args.concurrency:
+                    r = asyncio.run(closed_loop(url, forms, concurrency, args.duration))
+                    print(f"{name:>8} {concurrency:>6} {r['rps']:>9.1f} {r['p50'] * 1000:>8.0f} "
+                          f"{r['p95'] * 1000:>8.0f} {r['p99'] * 1000:>8.0f} {r['errors']:>7} "
+                          f"{r['ai_share']:>10.0%}", flush=True)
+            finally:
+                stop(server)
+    finally:
+        stop(stub)
+
+
+if __name__ == '__main__':
+    main()
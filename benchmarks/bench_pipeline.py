@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark of the advisor pipeline and the web round trip.
+
+Times ``profile_features``, ``analyze_profile``, ``suggest_careers``,
+``recommend_resources``, ``create_roadmap``, the full
+``WebCareerAdvisor.get_analysis_results`` (without and with the analysis
+memo) and a ``POST /assess`` + ``GET /results`` round trip through
+``app.test_client()`` on seeded synthetic profiles. The single-stage rows
+include building the profile's features, which the full pipeline does once.
+AI advice is disabled so runs are reproducible; only local work is measured.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--profiles 200] [--repeat 5] [--careers 10000]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.25]
+        [--save-baseline]
+
+Each stage reports the median time per call across repeats, its p95 and
+the mean peak memory allocated per call (tracemalloc). With ``--baseline``
+every stage is compared to the saved run; a stage slower than
+``1 + threshold`` times its baseline is flagged and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import PROJECT_ROOT, generate_catalog, generate_profiles, to_form  # noqa: E402
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'results')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+
+def use_synthetic_catalog(careers, seed):
+    """Point CAREER_CATALOG_PATH at a generated catalog before the app loads it."""
+    fd, path = tempfile.mkstemp(prefix='careers-', suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        json.dump(generate_catalog(careers, seed=seed), fh)
+    os.environ['CAREER_CATALOG_PATH'] = path
+    return path
+
+
+def measure(fn, items, repeat):
+    """Run ``fn`` over ``items`` ``repeat`` times; return per-call stats."""
+    fn(items[0])  # warm lazily built structures outside the timed region
+    per_call = []
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            t0 = time.perf_counter()
+            fn(item)
+            per_call.append(time.perf_counter() - t0)
+        rounds.append((time.perf_counter() - start) / len(items))
+    per_call.sort()
+
+    tracemalloc.start()
+    peaks = []
+    for item in items[:min(len(items), 50)]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(item)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {
+        'median_us': statistics.median(rounds) * 1e6,
+        'p95_us': per_call[min(len(per_call) - 1, int(0.95 * len(per_call)))] * 1e6,
+        'peak_alloc_kb': statistics.mean(peaks) / 1024,
+        'calls': len(per_call),
+    }
+
+
+def run(args):
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    from backend.app import app, WebCareerAdvisor
+    from analysis_memo import analysis_memo
+    import gcloud_ai
+
+    # Local advice only: no model latency in the numbers
+    gcloud_ai.VERTEX_PREDICT_URL = None
+    gcloud_ai.GCLOUD_AVAILABLE = False
+
+    advisor = WebCareerAdvisor()
+    profiles = generate_profiles(advisor.career_data, args.profiles, seed=args.seed)
+    forms = [to_form(p) for p in profiles]
+
+    def with_profile(stage):
+        def call(profile):
+            advisor.user_profile = profile
+            return stage()
+        return call
+
+    suggestions = {}
+
+    def suggest(profile):
+        advisor.user_profile = profile
+        suggestions[profile['name']] = result = advisor.suggest_careers()
+        return result
+
+    def resources(profile):
+        advisor.user_profile = profile
+        skills = [skill for career in suggestions[profile['name']] for skill in career['skills']]
+        return advisor.recommend_resources(skills)
+
+    def roadmap(profile):
+        advisor.user_profile = profile
+        return advisor.create_roadmap(suggestions[profile['name']])
+
+    memo_size = analysis_memo.max_entries
+
+    def unmemoized(stage):
+        def call(item):
+            analysis_memo.max_entries = 0
+            try:
+                return stage(item)
+            finally:
+                analysis_memo.max_entries = memo_size
+        return call
+
+    client = app.test_client()
+
+    def round_trip(form):
+        response = client.post('/assess', data=form)
+        assert response.status_code == 302, response.status_code
+        response = client.get('/results')
+        assert response.status_code == 200, response.status_code
+
+    stages = [
+        ('profile_features', with_profile(advisor.profile_features), profiles),
+        ('analyze_profile', with_profile(advisor.analyze_profile), profiles),
+        ('suggest_careers', suggest, profiles),
+        ('recommend_resources', resources, profiles),
+        ('create_roadmap', roadmap, profiles),
+        ('get_analysis_results', unmemoized(with_profile(advisor.get_analysis_results)), profiles),
+        ('get_analysis_results_memoized', with_profile(advisor.get_analysis_results), profiles),
+        ('assess_results_round_trip', unmemoized(round_trip), forms),
+    ]
+    results = {}
+    for name, fn, items in stages:
+        results[name] = measure(fn, items, args.repeat)
+        r = results[name]
+        print(f"{name:>30} {r['median_us']:>10.1f} {r['p95_us']:>10.1f} {r['peak_alloc_kb']:>10.1f}", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the ratio to baseline per stage; return the regressed stage names."""
+    regressed = []
+    print(f"\n{'stage':>30} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, r in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            print(f"{name:>30} {'-':>10} {r['median_us']:>10.1f} {'new':>7}")
+            continue
+        ratio = r['median_us'] / base['median_us'] if base['median_us'] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:>30} {base['median_us']:>10.1f} {r['median_us']:>10.1f} {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--careers', type=int, default=0,
+                        help='run against a synthetic catalog of this many careers')
+    parser.add_argument('--output', help='write this run as JSON')
+    parser.add_argument('--baseline', help=f'compare with a saved run (default {DEFAULT_BASELINE} if present)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='flag stages slower than (1 + threshold) x baseline')
+    parser.add_argument('--save-baseline', action='store_true', help=f'write this run to {DEFAULT_BASELINE}')
+    args = parser.parse_args()
+
+    catalog_file = use_synthetic_catalog(args.careers, args.seed) if args.careers else None
+    os.environ.pop('VERTEX_PREDICT_URL', None)
+    try:
+        print(f"{args.profiles} profiles x {args.repeat} repeats, "
+              f"catalog: {args.careers or 'bundled'} careers\n")
+        print(f"{'stage':>30} {'median µs':>10} {'p95 µs':>10} {'peak KiB':>10}")
+        results = run(args)
+    finally:
+        if catalog_file:
+            os.unlink(catalog_file)
+
+    report = {
+        'meta': {
+            'profiles': args.profiles,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'careers': args.careers,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    outputs = [args.output] if args.output else []
+    if args.save_baseline:
+        outputs.append(DEFAULT_BASELINE)
+    for path in outputs:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+        print(f"\nwrote {path}")
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if not args.save_baseline else None)
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        if baseline.get('meta', {}).get('careers') != args.careers:
+            print(f"\nnote: baseline was recorded with careers={baseline['meta'].get('careers')}")
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} stage(s) regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Cold-start report: import times per module and time to first response.
+
+1. Imports ``backend.app`` in fresh interpreters under ``python -X importtime``
+   with the Jinja bytecode cache disabled, cold (empty) and warm, and lists
+   the slowest modules by cumulative import time.
+2. Starts ``gunicorn -c gunicorn.conf.py backend.wsgi:app`` and measures the
+   time from spawn to the first answered ``GET /``, then the latency of the
+   first and a later ``POST /assess`` + ``GET /results``, and prints the
+   server's own ``/api/startup`` timeline.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 3] [--top 15]
+"""
+import argparse
+import http.client
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_async import free_port  # noqa: E402
+from synthetic import PROJECT_ROOT  # noqa: E402
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+FORM = {'name': 'Cold Start', 'skills': 'Python, SQL', 'interests': 'data', 'career_goals': 'data scientist'}
+
+
+def import_profile(env):
+    """Import backend.app once; returns (wall seconds, {module: (cumulative us, depth)})."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import backend.app'],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(2)), (len(match.group(3)) - 1) // 2)
+    return wall, modules
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    start = time.perf_counter()
+    conn.request(method, path, body, headers or {})
+    response = conn.getresponse()
+    data = response.read()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return response, data, elapsed
+
+
+def first_response(env):
+    """Spawn gunicorn; return (seconds to first GET /, assess latencies, timeline)."""
+    port = free_port()
+    env = dict(env, PORT=str(port))
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        ['gunicorn', '-c', 'gunicorn.conf.py', '-w', '1', '-b', f'127.0.0.1:{port}', 'backend.wsgi:app'],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                response, _, _ = request(port, 'GET', '/')
+                if response.status == 200:
+                    break
+            except OSError:
+                time.sleep(0.005)
+            if time.perf_counter() - start > 60:
+                raise RuntimeError('server did not answer within 60s')
+        ready = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(2):
+            body = urlencode(FORM)
+            response, _, elapsed = request(port, 'POST', '/assess', body,
+                                           {'Content-Type': 'application/x-www-form-urlencoded'})
+            cookie = response.getheader('Set-Cookie', '').split(';')[0]
+            _, _, results_elapsed = request(port, 'GET', '/results', headers={'Cookie': cookie})
+            latencies.append(elapsed + results_elapsed)
+        _, timeline, _ = request(port, 'GET', '/api/startup')
+        return ready, latencies, timeline.decode()
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    base_env = {key: value for key, value in os.environ.items() if key != 'JINJA_CACHE_DIR'}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        variants = [
+            ('no bytecode cache', dict(base_env, JINJA_CACHE_DIR='')),
+            ('cold bytecode cache', dict(base_env, JINJA_CACHE_DIR=os.path.join(cache_dir, 'cold'))),
+            ('warm bytecode cache', dict(base_env, JINJA_CACHE_DIR=os.path.join(cache_dir, 'warm'))),
+        ]
+        import_profile(variants[2][1])  # fill the warm cache
+
+        print(f"import backend.app (incl. create_app), median of {args.runs} fresh interpreters")
+        modules = None
+        for label, env in variants:
+            walls = []
+            for run in range(args.runs):
+                if label.startswith('cold'):
+                    subprocess.run(['rm', '-rf', env['JINJA_CACHE_DIR']], check=True)
+                wall, modules = import_profile(env)
+                walls.append(wall)
+            print(f"  {label:>20}: {statistics.median(walls) * 1000:7.0f} ms")
+
+        print(f"\nslowest imports (cumulative, warm cache run), top {args.top}")
+        ranked = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cumulative, depth) in ranked[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {'  ' * min(depth, 6)}{name}")
+
+        ready, latencies, timeline = first_response(variants[2][1])
+    print(f"\ngunicorn spawn -> first GET / answered: {ready * 1000:.0f} ms")
+    print(f"first /assess + /results: {latencies[0] * 1000:.1f} ms, next: {latencies[1] * 1000:.1f} ms")
+    print(f"server timeline: {timeline.strip()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Profiles/second of the per-profile matcher vs the NumPy batch backend.
+
+Usage:
+    python benchmarks/bench_vectorized.py [--sizes 1 100 10000 1000000] [--careers N]
+
+The per-profile path (``backend='python'``) is timed on at most ``--loop-cap``
+profiles per size and reported as a rate; the NumPy path always scores the
+full batch.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_catalog, generate_profiles  # noqa: E402  (sets up src/ path)
+from career_advisor import CareerAdvisor  # noqa: E402
+from vector_scoring import NUMPY_AVAILABLE  # noqa: E402
+
+
+def rate(count, seconds):
+    return count / seconds if seconds > 0 else float('inf')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000, 1000000])
+    parser.add_argument('--loop-cap', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--careers', type=int, default=0,
+                        help='score against a synthetic catalog of this many careers')
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("numpy is not installed; only the per-profile path can be measured")
+
+    advisor = CareerAdvisor()
+    if args.careers:
+        advisor.career_data = generate_catalog(args.careers, seed=args.seed)
+    pool = generate_profiles(advisor.career_data, max(args.sizes), seed=args.seed)
+    # Build lazily-compiled structures outside the timed region
+    if NUMPY_AVAILABLE:
+        advisor.suggest_careers_batch(pool[:1], backend='numpy')
+
+    print(f"{'batch':>10} {'per-profile/s':>15} {'batch/s':>15} {'speedup':>9}")
+    for size in args.sizes:
+        profiles = pool[:size]
+
+        sample = profiles[:args.loop_cap]
+        start = time.perf_counter()
+        advisor.suggest_careers_batch(sample, backend='python')
+        loop_rate = rate(len(sample), time.perf_counter() - start)
+
+        batch_rate = None
+        if NUMPY_AVAILABLE:
+            start = time.perf_counter()
+            advisor.suggest_careers_batch(profiles, backend='numpy')
+            batch_rate = rate(len(profiles), time.perf_counter() - start)
+
+        if batch_rate is None:
+            print(f"{size:>10} {loop_rate:>15,.0f} {'-':>15} {'-':>9}")
+        else:
+            print(f"{size:>10} {loop_rate:>15,.0f} {batch_rate:>15,.0f} {batch_rate / loop_rate:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
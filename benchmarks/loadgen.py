@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Closed-loop load generator for the web app under gunicorn.
+
+Starts ``vertex_stub.py`` and ``gunicorn backend.wsgi:app`` (pointed at the
+stub through ``VERTEX_PREDICT_URL``), then runs ``--users`` virtual users.
+Each user keeps one keep-alive connection and its own session cookie, and
+issues its next request when the previous one has returned, paced so the
+whole fleet aims at ``--rps``. Request types are drawn from ``--mix``:
+
+- ``page``: GET of a static page (/, /about, /careers/..., /resources/...)
+- ``assess``: POST /assess with a synthetic profile (with a skill of its
+  own, so the name-free advice cache does not hide the model), then
+  GET /results/advice until the advice event arrives. /assess itself no
+  longer waits for the model, so this pair is what measures model latency
+- ``results``: GET /results for the user's last submission
+
+Usage:
+    python benchmarks/loadgen.py [--rps 50] [--users 32] [--duration 30]
+        [--mix page=60,assess=20,results=20] [--workers 2] [--threads 4]
+        [--stub-latency-ms 300] [--stub-distribution lognormal]
+        [--stub-error-rate 0.02] [--stub-timeout-rate 0.01]
+        [--url http://host:port] [--output run.json]
+
+Reports per request type: count, error rate, p50/p90/p99 and a latency
+histogram. Latency is measured from when the request was *scheduled*, so a
+saturated server shows up as growing latency instead of silently lowering
+the offered rate (no coordinated omission). Worker saturation is reported
+as per-worker CPU (sampled from /proc) and as average busy request slots
+(throughput x mean service time, Little's law) against workers x threads.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_async import free_port, percentile, start, stop, unique_form  # noqa: E402
+from synthetic import generate_profiles, to_form  # noqa: E402  (sets up src/ path)
+from catalog import get_catalog  # noqa: E402
+
+PAGES = (
+    '/', '/about', '/careers/technology', '/careers/business', '/careers/design',
+    '/careers/security', '/resources/learning', '/resources/skills', '/resources/tips',
+)
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float('inf'))
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ('page', 'assess', 'results'):
+            raise argparse.ArgumentTypeError(f"unknown request type {name!r}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection with a cookie jar."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+        self.cookies = {}
+
+    async def request(self, method, path, body=b'', content_type=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(body)}"]
+        if content_type:
+            head.append(f"Content-Type: {content_type}")
+        if self.cookies:
+            head.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length, chunked, close = None, False, False
+        while True:
+            line = (await self.reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'transfer-encoding' and value.lower() == 'chunked':
+                chunked = True
+            elif name == 'connection' and value.lower() == 'close':
+                close = True
+            elif name == 'set-cookie':
+                key, _, rest = value.partition('=')
+                self.cookies[key] = rest.split(';')[0]
+        if chunked:
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length is not None:
+            await self.reader.readexactly(length)
+        else:
+            await self.reader.read()
+            close = True
+        if close:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class WorkerSampler(threading.Thread):
+    """Samples CPU time of the server's worker processes from /proc."""
+
+    def __init__(self, server_pid, interval=1.0):
+        super().__init__(daemon=True)
+        self.server_pid = server_pid
+        self.interval = interval
+        self.samples = {}
+        self.stopped = threading.Event()
+        self.ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    def workers(self):
+        try:
+            with open(f'/proc/{self.server_pid}/task/{self.server_pid}/children') as fh:
+                return [int(pid) for pid in fh.read().split()]
+        except OSError:
+            return []
+
+    def cpu_seconds(self, pid):
+        try:
+            with open(f'/proc/{pid}/stat') as fh:
+                fields = fh.read().rsplit(')', 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self.ticks, int(fields[17])
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def run(self):
+        last = {}
+        while not self.stopped.wait(self.interval):
+            now = time.monotonic()
+            for pid in self.workers():
+                sample = self.cpu_seconds(pid)
+                if sample is None:
+                    continue
+                cpu, threads = sample
+                if pid in last:
+                    prev_cpu, prev_time = last[pid]
+                    self.samples.setdefault(pid, []).append(((cpu - prev_cpu) / (now - prev_time), threads))
+                last[pid] = (cpu, now)
+
+    def report(self):
+        return {
+            pid: {
+                'cpu_mean': sum(c for c, _ in s) / len(s),
+                'cpu_max': max(c for c, _ in s),
+                'threads': s[-1][1],
+            }
+            for pid, s in self.samples.items() if s
+        }
+
+
+async def run_load(base_url, args, forms):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    rng = random.Random(args.seed)
+    kinds, weights = zip(*args.mix.items())
+    slots = itertools.count()
+    names = itertools.count()
+    stats = {kind: {'latencies': [], 'service': [], 'errors': 0} for kind in kinds}
+    start = time.monotonic()
+    deadline = start + args.duration
+
+    async def user():
+        conn = Connection(host, port)
+        submitted = False
+        while True:
+            intended = start + next(slots) / args.rps
+            if intended >= deadline:
+                break
+            delay = intended - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = rng.choices(kinds, weights)[0]
+            if kind == 'results' and not submitted:
+                kind = 'assess'
+            sent = time.monotonic()
+            try:
+                if kind == 'page':
+                    status = await asyncio.wait_for(conn.request('GET', rng.choice(PAGES)), args.timeout)
+                    ok = status == 200
+                elif kind == 'assess':
+                    form = unique_form(rng.choice(forms), next(names))
+                    body = urlencode(form).encode()
+                    status = await asyncio.wait_for(
+                        conn.request('POST', '/assess', body, 'application/x-www-form-urlencoded'), args.timeout)
+                    ok = status == 302
+                    submitted = submitted or ok
+                    if ok:
+                        # The advice streams in after the redirect
+                        remaining = max(0.0, args.timeout - (time.monotonic() - sent))
+                        status = await asyncio.wait_for(conn.request('GET', '/results/advice'), remaining)
+                        ok = status == 200
+                else:
+                    status = await asyncio.wait_for(conn.request('GET', '/results'), args.timeout)
+                    ok = status == 200
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+                conn.close()
+                ok = False
+            done = time.monotonic()
+            entry = stats[kind]
+            entry['latencies'].append(done - intended)
+            entry['service'].append(done - sent)
+            if not ok:
+                entry['errors'] += 1
+        conn.close()
+
+    await asyncio.gather(*(user() for _ in range(args.users)))
+    return stats, time.monotonic() - start
+
+
+def histogram(latencies):
+    counts = [0] * len(BUCKETS_MS)
+    for latency in latencies:
+        ms = latency * 1000
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                counts[i] += 1
+                break
+    return counts
+
+
+def summarize(stats, elapsed, args, saturation):
+    total = sum(len(s['latencies']) for s in stats.values())
+    service_total = sum(sum(s['service']) for s in stats.values())
+    report = {'elapsed': elapsed, 'throughput': total / elapsed, 'types': {}}
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s (target {args.rps:.0f})")
+    print(f"\n{'type':>8} {'count':>7} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for kind, s in stats.items():
+        lat = sorted(s['latencies'])
+        row = {
+            'count': len(lat),
+            'error_rate': s['errors'] / len(lat) if lat else 0.0,
+            'p50_ms': percentile(lat, 0.50) * 1000,
+            'p90_ms': percentile(lat, 0.90) * 1000,
+            'p99_ms': percentile(lat, 0.99) * 1000,
+            'max_ms': (lat[-1] if lat else float('nan')) * 1000,
+            'histogram': dict(zip([str(b) for b in BUCKETS_MS], histogram(lat))),
+        }
+        report['types'][kind] = row
+        print(f"{kind:>8} {row['count']:>7} {row['error_rate']:>7.1%} {row['p50_ms']:>8.0f} "
+              f"{row['p90_ms']:>8.0f} {row['p99_ms']:>8.0f} {row['max_ms']:>8.0f}")
+
+    for kind, row in report['types'].items():
+        if not row['count']:
+            continue
+        print(f"\n{kind} latency histogram")
+        peak = max(row['histogram'].values()) or 1
+        lower = 0
+        for bound, count in zip(BUCKETS_MS, row['histogram'].values()):
+            if count:
+                label = f"{lower:g}-{bound:g} ms" if bound != float('inf') else f">{lower:g} ms"
+                print(f"{label:>14} {count:>7} {'#' * max(1, round(40 * count / peak))}")
+            lower = bound
+
+    slots = args.workers * args.threads
+    busy = service_total / elapsed
+    report['saturation'] = {'busy_slots': busy, 'slots': slots, 'workers': saturation}
+    print(f"\nworker saturation: {busy:.1f} of {slots} request slots busy on average "
+          f"({busy / slots:.0%}, Little's law)")
+    for pid, w in sorted(saturation.items()):
+        print(f"  worker {pid}: cpu mean {w['cpu_mean']:.0%} max {w['cpu_max']:.0%}, {w['threads']} threads")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rps', type=float, default=50.0, help='target request rate for the whole fleet')
+    parser.add_argument('--users', type=int, default=32, help='concurrent virtual users (closed loop)')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('page=60,assess=20,results=20'))
+    parser.add_argument('--timeout', type=float, default=30.0, help='client timeout per request')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--worker-class', default='gthread')
+    parser.add_argument('--url', help='load an already running server instead of starting gunicorn')
+    parser.add_argument('--output', help='write the report as JSON')
+    parser.add_argument('--stub-latency-ms', type=float, default=300.0)
+    parser.add_argument('--stub-jitter-ms', type=float, default=50.0)
+    parser.add_argument('--stub-distribution', choices=('uniform', 'exponential', 'lognormal'), default='lognormal')
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--stub-timeout-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    forms = [to_form(p) for p in generate_profiles(get_catalog().data, 500, seed=args.seed)]
+    procs = []
+    sampler = None
+    try:
+        if args.url:
+            base_url = args.url
+        else:
+            stub_port, app_port = free_port(), free_port()
+            # A fresh, in-process advice cache: nothing carried over from earlier runs
+            env = dict(os.environ, VERTEX_PREDICT_URL=f'http://127.0.0.1:{stub_port}/v1/predict',
+                       ADVICE_CACHE_PATH='')
+            if args.workers > 1:
+                # As gunicorn.conf.py does: /results and /results/advice may reach any worker
+                env.setdefault('RESULT_STORE', 'sqlite')
+            procs.append(start([
+                sys.executable, os.path.join('benchmarks', 'vertex_stub.py'), '--port', str(stub_port),
+                '--latency-ms', str(args.stub_latency_ms), '--jitter-ms', str(args.stub_jitter_ms),
+                '--distribution', args.stub_distribution, '--error-rate', str(args.stub_error_rate),
+                '--timeout-rate', str(args.stub_timeout_rate), '--seed', str(args.seed),
+            ], env, stub_port))
+            server = start([
+                'gunicorn', '-w', str(args.workers), '-k', args.worker_class, '--threads', str(args.threads),
+                '-t', '120', '-b', f'127.0.0.1:{app_port}', 'backend.wsgi:app',
+            ], env, app_port)
+            procs.append(server)
+            base_url = f'http://127.0.0.1:{app_port}'
+            sampler = WorkerSampler(server.pid)
+            sampler.start()
+
+        print(f"{args.users} users, target {args.rps:.0f} req/s for {args.duration:.0f}s, "
+              f"mix {args.mix}, {args.workers}x{args.threads} {args.worker_class}")
+        stats, elapsed = asyncio.run(run_load(base_url, args, forms))
+    finally:
+        if sampler is not None:
+            sampler.stopped.set()
+        for proc in reversed(procs):
+            stop(proc)
+
+    report = summarize(stats, elapsed, args, sampler.report() if sampler else {})
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, default=str)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
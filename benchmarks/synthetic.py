@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic profiles for benchmarks.
+
+Profiles are drawn from the catalog's own vocabulary plus filler words so
+that a realistic share of them hit several careers and some hit none.
+"""
+import os
+import random
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+FILLER = [
+    "i", "love", "want", "to", "become", "a", "and", "building", "working", "with",
+    "people", "solving", "problems", "learning", "new", "things", "career", "in",
+]
+
+
+def catalog_vocabulary(career_data):
+    """Return (phrases, skills) drawn from a catalog."""
+    phrases, skills = set(), set()
+    for category, data in career_data.items():
+        phrases.add(category)
+        for career in data["careers"]:
+            phrases.update(career["keywords"])
+            phrases.add(career["name"].lower())
+            skills.update(career["skills"])
+    return sorted(phrases), sorted(skills)
+
+
+def generate_profiles(career_data, count, seed=42):
+    """Return ``count`` profiles in the ``process_user_data`` output shape."""
+    rng = random.Random(seed)
+    phrases, skills = catalog_vocabulary(career_data)
+
+    def sentence(n_phrases):
+        words = rng.sample(FILLER, rng.randint(2, 6))
+        words += rng.sample(phrases, min(n_phrases, len(phrases)))
+        rng.shuffle(words)
+        return " ".join(words)
+
+    profiles = []
+    for i in range(count):
+        profiles.append({
+            "name": f"User {i}",
+            "education": rng.choice(["High School", "Bachelor's Degree", "Master's Degree"]),
+            "field": rng.choice(["Computer Science", "Business", "Arts", ""]),
+            "skills": rng.sample(skills, min(rng.randint(0, 6), len(skills))),
+            "interests": sentence(rng.randint(0, 3)),
+            "career_goals": sentence(rng.randint(0, 2)),
+            "timeline": rng.choice(["6 months", "1 year", "3 years"]),
+        })
+    return profiles
+
+
+def to_form(profile):
+    """Convert a profile back into the form fields ``/assess`` expects."""
+    form = dict(profile)
+    form["skills"] = ", ".join(profile["skills"])
+    return form
+
+
+def generate_catalog(career_count, seed=42, categories=("tech", "security", "business", "design")):
+    """Return a catalog dict with ``career_count`` synthetic careers.
+
+    Keywords and skills are drawn from a vocabulary that grows with the
+    catalog so the index keeps a realistic number of postings per pattern.
+    """
+    rng = random.Random(seed)
+    vocab_size = max(50, career_count // 4)
+    keywords = [f"kw{i}" for i in range(vocab_size)]
+    skills = [f"Skill {i}" for i in range(vocab_size)]
+    catalog = {category: {"careers": []} for category in categories}
+    for i in range(career_count):
+        catalog[categories[i % len(categories)]]["careers"].append({
+            "name": f"Career {i}",
+            "skills": rng.sample(skills, 4),
+            "keywords": rng.sample(keywords, 3),
+        })
+    return catalog
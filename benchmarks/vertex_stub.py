@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Vertex AI REST ``:predict`` endpoint.
+
+Answers any ``POST`` with ``{"predictions": [{"content": ...}, ...]}`` (one
+per instance) after a configurable delay. Runs on asyncio, so thousands of
+concurrent slow calls cost no threads and the stub is never the bottleneck.
+
+Latency follows ``--distribution``: ``uniform`` (latency ± jitter),
+``exponential`` or ``lognormal`` (mean ``--latency-ms``, the latter with
+sigma ``--sigma``). ``--error-rate`` answers that share of calls with HTTP
+500 and ``--timeout-rate`` never answers that share (until the client gives
+up), so the breaker and fallbacks can be exercised.
+
+Usage:
+    python benchmarks/vertex_stub.py [--port 8471] [--latency-ms 300] [--jitter-ms 50]
+        [--distribution uniform|exponential|lognormal] [--error-rate 0.05] [--timeout-rate 0.01]
+
+Point the app at it with ``VERTEX_PREDICT_URL=http://127.0.0.1:8471/v1/predict``.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+
+STUB_TEXT = "Stub advice: keep building, you are on the right track."
+
+
+class StubModel:
+    """Request handler with a configurable latency and failure distribution."""
+
+    def __init__(self, latency_ms=300.0, jitter_ms=0.0, seed=None, distribution="uniform",
+                 sigma=0.5, error_rate=0.0, timeout_rate=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def delay(self) -> float:
+        if self.distribution == "exponential":
+            ms = self.random.expovariate(1.0 / self.latency_ms) if self.latency_ms else 0.0
+        elif self.distribution == "lognormal":
+            # Parameterised so the mean is latency_ms
+            mu = math.log(max(self.latency_ms, 1e-3)) - self.sigma ** 2 / 2
+            ms = self.random.lognormvariate(mu, self.sigma)
+        else:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            ms = self.latency_ms + jitter
+        return max(0.0, ms) / 1000.0
+
+    async def predict(self, payload):
+        """Returns (status, response dict)."""
+        roll = self.random.random()
+        if roll < self.timeout_rate:
+            self.timeouts += 1
+            await asyncio.sleep(3600)
+        await asyncio.sleep(self.delay())
+        if roll < self.timeout_rate + self.error_rate:
+            self.errors += 1
+            return 500, {"error": {"code": 500, "message": "stub model error"}}
+        instances = payload.get("instances") or []
+        return 200, {"predictions": [{"content": STUB_TEXT} for _ in instances]}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length, close = 0, False
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    name = name.strip().lower()
+                    if name == "content-length":
+                        length = int(value)
+                    elif name == "connection" and value.strip().lower() == "close":
+                        close = True
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    try:
+                        payload = json.loads(body or b"{}")
+                    except ValueError:
+                        payload = {}
+                    status, data = await self.predict(payload)
+                finally:
+                    self.in_flight -= 1
+
+                out = json.dumps(data).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(out)}\r\n"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode("latin-1")
+                    + out
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client went away, or the server is shutting down
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(model: StubModel, host="127.0.0.1", port=8471):
+    server = await asyncio.start_server(model.handle, host, port, backlog=4096)
+    async with server:
+        await server.serve_forever()
+
+
+def add_arguments(parser):
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8471)
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--distribution', choices=('uniform', 'exponential', 'lognormal'), default='uniform')
+    parser.add_argument('--sigma', type=float, default=0.5, help='lognormal shape')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of calls answered with HTTP 500')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='share of calls never answered')
+
+
+def model_from_args(args) -> StubModel:
+    return StubModel(args.latency_ms, args.jitter_ms, args.seed, args.distribution,
+                     args.sigma, args.error_rate, args.timeout_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    model = model_from_args(args)
+    print(f"Vertex stub on http://{args.host}:{args.port}/v1/predict "
+          f"({args.distribution}, mean {args.latency_ms:.0f} ms, "
+          f"{args.error_rate:.0%} errors, {args.timeout_rate:.0%} timeouts)", flush=True)
+    try:
+        asyncio.run(serve(model, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Build fingerprinted, minified and precompressed static assets.
+
+Run at deploy time (see render.yaml); writes static/dist/ and its manifest.
+"""
+
+import os
+import sys
+
+# Add src directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'src'))
+
+from assets import build
+
+# Project root, for backend.app
+sys.path.insert(0, current_dir)
+
+
+def main():
+    """Build all assets and report their sizes"""
+    static_dir = os.path.join(current_dir, 'static')
+    manifest = build(static_dir)
+    for source, hashed in sorted(manifest.items()):
+        original = os.path.getsize(os.path.join(static_dir, source))
+        built = os.path.join(static_dir, 'dist', hashed)
+        print(f"{source} -> dist/{hashed}")
+        print(f"    {original:,} B -> {os.path.getsize(built):,} B minified, "
+              f"{os.path.getsize(built + '.gz'):,} B gzip")
+
+    # Building the app compiles every template into the Jinja bytecode cache
+    from backend.app import JINJA_CACHE_DIR, create_app
+    if JINJA_CACHE_DIR:
+        create_app()
+        print(f"templates precompiled -> {os.path.relpath(JINJA_CACHE_DIR, current_dir)}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,29 @@
+"""
+Gunicorn settings shared by every deployment (render.yaml, Spacefile).
+
+    gunicorn -c gunicorn.conf.py backend.wsgi:app
+
+The app is imported once in the master (``preload_app``): the catalog, its
+compiled indexes and the compiled templates are shared by the workers
+copy-on-write, and workers start without importing anything. ``post_fork``
+recreates what must not be shared across processes. With more than one
+worker, results default to the shared SQLite store (``RESULT_STORE``).
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+timeout = 120
+preload_app = True
+
+# Per-process results would miss whenever /results lands on another worker
+if workers > 1:
+    os.environ.setdefault('RESULT_STORE', 'sqlite')
+
+
+def post_fork(server, worker):
+    from backend.app import reinit_after_fork
+
+    reinit_after_fork()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Precompute AI advice for the most common profile signatures.
+
+    python precompute_advice.py [--output src/data/advice_corpus.bin]
+        [--submissions profiles.jsonl] [--top 300] [--no-catalog]
+        [--rate 5] [--concurrency 8] [--resume] [--dry-run]
+
+Signatures (see src/advice_prompt.py) come from every catalog career's skill
+set and, with ``--submissions``, from the ``--top`` most frequent ones among
+logged profiles (one JSON object per line, with ``skills`` as a list or a
+comma-separated string). Advice is generated through Vertex AI with at most
+``--concurrency`` calls in flight and ``--rate`` calls started per second,
+then written to the memory-mappable corpus the app loads at startup
+(ADVICE_CORPUS_PATH). ``--resume`` keeps advice already in the output file.
+
+Needs Vertex AI credentials (or VERTEX_PREDICT_URL), not the web server.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add src directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'src'))
+
+from advice_cache import key_text
+from advice_corpus import (ADVICE_CORPUS_PATH, AdviceCorpus, catalog_signatures, common_signatures,
+                           generate_corpus, write_corpus)
+from catalog import get_catalog
+
+
+def read_submissions(path):
+    """Logged profiles, normalized to the ``process_user_data`` shape"""
+    profiles = []
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            profile = json.loads(line)
+            if isinstance(profile.get('skills'), str):
+                profile['skills'] = [s.strip() for s in profile['skills'].split(',') if s.strip()]
+            profiles.append(profile)
+    return profiles
+
+
+def main():
+    """Generate advice for the selected signatures and write the corpus"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=ADVICE_CORPUS_PATH)
+    parser.add_argument('--submissions', help='JSON lines of logged profiles')
+    parser.add_argument('--top', type=int, default=300, help='most frequent submitted signatures to include')
+    parser.add_argument('--no-catalog', action='store_true', help="skip the catalog careers' skill sets")
+    parser.add_argument('--rate', type=float, default=5.0, help='model calls started per second')
+    parser.add_argument('--concurrency', type=int, default=8, help='model calls in flight')
+    parser.add_argument('--resume', action='store_true', help='keep advice already in the output file')
+    parser.add_argument('--dry-run', action='store_true', help='list the signatures and exit')
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    signatures = [] if args.no_catalog else catalog_signatures(catalog.data, catalog.matcher)
+    if args.submissions:
+        signatures += common_signatures(read_submissions(args.submissions), catalog.matcher, args.top)
+    signatures = list(dict.fromkeys(signatures))
+
+    entries = {}
+    if args.resume:
+        existing = dict(AdviceCorpus(args.output).items())
+        entries = {s: existing[key_text(s)] for s in signatures if key_text(s) in existing}
+    todo = [s for s in signatures if s not in entries]
+    print(f"{len(signatures)} signatures, {len(entries)} already in {args.output}, {len(todo)} to generate")
+    if args.dry_run:
+        for signature in todo:
+            print(f"  {key_text(signature)}")
+        return 0
+
+    import gcloud_ai
+    # The app imports the SDK in the background; here it is needed right away
+    gcloud_ai.load_sdk()
+    if todo and not gcloud_ai.is_available():
+        print("Vertex AI is not configured (GOOGLE_APPLICATION_CREDENTIALS or VERTEX_PREDICT_URL)")
+        return 1
+
+    done = [0]
+
+    def progress(signature, ok):
+        done[0] += 1
+        if not ok:
+            print(f"  failed: {key_text(signature)}")
+        if done[0] % 50 == 0 or done[0] == len(todo):
+            print(f"  {done[0]}/{len(todo)}", flush=True)
+
+    entries.update(asyncio.run(generate_corpus(
+        todo, gcloud_ai.generate_text_async, rate=args.rate, concurrency=args.concurrency, progress=progress,
+    )))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_corpus(args.output, entries, catalog.version)
+    print(f"Wrote {len(entries)} entries ({os.path.getsize(args.output):,} B) to {args.output}")
+    return 0 if len(entries) == len(signatures) else 1
+
+
+if __name__ == '__main__':
+    exit(main())
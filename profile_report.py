@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Merge sampled request profiles into a top-N hot-function report.
+
+    python profile_report.py [--dir PROFILE_DIR] [--route results] [--top 30]
+        [--sort cumulative|tottime|ncalls] [--filter "career_advisor|\\.html"]
+
+Reads the ``.pstats`` dumps written by the request profiler (see
+src/request_profiler.py); ``--route`` keeps only dumps whose file name
+contains it and ``--filter`` keeps only functions whose location matches the
+regular expression (Jinja templates show up under their ``.html`` name).
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+# Add src directory to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'src'))
+
+from request_profiler import PROFILE_DIR, aggregate
+
+
+def main():
+    """Print the merged report of the selected dumps"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=PROFILE_DIR, help='directory holding the .pstats dumps')
+    parser.add_argument('--route', help='only dumps whose name contains this (e.g. POST_assess)')
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('--sort', default='cumulative', choices=('cumulative', 'tottime', 'ncalls'))
+    parser.add_argument('--filter', help='regular expression on the function location')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.dir, '*.pstats')))
+    if args.route:
+        paths = [path for path in paths if args.route in os.path.basename(path)]
+    if not paths:
+        print(f"No profiles found in {args.dir}")
+        return 1
+    print(f"Merged {len(paths)} profile(s) from {args.dir}")
+    print(aggregate(paths, top=args.top, sort=args.sort, restrict=args.filter))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Two-tier cache for AI-generated advice.
+
+- L1: a bounded in-process LRU with per-entry expiry (``ADVICE_CACHE_MAX``
+  entries, ``ADVICE_CACHE_TTL`` seconds).
+- L2: a SQLite file in WAL mode shared by every worker on the host
+  (``ADVICE_CACHE_PATH``, empty to disable), so an answer paid for in one
+  worker is served by all of them. L2 hits are copied into L1.
+
+Misses are single-flight: while a generation for a key is running, other
+requests for it in the same process share it, and a lease row in L2 keeps
+the other workers from starting their own; they ``poll`` L2 for the result
+instead.
+
+``stats()`` reports per-tier hits, the hit ratio, sizes, evictions and how
+many generations were started or coalesced.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+ADVICE_CACHE_MAX = int(os.environ.get("ADVICE_CACHE_MAX", "2048"))
+ADVICE_CACHE_TTL = float(os.environ.get("ADVICE_CACHE_TTL", "86400"))
+ADVICE_CACHE_PATH = os.environ.get(
+    "ADVICE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "career_advisor_advice.db")
+)
+# Rows kept in L2; the oldest beyond this are purged
+ADVICE_CACHE_L2_MAX = int(os.environ.get("ADVICE_CACHE_L2_MAX", "100000"))
+# How long another worker's in-flight generation blocks this one from starting
+LEASE_SECONDS = 60.0
+# How often ``poll`` re-reads L2 while another worker generates
+POLL_INTERVAL = 0.05
+
+# single_flight() result when another worker is generating the key
+ELSEWHERE = "elsewhere"
+
+
+def key_text(key: Hashable) -> str:
+    """Stable text form of a cache key (keys are tuples of JSON-able values)."""
+    return json.dumps(key, separators=(",", ":"), ensure_ascii=False)
+
+
+class AdviceCache:
+    """L1 LRU/TTL in front of a shared SQLite L2, with single-flight misses."""
+
+    # Expired and surplus L2 rows are purged on every Nth put
+    PURGE_EVERY = 100
+
+    def __init__(self, max_entries: int = ADVICE_CACHE_MAX, ttl: float = ADVICE_CACHE_TTL,
+                 path: Optional[str] = ADVICE_CACHE_PATH, l2_max_entries: int = ADVICE_CACHE_L2_MAX):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path or None
+        self.l2_max_entries = l2_max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._local = threading.local()
+        self._puts = 0
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.generations = 0
+        self.coalesced = 0
+        self.l2_errors = 0
+
+    # -- L2 -----------------------------------------------------------------
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        # One connection per thread (and per process, so it is fork-safe)
+        if self.path is None:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS advice ("
+                "key TEXT PRIMARY KEY, expires REAL NOT NULL, text TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS advice_expires ON advice (expires)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires REAL NOT NULL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _l2(self, sql: str, params=()):
+        """Run one L2 statement; the cache degrades to L1 if SQLite fails."""
+        try:
+            conn = self._connect()
+            return conn.execute(sql, params) if conn is not None else None
+        except sqlite3.Error:
+            with self._lock:
+                self.l2_errors += 1
+            return None
+
+    def _l2_get(self, key_json: str, now: float) -> Optional[str]:
+        cursor = self._l2("SELECT text FROM advice WHERE key = ? AND expires >= ?", (key_json, now))
+        row = cursor.fetchone() if cursor is not None else None
+        return row[0] if row else None
+
+    def _l2_put(self, key_json: str, text: str, now: float):
+        self._l2(
+            "INSERT OR REPLACE INTO advice (key, expires, text) VALUES (?, ?, ?)",
+            (key_json, now + self.ttl, text),
+        )
+        self._puts += 1
+        if self._puts % self.PURGE_EVERY == 0:
+            self._l2("DELETE FROM advice WHERE expires < ?", (now,))
+            self._l2(
+                "DELETE FROM advice WHERE key IN (SELECT key FROM advice "
+                "ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+                (self.l2_max_entries,),
+            )
+
+    def _acquire_lease(self, key_json: str) -> bool:
+        if self.path is None:
+            return True
+        now = time.time()
+        self._l2("DELETE FROM leases WHERE key = ? AND expires < ?", (key_json, now))
+        cursor = self._l2(
+            "INSERT OR IGNORE INTO leases (key, expires) VALUES (?, ?)", (key_json, now + LEASE_SECONDS)
+        )
+        # If L2 is failing, generate locally rather than never
+        return cursor is None or cursor.rowcount == 1
+
+    def _release_lease(self, key_json: str):
+        if self.path is not None:
+            self._l2("DELETE FROM leases WHERE key = ?", (key_json,))
+
+    # -- Cache API ----------------------------------------------------------
+
+    def _l1_get(self, key: Hashable, now: float, peek: bool = False) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, text = entry
+            if expires < now:
+                if not peek:
+                    del self._entries[key]
+                    self.expirations += 1
+                return None
+            if not peek:
+                self._entries.move_to_end(key)
+            self.l1_hits += 1
+            return text
+
+    def _l2_lookup(self, key: Hashable, now: float, count_miss: bool = True) -> Optional[str]:
+        text = self._l2_get(key_text(key), now)
+        with self._lock:
+            if text is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self.l2_hits += 1
+            self._store_l1(key, text, now)
+        return text
+
+    def get(self, key: Hashable) -> Optional[str]:
+        now = time.time()
+        text = self._l1_get(key, now)
+        return text if text is not None else self._l2_lookup(key, now)
+
+    async def get_async(self, key: Hashable) -> Optional[str]:
+        """``get()`` for the event loop: the L2 read runs on a thread."""
+        now = time.time()
+        text = self._l1_get(key, now)
+        if text is not None or self.path is None:
+            return text if text is not None else self._l2_lookup(key, now)
+        return await asyncio.to_thread(self._l2_lookup, key, now)
+
+    def put(self, key: Hashable, text: str):
+        now = time.time()
+        with self._lock:
+            self._store_l1(key, text, now)
+        self._l2_put(key_text(key), text, now)
+
+    def _store_l1(self, key: Hashable, text: str, now: float):
+        self._entries[key] = (now + self.ttl, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _reserve(self, slot, placeholder):
+        """Claim ``slot`` with ``placeholder`` unless a generation holds it.
+
+        Returns ``(future, True)`` when claimed, else ``(running, False)``.
+        Checking and claiming under one lock keeps concurrent misses from
+        each starting a generation.
+        """
+        with self._lock:
+            running = self._inflight.get(slot)
+            if running is not None and not running.done():
+                self.coalesced += 1
+                return running, False
+            self._inflight[slot] = placeholder
+            return placeholder, True
+
+    def _settle(self, slot, placeholder, key_json: str, future, release: Callable = None):
+        """Tie ``placeholder`` to the generation ``future`` (None: none started).
+
+        ``release(key_json)`` frees the lease once there is no generation.
+        """
+        if future is None:
+            with self._lock:
+                if self._inflight.get(slot) is placeholder:
+                    del self._inflight[slot]
+            if release is not None:
+                release(key_json)
+            # Requests that joined the placeholder get no advice from it
+            placeholder.set_result(None)
+            return
+        with self._lock:
+            self.generations += 1
+
+        def _done(done):
+            with self._lock:
+                if self._inflight.get(slot) is placeholder:
+                    del self._inflight[slot]
+            release(key_json)
+            if done.cancelled():
+                placeholder.cancel()
+            elif done.exception() is not None:
+                placeholder.set_exception(done.exception())
+            else:
+                placeholder.set_result(done.result())
+
+        future.add_done_callback(_done)
+
+    def single_flight(self, key: Hashable, start: Callable):
+        """Return a future for ``key``'s generation, starting one if needed.
+
+        ``start()`` returns a future (or None if it could not start). Every
+        caller for a key gets the same future; it resolves to None when no
+        generation could start. Returns ``ELSEWHERE`` when another worker
+        holds the lease for ``key``.
+        """
+        slot = ("thread", key)
+        placeholder, claimed = self._reserve(slot, concurrent.futures.Future())
+        if not claimed:
+            return placeholder
+        key_json = key_text(key)
+        if not self._acquire_lease(key_json):
+            with self._lock:
+                self.coalesced += 1
+            self._settle(slot, placeholder, key_json, None)
+            return ELSEWHERE
+        self._settle(slot, placeholder, key_json, start(), self._release_lease)
+        return placeholder
+
+    async def single_flight_async(self, key: Hashable, start: Callable):
+        """``single_flight()`` for the event loop: ``start()`` returns a task.
+
+        The returned future belongs to the running loop; the lease is taken
+        on a thread so SQLite never blocks the loop.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (f"async-{id(loop)}", key)
+        placeholder, claimed = self._reserve(slot, loop.create_future())
+        if not claimed:
+            return placeholder
+        key_json = key_text(key)
+        leased = self.path is None or await asyncio.to_thread(self._acquire_lease, key_json)
+        if not leased:
+            with self._lock:
+                self.coalesced += 1
+            self._settle(slot, placeholder, key_json, None)
+            return ELSEWHERE
+
+        def release(key_json):
+            if self.path is not None:
+                loop.run_in_executor(None, self._release_lease, key_json)
+
+        self._settle(slot, placeholder, key_json, start(), release)
+        return placeholder
+
+    def _peek(self, key: Hashable) -> Optional[str]:
+        """``get()`` without counting a miss."""
+        now = time.time()
+        text = self._l1_get(key, now, peek=True)
+        return text if text is not None else self._l2_lookup(key, now, count_miss=False)
+
+    def poll(self, key: Hashable, timeout: float) -> Optional[str]:
+        """Wait up to ``timeout`` for another worker's result for ``key``."""
+        deadline = time.monotonic() + timeout
+        while True:
+            text = self._peek(key)
+            if text is not None or time.monotonic() >= deadline:
+                break
+            time.sleep(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+        if text is None:
+            with self._lock:
+                self.misses += 1
+        return text
+
+    async def poll_async(self, key: Hashable, timeout: float) -> Optional[str]:
+        """``poll()`` for the event loop; each L2 read runs on a thread."""
+        deadline = time.monotonic() + timeout
+        while True:
+            text = await asyncio.to_thread(self._peek, key)
+            if text is not None or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+        if text is None:
+            with self._lock:
+                self.misses += 1
+        return text
+
+    def clear(self):
+        """Empty both tiers and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._reset_counters()
+        self._l2("DELETE FROM advice")
+        self._l2("DELETE FROM leases")
+
+    def stats(self) -> Dict:
+        cursor = self._l2("SELECT COUNT(*) FROM advice WHERE expires >= ?", (time.time(),))
+        l2_size = cursor.fetchone()[0] if cursor is not None else None
+        with self._lock:
+            hits = self.l1_hits + self.l2_hits
+            lookups = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "l2_size": l2_size,
+                "l2_path": self.path,
+                "ttl": self.ttl,
+                "l1_hits": self.l1_hits,
+                "l2_hits": self.l2_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "generations": self.generations,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+                "l2_errors": self.l2_errors,
+            }
+
+
+advice_cache = AdviceCache()
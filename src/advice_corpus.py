@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Precomputed advice corpus: AI advice for common profile signatures, built
+offline by precompute_advice.py and memory-mapped by every worker.
+
+File layout (little-endian):
+
+- header: magic ``ADVC``, format version (u16), prompt version (u16),
+  entry count (u32), catalog version (12 bytes, ASCII, informational)
+- index: ``count`` records of (key hash u64, offset u32, key length u16,
+  text length u16), sorted by hash
+- data: for each record, the UTF-8 key (the signature as compact JSON)
+  followed by the UTF-8 advice text
+
+Lookups binary-search the index in the mapping and compare the stored key,
+so nothing is parsed at load time and forked workers share the pages.
+A file written for another ``PROMPT_VERSION`` is ignored.
+"""
+import asyncio
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from advice_cache import key_text
+from advice_prompt import PROMPT_VERSION, advice_signature, build_prompt
+
+MAGIC = b"ADVC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI12s")
+RECORD = struct.Struct("<QIHH")
+
+ADVICE_CORPUS_PATH = os.environ.get(
+    "ADVICE_CORPUS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "advice_corpus.bin"),
+)
+
+
+def _hash(key_bytes: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little")
+
+
+def write_corpus(path: str, entries: Dict[Hashable, str], catalog_version: str = ""):
+    """Write ``{signature: advice}`` to ``path`` atomically."""
+    records = []
+    for key, text in entries.items():
+        key_bytes = key_text(key).encode("utf-8")
+        text_bytes = text.encode("utf-8")
+        if len(key_bytes) > 0xFFFF or len(text_bytes) > 0xFFFF:
+            continue
+        records.append((_hash(key_bytes), key_bytes, text_bytes))
+    records.sort(key=lambda record: record[0])
+
+    offset = HEADER.size + RECORD.size * len(records)
+    index, data = [], []
+    for key_hash, key_bytes, text_bytes in records:
+        index.append(RECORD.pack(key_hash, offset, len(key_bytes), len(text_bytes)))
+        data.append(key_bytes + text_bytes)
+        offset += len(key_bytes) + len(text_bytes)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, PROMPT_VERSION, len(records),
+                         catalog_version.encode("ascii", "replace")[:12])
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(header)
+        fh.writelines(index)
+        fh.writelines(data)
+    os.replace(tmp, path)
+
+
+class AdviceCorpus:
+    """Read-only, memory-mapped view of an advice corpus file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._map = None
+        self.load(path)
+
+    def load(self, path: Optional[str]):
+        """(Re)map ``path``; a missing, foreign or stale file leaves it empty."""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            self.path = path
+            self.count = 0
+            self.catalog_version = ""
+            self.hits = 0
+            self.misses = 0
+            if path:
+                self._open(path)
+
+    def _open(self, path: str):
+        try:
+            with open(path, "rb") as fh:
+                mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Missing or empty file: every lookup misses
+            return
+        if len(mapping) < HEADER.size:
+            mapping.close()
+            return
+        magic, fmt, prompt_version, count, catalog_version = HEADER.unpack_from(mapping, 0)
+        if (magic != MAGIC or fmt != FORMAT_VERSION or prompt_version != PROMPT_VERSION
+                or len(mapping) < HEADER.size + RECORD.size * count):
+            mapping.close()
+            return
+        self._map = mapping
+        self.count = count
+        self.catalog_version = catalog_version.rstrip(b"\0").decode("ascii", "replace")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, key: Hashable) -> Optional[str]:
+        text = self._lookup(key) if self._map is not None else None
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def _lookup(self, key: Hashable) -> Optional[str]:
+        key_bytes = key_text(key).encode("utf-8")
+        key_hash = _hash(key_bytes)
+        mapping = self._map
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if RECORD.unpack_from(mapping, HEADER.size + RECORD.size * mid)[0] < key_hash:
+                lo = mid + 1
+            else:
+                hi = mid
+        # Equal hashes are adjacent; the stored key settles collisions
+        while lo < self.count:
+            found_hash, offset, key_len, text_len = RECORD.unpack_from(mapping, HEADER.size + RECORD.size * lo)
+            if found_hash != key_hash:
+                return None
+            if mapping[offset:offset + key_len] == key_bytes:
+                return mapping[offset + key_len:offset + key_len + text_len].decode("utf-8")
+            lo += 1
+        return None
+
+    def items(self):
+        """Yield ``(key JSON, advice)`` for every entry."""
+        for i in range(self.count):
+            _, offset, key_len, text_len = RECORD.unpack_from(self._map, HEADER.size + RECORD.size * i)
+            yield (self._map[offset:offset + key_len].decode("utf-8"),
+                   self._map[offset + key_len:offset + key_len + text_len].decode("utf-8"))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "entries": self.count,
+                "catalog_version": self.catalog_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+advice_corpus = AdviceCorpus()
+
+
+# -- Building ---------------------------------------------------------------
+
+def catalog_signatures(career_data: Dict, matcher) -> List[Tuple]:
+    """Signatures of every catalog career's skill set, with and without its category."""
+    signatures = []
+    for category, data in career_data.items():
+        for career in data["careers"]:
+            for interests in (category, ""):
+                profile = {"skills": list(career["skills"]), "interests": interests}
+                signatures.append(advice_signature(profile, matcher))
+    return list(dict.fromkeys(signatures))
+
+
+def common_signatures(profiles: Iterable[Dict], matcher, top: int) -> List[Tuple]:
+    """The ``top`` most frequent signatures among logged ``profiles``."""
+    counts = Counter(advice_signature(profile, matcher) for profile in profiles)
+    return [signature for signature, _ in counts.most_common(top)]
+
+
+async def generate_corpus(signatures: List[Tuple], generate_text_async: Callable, rate: float = 5.0,
+                          concurrency: int = 8, progress: Callable = None) -> Dict[Tuple, str]:
+    """Generate advice for ``signatures``: at most ``concurrency`` calls in
+    flight and ``rate`` calls started per second. Failed or empty generations
+    are left out."""
+    semaphore = asyncio.Semaphore(concurrency)
+    interval = 1.0 / rate if rate > 0 else 0.0
+    next_start = [time.monotonic()]
+    results = {}
+
+    async def one(signature):
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, next_start[0])
+            next_start[0] = start + interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            try:
+                text = await generate_text_async(build_prompt(signature))
+            except Exception:
+                text = None
+            if text and text.strip():
+                results[signature] = text.strip()
+            if progress is not None:
+                progress(signature, bool(text))
+
+    await asyncio.gather(*(one(signature) for signature in signatures))
+    return results
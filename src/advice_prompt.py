@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Name-free advice prompts.
+
+The model is asked for advice about a profile's signature, never about the
+person: the normalized, de-duplicated skills in sorted order, plus a coarse
+bucket of the interests (the catalog categories whose keywords they mention).
+Profiles with the same signature share one generation and one advice cache
+entry, whatever their name or the order they typed their skills in;
+``personalize`` adds the name locally.
+
+Bump ``PROMPT_VERSION`` when the prompt changes so cached advice for the old
+prompt is no longer used.
+"""
+import re
+from typing import Dict, Tuple
+
+from profile_features import tokenize
+
+PROMPT_VERSION = 2
+# Skills named in the prompt and the signature
+ADVICE_SKILLS = 5
+
+# Openers that read naturally after "<name>, "
+_YOU = re.compile(r"^(you|your|you're|you've|you'll)\b", re.IGNORECASE)
+
+
+def advice_signature(profile: Dict, matcher) -> Tuple:
+    """Cache key and prompt input: (version, skills, interest bucket)."""
+    skills = sorted({" ".join(skill.lower().split()) for skill in profile.get("skills", ())} - {""})
+    interests = matcher.text_categories(tokenize(str(profile.get("interests") or "")))
+    return (PROMPT_VERSION, tuple(skills[:ADVICE_SKILLS]), interests)
+
+
+def build_prompt(signature: Tuple) -> str:
+    _, skills, interests = signature
+    return (
+        "Write one short motivational sentence addressed to the reader as \"you\". "
+        + "They have skills: " + (", ".join(skills) or "none listed yet") + ". "
+        + "They are interested in " + (", ".join(interests) + " careers" if interests else "exploring career options") + ". "
+        + "Mention their interests briefly and be encouraging. Do not use a name."
+    )
+
+
+def personalize(text: str, name: str) -> str:
+    """Address name-free advice to ``name``."""
+    name = " ".join((name or "").split())
+    if not name:
+        return text
+    if _YOU.match(text):
+        return f"{name}, {text[0].lower()}{text[1:]}"
+    return f"{name}: {text}"
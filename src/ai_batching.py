@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Request coalescing for batched model predictions.
+
+Callers ``submit()`` single items and get a ``Future`` back. A dispatcher
+thread groups pending items and calls ``send_batch(items)`` once per group,
+flushing when ``max_batch`` items are waiting or ``linger_ms`` has passed
+since the first one arrived. Up to ``max_inflight`` batches are sent
+concurrently. The returned list is split back to the callers in order.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+
+class RequestCoalescer:
+    """Coalesce concurrent single-item calls into batched calls."""
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[Any]], List[Any]],
+        max_batch: int = 8,
+        linger_ms: float = 10.0,
+        name: str = "coalescer",
+        max_inflight: int = 4,
+    ):
+        self.send_batch = send_batch
+        self.max_batch = max(1, int(max_batch))
+        self.linger = max(0.0, linger_ms) / 1000.0
+        self.name = name
+        self.max_inflight = max(1, int(max_inflight))
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._senders = None
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+
+    def submit(self, item: Any) -> Future:
+        """Queue ``item`` for the next batch and return its future."""
+        future = Future()
+        self._ensure_dispatcher()
+        self._queue.put((item, future))
+        return future
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters plus fill ratio (items sent / batch capacity used)."""
+        with self._lock:
+            batches, items, errors = self._batches, self._items, self._errors
+        return {
+            "batches": batches,
+            "items": items,
+            "errors": errors,
+            "max_batch": self.max_batch,
+            "linger_ms": self.linger * 1000.0,
+            "avg_batch_size": items / batches if batches else 0.0,
+            "fill_ratio": items / (batches * self.max_batch) if batches else 0.0,
+        }
+
+    def _ensure_dispatcher(self):
+        # Started lazily so the thread is created in the process that uses it
+        # (not in a pre-fork parent).
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    if self._senders is None:
+                        self._senders = ThreadPoolExecutor(
+                            max_workers=self.max_inflight, thread_name_prefix=self.name
+                        )
+                    self._thread = threading.Thread(
+                        target=self._run, name=self.name, daemon=True
+                    )
+                    self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            self._senders.submit(self._send, self._collect())
+
+    def _send(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = list(self.send_batch(items))
+            if len(results) != len(items):
+                raise ValueError(
+                    f"{self.name}: expected {len(items)} results, got {len(results)}"
+                )
+        except Exception as exc:
+            logging.debug("%s: batch of %d failed", self.name, len(items), exc_info=True)
+            with self._lock:
+                self._batches += 1
+                self._items += len(items)
+                self._errors += 1
+            for _, future in batch:
+                if not future.cancelled():
+                    future.set_exception(exc)
+            return
+        with self._lock:
+            self._batches += 1
+            self._items += len(items)
+        for (_, future), result in zip(batch, results):
+            # A caller that gave up may have cancelled its future
+            if not future.cancelled():
+                future.set_result(result)
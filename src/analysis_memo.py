@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Memoized profile analysis.
+
+Apart from the advice and the date, an analysis result is a pure function
+of the profile, and many visitors submit near-identical profiles. Results
+are therefore kept per canonical profile: every field lowercased and
+whitespace-normalized, skills sorted and de-duplicated, the name left out.
+On a miss the analysis runs on that canonical profile, so any two profiles
+with the same fingerprint get the same analysis.
+
+The memo is a bounded LRU (``ANALYSIS_MEMO_MAX`` entries, 0 disables it)
+tied to one catalog version; a reloaded catalog empties it. Cached values
+are shared between requests and must be treated as read-only.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+ANALYSIS_MEMO_MAX = int(os.environ.get("ANALYSIS_MEMO_MAX", "1024"))
+
+FIELDS = ("education", "field", "interests", "career_goals", "timeline")
+
+
+def _normalize(text) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def canonical_profile(profile: Dict) -> Dict:
+    """The profile the analysis is computed from: normalized, name-free."""
+    canonical = {field: _normalize(profile.get(field)) for field in FIELDS}
+    canonical["skills"] = sorted({_normalize(skill) for skill in profile.get("skills", ())} - {""})
+    canonical["name"] = ""
+    return canonical
+
+
+def profile_fingerprint(profile: Dict) -> Tuple:
+    canonical = canonical_profile(profile)
+    return tuple(canonical[field] for field in FIELDS) + (tuple(canonical["skills"]),)
+
+
+class AnalysisMemo:
+    """LRU of analysis results for one catalog version, with hit/miss counters."""
+
+    def __init__(self, max_entries: int = ANALYSIS_MEMO_MAX):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Tuple, version: str) -> Optional[Dict]:
+        with self._lock:
+            if version != self._version:
+                self._reset(version)
+            analysis = self._entries.get(key)
+            if analysis is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return analysis
+
+    def put(self, key: Tuple, version: str, analysis: Dict):
+        with self._lock:
+            if version != self._version:
+                self._reset(version)
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _reset(self, version: str):
+        if self._version is not None:
+            self.invalidations += 1
+        self._entries.clear()
+        self._version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "catalog_version": self._version,
+            }
+
+
+analysis_memo = AnalysisMemo()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Static asset pipeline: build step and runtime manifest.
+
+``build()`` (run by ``build_assets.py`` at deploy time) minifies the CSS and
+JavaScript under ``static/``, writes content-hashed copies to
+``static/dist/`` together with ``.gz`` (and ``.br`` when the ``brotli``
+package is installed) siblings, and records the mapping in
+``static/dist/manifest.json``.
+
+At runtime ``AssetManifest`` loads that manifest, provides an ``asset_url``
+template helper that resolves ``css/style.css`` to its hashed URL, and serves
+``/assets/<hashed name>`` with the best precompressed variant and a
+year-long immutable ``Cache-Control``. Without a manifest (no build step),
+in debug mode, or for a source edited after the last build, ``asset_url``
+falls back to the plain ``/static/`` URL.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from flask import abort, request, send_file, url_for
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSETS = ("css/style.css", "js/app.js")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+# ---------------------------------------------------------------------------
+# Minifiers
+# ---------------------------------------------------------------------------
+
+# Whitespace next to these is never significant ("a :hover" is, so ':' is not here)
+_CSS_TIGHT = set("{};,>")
+
+
+def minify_css(source: str) -> str:
+    """Drop comments and redundant whitespace, leaving strings untouched."""
+    out = []
+    i, n = 0, len(source)
+    while i < n:
+        ch = source[i]
+        if ch in "\"'":
+            end = i + 1
+            while end < n and source[end] != ch:
+                end += 2 if source[end] == "\\" else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif ch.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            prev = out[-1] if out else ""
+            if prev and prev not in _CSS_TIGHT and i < n and source[i] not in _CSS_TIGHT:
+                out.append(" ")
+        else:
+            if ch == "}" and out and out[-1] == ";":
+                out.pop()
+            if ch in _CSS_TIGHT and out and out[-1] == " ":
+                out.pop()
+            out.append(ch)
+            i += 1
+    return "".join(out).strip()
+
+
+# Characters after which a '/' starts a regex literal rather than a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "yield")
+
+
+def minify_js(source: str) -> str:
+    """Conservative JavaScript minifier.
+
+    Removes comments, indentation, trailing whitespace and blank lines while
+    copying strings, template literals (including nested ``${}``) and regex
+    literals verbatim. Line breaks are kept so automatic semicolon insertion
+    behaves exactly as before.
+    """
+    out = []
+    i, n = 0, len(source)
+    # Brace depth per open "${" so we know when to resume the template literal
+    template_stack = []
+    brace_depth = 0
+
+    def last_significant():
+        # Tail of the output so far, enough to spot a preceding keyword
+        return "".join(out[-32:]).rstrip()
+
+    def copy_template(start):
+        # Copy a template literal from `start` up to its end or up to "${"
+        j = start
+        while j < n:
+            if source[j] == "\\":
+                j += 2
+                continue
+            if source[j] == "`":
+                return j + 1, False
+            if source.startswith("${", j):
+                return j + 2, True
+            j += 1
+        return n, False
+
+    while i < n:
+        ch = source[i]
+        if ch in "\"'":
+            end = i + 1
+            while end < n and source[end] != ch and source[end] != "\n":
+                end += 2 if source[end] == "\\" else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif ch == "`":
+            end, opened = copy_template(i + 1)
+            out.append(source[i:end])
+            i = end
+            if opened:
+                template_stack.append(brace_depth)
+        elif ch == "}" and template_stack and brace_depth == template_stack[-1]:
+            template_stack.pop()
+            end, opened = copy_template(i + 1)
+            out.append(source[i:end])
+            i = end
+            if opened:
+                template_stack.append(brace_depth)
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif ch == "/":
+            prev = last_significant()
+            is_regex = not prev or prev[-1] in _REGEX_PRECEDERS or any(
+                re.search(r"(^|[^\w$])" + kw + r"$", prev) for kw in _REGEX_KEYWORDS
+            )
+            if not is_regex:
+                out.append(ch)
+                i += 1
+                continue
+            end, in_class = i + 1, False
+            while end < n and source[end] != "\n":
+                c = source[end]
+                if c == "\\":
+                    end += 2
+                    continue
+                if c == "[":
+                    in_class = True
+                elif c == "]":
+                    in_class = False
+                elif c == "/" and not in_class:
+                    break
+                end += 1
+            end += 1
+            while end < n and (source[end].isalnum()):
+                end += 1
+            out.append(source[i:end])
+            i = end
+        else:
+            if ch == "{":
+                brace_depth += 1
+            elif ch == "}":
+                brace_depth -= 1
+            out.append(ch)
+            i += 1
+
+    lines = (line.strip() for line in "".join(out).split("\n"))
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Build step
+# ---------------------------------------------------------------------------
+
+def _hashed_name(name: str, data: bytes) -> str:
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def build(static_dir: str, assets=ASSETS) -> dict:
+    """Minify, fingerprint and precompress ``assets``; return the manifest."""
+    dist = os.path.join(static_dir, DIST_DIR)
+    manifest = {}
+    for name in assets:
+        with open(os.path.join(static_dir, name), "r", encoding="utf-8") as fh:
+            source = fh.read()
+        minified = minify_css(source) if name.endswith(".css") else minify_js(source)
+        data = minified.encode("utf-8")
+        hashed = _hashed_name(name, data)
+        target = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as fh:
+            fh.write(data)
+        with open(target + ".gz", "wb") as fh:
+            fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if BROTLI_AVAILABLE:
+            with open(target + ".br", "wb") as fh:
+                fh.write(brotli.compress(data))
+        manifest[name] = hashed
+
+    with open(os.path.join(dist, MANIFEST_NAME), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Runtime
+# ---------------------------------------------------------------------------
+
+class AssetManifest:
+    """Resolves and serves fingerprinted assets for a Flask app."""
+
+    def __init__(self, app):
+        self.app = app
+        self.dist_dir = os.path.join(app.static_folder, DIST_DIR)
+        manifest_path = os.path.join(self.dist_dir, MANIFEST_NAME)
+        manifest = {}
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+            built_ns = os.stat(manifest_path).st_mtime_ns
+        except (OSError, ValueError):
+            built_ns = 0
+        # Hashed files stay servable, but sources edited since the last build
+        # resolve to /static/ so the edit is not silently ignored
+        self.manifest = {
+            name: hashed for name, hashed in manifest.items()
+            if not self._source_newer(name, built_ns)
+        }
+        self._served = set(manifest.values())
+        app.add_template_global(self.asset_url, "asset_url")
+        app.add_url_rule("/assets/<path:filename>", "assets", self.serve)
+
+    def _source_newer(self, name: str, built_ns: int) -> bool:
+        try:
+            return os.stat(os.path.join(self.app.static_folder, name)).st_mtime_ns > built_ns
+        except OSError:
+            return False
+
+    def asset_url(self, filename: str) -> str:
+        """``url_for('static', filename=...)`` that prefers the built asset.
+
+        In debug mode the source file is always used, so edits show up
+        without rerunning ``build_assets.py``.
+        """
+        hashed = None if self.app.debug else self.manifest.get(filename)
+        if hashed is None:
+            return url_for("static", filename=filename)
+        return url_for("assets", filename=hashed)
+
+    def serve(self, filename: str):
+        if filename not in self._served:
+            abort(404)
+        path = os.path.join(self.dist_dir, filename)
+        encoding = None
+        for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if request.accept_encodings[candidate] and os.path.exists(path + suffix):
+                encoding = candidate
+                break
+        response = send_file(
+            path + {"br": ".br", "gzip": ".gz"}[encoding] if encoding else path,
+            mimetype="text/css" if filename.endswith(".css") else "text/javascript",
+            etag=False,
+            conditional=False,
+            max_age=None,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = IMMUTABLE
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -4,54 +4,230 @@ Personalized Career and Skills Advisor
 A tool to help students and young professionals discover career paths and develop skills.
 """
 
+import asyncio
 import json
+import os
+import random
 from typing import Dict, List, Tuple
 from datetime import datetime
 
 import concurrent.futures
+import threading
+import time
 
+from advice_cache import ELSEWHERE, advice_cache
+from advice_corpus import advice_corpus
+from advice_prompt import advice_signature, build_prompt, personalize
+from catalog import get_catalog
+from matching import CareerMatcher
+from profile_features import ProfileFeatures, contains_phrase, phrase
+from vector_scoring import NUMPY_AVAILABLE, VectorScorer
 
-ADVICE_CACHE = {}
+
+# Deadline for a request's analysis, AI advice included, before the
+# local pool is used instead
+ADVICE_TIMEOUT = float(os.environ.get("ADVICE_TIMEOUT", "0.8"))
+# Threads in the long-lived advice executor
+ADVICE_MAX_WORKERS = int(os.environ.get("ADVICE_MAX_WORKERS", "4"))
+# Generations allowed in flight (running or queued) before new ones are skipped
+ADVICE_MAX_PENDING = int(os.environ.get("ADVICE_MAX_PENDING", "16"))
+
+_advice_executor = None
+_advice_executor_lock = threading.Lock()
+_advice_slots = threading.BoundedSemaphore(ADVICE_MAX_PENDING)
+
+# Async generations allowed in flight per process (they cost no threads, so
+# this is much higher; gcloud_ai.VERTEX_MAX_CONCURRENCY bounds actual calls)
+ADVICE_ASYNC_MAX_PENDING = int(os.environ.get("ADVICE_ASYNC_MAX_PENDING", "2000"))
+_advice_tasks = set()
+
+# Whole-token terms (see profile_features.py) the rule-based stages look for
+TECH_TERMS = ("python", "javascript", "programming", "coding")
+WEB_TERMS = ("web", "html", "css", "javascript")
+CODING_TERMS = ("python", "programming", "coding")
+DATA_TERMS = ("ai", "data", "analytics")
+
+# Free learning resources per category
+RESOURCES = {
+    "Programming": [
+        "freeCodeCamp - Complete web development curriculum",
+        "Codecademy - Interactive coding lessons",
+        "Python.org Tutorial - Official Python documentation",
+        "GitHub - Practice with open source projects"
+    ],
+    "Cybersecurity": [
+        "Cybrary - Free cybersecurity training courses",
+        "SANS Cyber Aces - Free hands-on cybersecurity tutorials",
+        "TryHackMe - Interactive security challenges",
+        "HackTheBox - Penetration testing practice",
+        "OWASP - Web application security resources"
+    ],
+    "Data Science": [
+        "Kaggle Learn - Free micro-courses in data science",
+        "Coursera Audit - Data Science courses (audit for free)",
+        "YouTube: StatQuest - Statistics and ML concepts",
+        "Google AI Education - Machine learning crash course"
+    ],
+    "Design": [
+        "Figma Academy - Free design tutorials",
+        "Adobe Creative Cloud Tutorials - Free design resources",
+        "Dribbble - Design inspiration and tutorials",
+        "Google UX Design Certificate - Professional certificate"
+    ],
+    "Business": [
+        "Google Digital Marketing Courses - Free certification",
+        "HubSpot Academy - Free marketing and sales courses",
+        "Coursera Business Courses - Audit mode available",
+        "Khan Academy - Business and economics fundamentals"
+    ],
+    "General": [
+        "LinkedIn Learning - Often free through libraries",
+        "YouTube - Vast collection of tutorial videos",
+        "edX - Free courses from top universities",
+        "Coursera - Audit courses for free"
+    ]
+}
+
+# (category, resources taken, terms), first matching category wins
+RESOURCE_RULES = (
+    ("Programming", 2, ("python", "javascript", "programming", "coding", "git")),
+    ("Cybersecurity", 3, ("security", "penetration", "vulnerability", "forensics", "network security")),
+    ("Data Science", 2, ("data", "analytics", "statistics", "ml", "machine learning")),
+    ("Design", 2, ("design", "figma", "ui", "ux", "prototyping")),
+    ("Business", 2, ("marketing", "business", "strategy", "communication")),
+)
+
+# Catalog skills seen so far -> their resources; skills come from a fixed catalog
+_skill_resources = {}
+
+
+def _resources_for_skill(skill: str) -> Tuple[str, ...]:
+    """The resources a required skill contributes (memoized per skill)."""
+    found = _skill_resources.get(skill)
+    if found is None:
+        skill_phrase = phrase(skill)
+        found = ()
+        for category, count, terms in RESOURCE_RULES:
+            if any(contains_phrase(skill_phrase, term) for term in terms):
+                found = tuple(RESOURCES[category][:count])
+                break
+        _skill_resources[skill] = found
+    return found
+
+
+# Local fallback advice pool
+ADVICE_POOL = [
+    "🚀 Remember: Every expert was once a beginner. Start where you are, use what you have!",
+    "💡 Focus on building one skill at a time. Consistency beats intensity every time.",
+    "🎯 Set small, achievable daily goals. Progress compounds over time!",
+    "🤝 Network genuinely - help others and opportunities will come your way.",
+    "📈 Document your learning journey. Your future self will thank you!"
+]
+
+
+def _get_advice_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the process-wide advice executor, creating it on first use."""
+    global _advice_executor
+    if _advice_executor is None:
+        with _advice_executor_lock:
+            if _advice_executor is None:
+                _advice_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=ADVICE_MAX_WORKERS, thread_name_prefix="advice"
+                )
+    return _advice_executor
+
+
+def _known_advice(cache_key):
+    """Precomputed (see advice_corpus.py) or cached AI advice, if any."""
+    return advice_corpus.get(cache_key) or advice_cache.get(cache_key)
+
+
+def _submit_advice(generate_text, prompt: str, cache_key):
+    """Start an AI generation in the background.
+
+    Returns the future, or None when ADVICE_MAX_PENDING generations are
+    already in flight. Whenever the generation finishes, even after the
+    caller stopped waiting, its result is stored in the advice cache so the
+    next identical profile gets the AI answer.
+    """
+    if not _advice_slots.acquire(blocking=False):
+        return None
+    try:
+        future = _get_advice_executor().submit(generate_text, prompt, None, None, None, 60)
+    except RuntimeError:
+        # Executor shut down (interpreter exit)
+        _advice_slots.release()
+        return None
+
+    def _store(done):
+        _advice_slots.release()
+        try:
+            gen = done.result()
+        except Exception:
+            return
+        if gen:
+            advice_cache.put(cache_key, gen.strip())
+
+    future.add_done_callback(_store)
+    return future
+
+
+def _submit_advice_async(generate_text_async, prompt: str, cache_key):
+    """Async counterpart of ``_submit_advice``: start the generation as a task.
+
+    Returns the task, or None when ADVICE_ASYNC_MAX_PENDING generations are
+    in flight. The task keeps running after the caller's timeout and caches
+    its result like the threaded version (on a thread, as the cache writes
+    SQLite).
+    """
+    if len(_advice_tasks) >= ADVICE_ASYNC_MAX_PENDING:
+        return None
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(generate_text_async(prompt, None, None, None, 60))
+    _advice_tasks.add(task)
+
+    def _store(done):
+        _advice_tasks.discard(done)
+        if done.cancelled() or done.exception() is not None:
+            return
+        gen = done.result()
+        if gen:
+            loop.run_in_executor(None, advice_cache.put, cache_key, gen.strip())
+
+    task.add_done_callback(_store)
+    return task
 
 
 class CareerAdvisor:
     def __init__(self):
         self.user_profile = {}
+        self.catalog = get_catalog()
+        self._matcher = None
+        self._vector_scorer = None
+        self._features = None
         self.career_data = self._load_career_data()
         
     def _load_career_data(self) -> Dict:
-        """Load predefined career paths and skills data."""
-        return {
-            "tech": {
-                "careers": [
-                    {"name": "Software Developer", "skills": ["Python", "JavaScript", "Git", "Problem Solving"], "keywords": ["programming", "coding", "development"]},
-                    {"name": "Data Scientist", "skills": ["Python", "Statistics", "Machine Learning", "SQL"], "keywords": ["data", "analytics", "ai", "machine learning"]},
-                    {"name": "Web Developer", "skills": ["HTML", "CSS", "JavaScript", "React", "Node.js"], "keywords": ["web", "frontend", "backend", "website"]},
-                    {"name": "DevOps Engineer", "skills": ["Linux", "Docker", "Kubernetes", "AWS", "CI/CD"], "keywords": ["devops", "deployment", "cloud", "infrastructure"]}
-                ]
-            },
-            "security": {
-                "careers": [
-                    {"name": "Cybersecurity Analyst", "skills": ["Network Security", "Risk Assessment", "Security Tools", "Incident Response"], "keywords": ["cybersecurity", "security", "cyber", "infosec"]},
-                    {"name": "Ethical Hacker", "skills": ["Penetration Testing", "Vulnerability Assessment", "Kali Linux", "Python"], "keywords": ["ethical hacker", "pentesting", "hacking", "penetration"]},
-                    {"name": "Security Engineer", "skills": ["Security Architecture", "Cryptography", "Network Protocols", "Security Frameworks"], "keywords": ["security engineer", "security architect", "infosec"]},
-                    {"name": "Forensic Analyst", "skills": ["Digital Forensics", "Investigation Tools", "Data Recovery", "Legal Procedures"], "keywords": ["forensics", "investigation", "digital forensics"]}
-                ]
-            },
-            "business": {
-                "careers": [
-                    {"name": "Product Manager", "skills": ["Strategy", "Analytics", "Communication", "Agile"], "keywords": ["product", "management", "strategy"]},
-                    {"name": "Digital Marketing", "skills": ["SEO", "Content Marketing", "Analytics", "Social Media"], "keywords": ["marketing", "digital marketing", "seo"]},
-                    {"name": "Business Analyst", "skills": ["Excel", "SQL", "Process Mapping", "Requirements Analysis"], "keywords": ["business analyst", "analysis", "requirements"]}
-                ]
-            },
-            "design": {
-                "careers": [
-                    {"name": "UX/UI Designer", "skills": ["Figma", "User Research", "Prototyping", "Design Systems"], "keywords": ["ux", "ui", "design", "user experience"]},
-                    {"name": "Graphic Designer", "skills": ["Adobe Creative Suite", "Typography", "Branding", "Layout"], "keywords": ["graphic design", "visual design", "branding"]}
-                ]
-            }
-        }
+        """Return the shared, read-only career catalog (see catalog.py)."""
+        return self.catalog.data
+    
+    def _get_matcher(self) -> CareerMatcher:
+        """Return the compiled matcher for this instance's catalog."""
+        if self.career_data is self.catalog.data:
+            return self.catalog.matcher
+        if self._matcher is None:
+            self._matcher = CareerMatcher(self.career_data)
+        return self._matcher
+    
+    def profile_features(self) -> ProfileFeatures:
+        """Return the features of ``self.user_profile``, derived once per profile."""
+        matcher = self._get_matcher()
+        cached = self._features
+        if cached is not None and cached[0] is self.user_profile and cached[1] is matcher:
+            return cached[2]
+        features = ProfileFeatures(self.user_profile, matcher)
+        self._features = (self.user_profile, matcher, features)
+        return features
     
     def collect_user_info(self):
         """Collect user background information."""
@@ -71,22 +247,23 @@ class CareerAdvisor:
         self.user_profile["career_goals"] = input("What are your career goals? ")
         self.user_profile["timeline"] = input("When do you want to achieve these goals? (e.g., 1 year, 3 years): ")
         
+        self._features = None
         print(f"\nThanks {self.user_profile['name']}! Let me analyze your profile...")
     
     def analyze_profile(self) -> Tuple[List[str], List[str]]:
         """Analyze user profile to identify strengths and growth areas."""
         strengths = []
         growth_areas = []
+        features = self.profile_features()
         
         # Basic analysis based on skills and interests
         if len(self.user_profile["skills"]) >= 3:
             strengths.append("Strong skill foundation")
         
-        if any(tech_skill in " ".join(self.user_profile["skills"]).lower() 
-               for tech_skill in ["python", "javascript", "programming", "coding"]):
+        if features.has_any(features.skill_set, TECH_TERMS):
             strengths.append("Technical aptitude")
         
-        if "communication" in self.user_profile["interests"].lower():
+        if "communication" in features.interest_set:
             strengths.append("Communication-oriented")
             
         # Suggest growth areas
@@ -96,54 +273,54 @@ class CareerAdvisor:
     
     def suggest_careers(self) -> List[Dict]:
         """Suggest relevant career paths based on user profile."""
-        suggested_careers = []
-        user_interests = self.user_profile["interests"].lower()
-        user_skills = " ".join(self.user_profile["skills"]).lower()
-        user_goals = self.user_profile["career_goals"].lower()
-        
-        # Combine interests and goals for better matching
-        user_text = f"{user_interests} {user_goals}"
-        
-        # Score and match careers based on interests, goals, and skills
-        career_scores = []
-        
-        for category, data in self.career_data.items():
-            for career in data["careers"]:
-                score = 0
-                
-                # Check keyword matches in interests and goals
-                for keyword in career["keywords"]:
-                    if keyword in user_text:
-                        score += 10
-                
-                # Check skill matches
-                for skill in career["skills"]:
-                    if skill.lower() in user_skills:
-                        score += 5
-                
-                # Check category match
-                if category in user_text:
-                    score += 3
-                
-                # Special bonus for exact career name match in goals
-                if career["name"].lower() in user_goals:
-                    score += 15
-                
-                if score > 0:
-                    career_scores.append((score, career))
-        
-        # Sort by score and get top matches
-        career_scores.sort(key=lambda x: x[0], reverse=True)
-        suggested_careers = [career for score, career in career_scores[:5]]
+        features = self.profile_features()
+        
+        # Score only the careers the profile actually hits, via the compiled index
+        matcher = self._get_matcher()
+        career_scores = matcher.score(features)
+        return self._resolve_suggestions(matcher.top(career_scores, 5), features)
+    
+    def suggest_careers_batch(self, profiles: List[Dict], backend: str = None) -> List[List[Dict]]:
+        """Suggest careers for many profiles at once.
+        
+        ``backend`` is ``"python"`` (compiled matcher per profile) or
+        ``"numpy"`` (one sparse matrix product for the whole batch), defaulting
+        to the ``CAREER_SCORING_BACKEND`` environment variable. Both give the
+        same results as calling ``suggest_careers`` per profile.
+        """
+        backend = backend or os.environ.get("CAREER_SCORING_BACKEND", "python")
+        matcher = self._get_matcher()
+        features = [ProfileFeatures(profile, matcher) for profile in profiles]
+        if backend == "numpy" and NUMPY_AVAILABLE:
+            if self.career_data is self.catalog.data:
+                scorer = self.catalog.vector_scorer()
+            else:
+                if self._vector_scorer is None or self._vector_scorer.matcher is not matcher:
+                    self._vector_scorer = VectorScorer(matcher)
+                scorer = self._vector_scorer
+            top = scorer.top_positions(features, 5)
+        else:
+            top = [matcher.top(matcher.score(f), 5) for f in features]
+        return [
+            self._resolve_suggestions(positions, f)
+            for positions, f in zip(top, features)
+        ]
+    
+    def _resolve_suggestions(self, positions: List[Tuple[str, int]], features: ProfileFeatures) -> List[Dict]:
+        """Turn ranked catalog positions into careers, applying the fallbacks."""
+        suggested_careers = [
+            self.career_data[category]["careers"][pos]
+            for category, pos in positions
+        ]
         
         # If no good matches, suggest careers based on existing skills
         if not suggested_careers:
             # Fallback based on user skills
-            if any(skill in user_skills for skill in ["web", "html", "css", "javascript"]):
+            if features.has_any(features.skill_set, WEB_TERMS):
                 suggested_careers.append(self.career_data["tech"]["careers"][2])  # Web Developer
-            if any(skill in user_skills for skill in ["python", "programming", "coding"]):
+            if features.has_any(features.skill_set, CODING_TERMS):
                 suggested_careers.append(self.career_data["tech"]["careers"][0])  # Software Developer
-            if any(skill in user_skills for skill in ["ai", "data", "analytics"]):
+            if features.has_any(features.skill_set, DATA_TERMS):
                 suggested_careers.append(self.career_data["tech"]["careers"][1])  # Data Scientist
         
         # Final fallback
@@ -158,63 +335,13 @@ class CareerAdvisor:
     
     def recommend_resources(self, skills: List[str]) -> Dict[str, List[str]]:
         """Recommend free learning resources for required skills."""
-        resources = {
-            "Programming": [
-                "freeCodeCamp - Complete web development curriculum",
-                "Codecademy - Interactive coding lessons",
-                "Python.org Tutorial - Official Python documentation",
-                "GitHub - Practice with open source projects"
-            ],
-            "Cybersecurity": [
-                "Cybrary - Free cybersecurity training courses",
-                "SANS Cyber Aces - Free hands-on cybersecurity tutorials",
-                "TryHackMe - Interactive security challenges",
-                "HackTheBox - Penetration testing practice",
-                "OWASP - Web application security resources"
-            ],
-            "Data Science": [
-                "Kaggle Learn - Free micro-courses in data science",
-                "Coursera Audit - Data Science courses (audit for free)",
-                "YouTube: StatQuest - Statistics and ML concepts",
-                "Google AI Education - Machine learning crash course"
-            ],
-            "Design": [
-                "Figma Academy - Free design tutorials",
-                "Adobe Creative Cloud Tutorials - Free design resources",
-                "Dribbble - Design inspiration and tutorials",
-                "Google UX Design Certificate - Professional certificate"
-            ],
-            "Business": [
-                "Google Digital Marketing Courses - Free certification",
-                "HubSpot Academy - Free marketing and sales courses",
-                "Coursera Business Courses - Audit mode available",
-                "Khan Academy - Business and economics fundamentals"
-            ],
-            "General": [
-                "LinkedIn Learning - Often free through libraries",
-                "YouTube - Vast collection of tutorial videos",
-                "edX - Free courses from top universities",
-                "Coursera - Audit courses for free"
-            ]
-        }
-        
         # Return relevant resources based on skills
         relevant_resources = []
         for skill in skills:
-            skill_lower = skill.lower()
-            if any(prog in skill_lower for prog in ["python", "javascript", "programming", "coding", "git"]):
-                relevant_resources.extend(resources["Programming"][:2])
-            elif any(sec in skill_lower for sec in ["security", "penetration", "vulnerability", "forensics", "network security"]):
-                relevant_resources.extend(resources["Cybersecurity"][:3])
-            elif any(data in skill_lower for data in ["data", "analytics", "statistics", "ml", "machine learning"]):
-                relevant_resources.extend(resources["Data Science"][:2])
-            elif any(design in skill_lower for design in ["design", "figma", "ui", "ux", "prototyping"]):
-                relevant_resources.extend(resources["Design"][:2])
-            elif any(biz in skill_lower for biz in ["marketing", "business", "strategy", "communication"]):
-                relevant_resources.extend(resources["Business"][:2])
+            relevant_resources.extend(_resources_for_skill(skill))
         
         if not relevant_resources:
-            relevant_resources = resources["General"][:3]
+            relevant_resources = RESOURCES["General"][:3]
             
         return {"recommended": list(set(relevant_resources))}
     
@@ -257,8 +384,26 @@ class CareerAdvisor:
         
         return roadmap
     
-    def generate_advice(self) -> str:
-        """Generate personalized motivational advice."""
+    def _advice_request(self, profile: Dict = None):
+        """Prompt and advice cache key for ``profile`` (default: the current one).
+        
+        Both are built from the profile's name-free signature (see
+        advice_prompt.py), so equivalent profiles share one AI generation.
+        """
+        if profile is None:
+            profile = self.user_profile
+        cache_key = advice_signature(profile, self._get_matcher())
+        return build_prompt(cache_key), cache_key
+
+    def start_advice(self, profiles: List[Dict] = None, submit: bool = True):
+        """Start producing advice for ``profiles`` (default: the current one).
+        
+        Known advice (precomputed corpus, then cache) is resolved at once and
+        misses are submitted to the model in the background, so the caller can
+        do other work before collecting the results with ``finish_advice``.
+        With ``submit=False`` nothing new is submitted: only generations
+        already running (here or in another worker) are waited for.
+        """
         # Try to generate a short personalized advice string using Google
         # Cloud Vertex AI if available. Otherwise fall back to a local pool.
         try:
@@ -268,60 +413,129 @@ class CareerAdvisor:
             def is_available():
                 return False
 
-        # Build a compact prompt using the user's profile for context.
-        short_skills = ", ".join(self.user_profile.get('skills', [])[:5])
-        prompt = (
-            "Write one short motivational sentence for a user named "
-            + f"{self.user_profile.get('name', 'Learner')}. "
-            + "They have skills: " + short_skills + ". "
-            + "Mention their interests briefly and be encouraging."
-        )
-
-        # Simple cache key to avoid repeated external calls for same profile
-        cache_key = (tuple(self.user_profile.get('skills', [])[:5]),
-                     self.user_profile.get('interests', ''),
-                     self.user_profile.get('name', ''))
-
-        cached = ADVICE_CACHE.get(cache_key)
+        if profiles is None:
+            profiles = [self.user_profile]
+        advice = [None] * len(profiles)
+        pending = {}
+        remote = {}
+        use_ai = bool(generate_text) and is_available()
+        for i, profile in enumerate(profiles):
+            prompt, cache_key = self._advice_request(profile)
+            cached = _known_advice(cache_key)
+            advice[i] = cached and personalize(cached, profile.get('name', ''))
+            if advice[i] or not (use_ai or not submit):
+                continue
+            # Concurrent misses for the same key share one generation
+            future = advice_cache.single_flight(
+                cache_key,
+                (lambda: _submit_advice(generate_text, prompt, cache_key)) if submit else (lambda: None),
+            )
+            if future is ELSEWHERE:
+                # Another worker is generating it: watch the shared cache
+                remote.setdefault(cache_key, []).append(i)
+            elif future is not None:
+                pending.setdefault(future, []).append(i)
+        return profiles, advice, pending, remote
+
+    def finish_advice(self, started, timeout: float = None) -> List[str]:
+        """Wait up to ``timeout`` (default ADVICE_TIMEOUT) for ``start_advice``'s
+        generations; late, skipped or failed ones get local advice, and late
+        results still land in the advice cache."""
+        profiles, advice, pending, remote = started
+        timeout = ADVICE_TIMEOUT if timeout is None else max(0.0, timeout)
+        deadline = time.monotonic() + timeout
+        if pending:
+            done, _ = concurrent.futures.wait(pending, timeout=timeout)
+            for future in done:
+                try:
+                    gen = future.result()
+                except Exception:
+                    # Any error should not block returning local advice
+                    continue
+                if gen:
+                    for i in pending[future]:
+                        advice[i] = personalize(gen.strip(), profiles[i].get('name', ''))
+        for cache_key, indices in remote.items():
+            gen = advice_cache.poll(cache_key, max(0.0, deadline - time.monotonic()))
+            if gen:
+                for i in indices:
+                    advice[i] = personalize(gen, profiles[i].get('name', ''))
+
+        return [text or random.choice(ADVICE_POOL) for text in advice]
+
+    def generate_advice(self) -> str:
+        """Generate personalized motivational advice."""
+        return self.finish_advice(self.start_advice())[0]
+
+    def generate_advice_batch(self, profiles: List[Dict]) -> List[str]:
+        """Advice for many profiles under a single ADVICE_TIMEOUT deadline.
+
+        Every generation is submitted up front and they are awaited together,
+        so a batch waits at most one timeout rather than one per profile.
+        """
+        return self.finish_advice(self.start_advice(profiles))
+
+    async def start_advice_async(self, submit: bool = True):
+        """``start_advice()`` for the async app; SQLite reads run on a thread."""
+        try:
+            from gcloud_ai import generate_text_async, is_available
+        except Exception:
+            generate_text_async = None
+            def is_available():
+                return False
+
+        prompt, cache_key = self._advice_request()
+        name = self.user_profile.get('name', '')
+        cached = advice_corpus.get(cache_key) or await advice_cache.get_async(cache_key)
         if cached:
-            return cached
+            return name, personalize(cached, name), None, cache_key
 
-        if is_available() and generate_text:
+        task = None
+        if (is_available() and generate_text_async) or not submit:
+            # Tasks can only be awaited on the loop that runs them
+            task = await advice_cache.single_flight_async(
+                cache_key,
+                (lambda: _submit_advice_async(generate_text_async, prompt, cache_key)) if submit else (lambda: None),
+            )
+        return name, None, task, cache_key
+
+    async def finish_advice_async(self, started, timeout: float = None) -> str:
+        """``finish_advice()`` for the async app; waits without a thread."""
+        name, text, task, cache_key = started
+        if text:
+            return text
+        timeout = ADVICE_TIMEOUT if timeout is None else max(0.0, timeout)
+        if task is ELSEWHERE:
+            gen = await advice_cache.poll_async(cache_key, timeout)
+            if gen:
+                return personalize(gen, name)
+        elif task is not None:
             try:
-                # Run the generation in a thread and wait briefly for result.
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
-                    future = ex.submit(generate_text, prompt, None, None, None, 60)
-                    try:
-                        gen = future.result(timeout=0.8)
-                        if gen:
-                            out = gen.strip()
-                            ADVICE_CACHE[cache_key] = out
-                            return out
-                    except concurrent.futures.TimeoutError:
-                        # Fall back quickly if external service is slow
-                        pass
+                # shield(): timing out must not cancel the generation
+                gen = await asyncio.wait_for(asyncio.shield(task), timeout)
+                if gen:
+                    return personalize(gen.strip(), name)
+            except asyncio.TimeoutError:
+                pass
             except Exception:
-                # Any error should not block returning local advice
                 pass
 
-        # Local fallback advice pool
-        advice_pool = [
-            "🚀 Remember: Every expert was once a beginner. Start where you are, use what you have!",
-            "💡 Focus on building one skill at a time. Consistency beats intensity every time.",
-            "🎯 Set small, achievable daily goals. Progress compounds over time!",
-            "🤝 Network genuinely - help others and opportunities will come your way.",
-            "📈 Document your learning journey. Your future self will thank you!"
-        ]
+        return random.choice(ADVICE_POOL)
 
-        import random
-        return random.choice(advice_pool)
+    async def generate_advice_async(self) -> str:
+        """``generate_advice()`` for the async app; waits without a thread."""
+        return await self.finish_advice_async(await self.start_advice_async())
     
     def run_analysis(self):
         """Run complete career analysis and provide recommendations."""
         # Collect user information
         self.collect_user_info()
         
-        # Perform analysis
+        # The advice only needs the profile: let the model work during the analysis
+        started = self.start_advice()
+        
+        # Perform analysis; every stage shares one ProfileFeatures
+        self.profile_features()
         strengths, growth_areas = self.analyze_profile()
         career_suggestions = self.suggest_careers()
         
@@ -332,7 +546,7 @@ class CareerAdvisor:
         
         resources = self.recommend_resources(all_skills)
         roadmap = self.create_roadmap(career_suggestions)
-        advice = self.generate_advice()
+        advice = self.finish_advice(started)[0]
         
         # Display results
         self.display_results(strengths, growth_areas, career_suggestions, resources, roadmap, advice)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Process-wide career catalog.
+
+The catalog is read once from ``data/careers.json`` (or the file named by
+``CAREER_CATALOG_PATH``), frozen into read-only mappings and tuples, and
+shared by every ``CareerAdvisor`` instance in the process. Loading it before
+gunicorn forks (``--preload``) lets workers share the pages copy-on-write.
+
+When the file's mtime changes the catalog is rebuilt off to the side and then
+swapped in with a single reference assignment, so readers always see either
+the old or the new catalog, never a partial one. The file is checked at most
+every ``CAREER_CATALOG_RELOAD_INTERVAL`` seconds (default 2; 0 disables
+hot-reload).
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Optional
+
+from matching import CareerMatcher
+from vector_scoring import VectorScorer
+
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "careers.json")
+
+
+def freeze(obj: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """Return a plain, mutable (and JSON/session serializable) copy."""
+    if isinstance(obj, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+class Catalog:
+    """An immutable snapshot of the career catalog and its compiled index."""
+
+    def __init__(self, data: Dict, path: Optional[str] = None, mtime_ns: int = 0):
+        raw = json.dumps(data, sort_keys=True).encode("utf-8")
+        self.version = hashlib.sha1(raw).hexdigest()[:12]
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.data = freeze(data)
+        self.matcher = CareerMatcher(self.data)
+        self._vector_scorer = None
+
+    def vector_scorer(self) -> VectorScorer:
+        """Return the NumPy batch scorer for this snapshot, built on first use."""
+        if self._vector_scorer is None:
+            self._vector_scorer = VectorScorer(self.matcher)
+        return self._vector_scorer
+
+    @classmethod
+    def from_file(cls, path: str) -> "Catalog":
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(data, path=path, mtime_ns=mtime_ns)
+
+
+_lock = threading.Lock()
+_current: Optional[Catalog] = None
+_last_check = 0.0
+
+
+def catalog_path() -> str:
+    return os.environ.get("CAREER_CATALOG_PATH", DEFAULT_CATALOG_PATH)
+
+
+def _reload_interval() -> float:
+    try:
+        return float(os.environ.get("CAREER_CATALOG_RELOAD_INTERVAL", "2"))
+    except ValueError:
+        return 2.0
+
+
+def get_catalog() -> Catalog:
+    """Return the shared catalog, reloading it if the file has changed."""
+    global _current, _last_check
+
+    current = _current
+    if current is not None:
+        interval = _reload_interval()
+        if interval <= 0 or time.monotonic() - _last_check < interval:
+            return current
+
+    with _lock:
+        current = _current
+        path = catalog_path()
+        now = time.monotonic()
+        if current is not None and current.path == path:
+            _last_check = now
+            try:
+                if os.stat(path).st_mtime_ns == current.mtime_ns:
+                    return current
+            except OSError:
+                logging.warning("catalog: cannot stat %s, keeping version %s", path, current.version)
+                return current
+        try:
+            fresh = Catalog.from_file(path)
+        except Exception:
+            if current is None:
+                raise
+            logging.exception("catalog: reload of %s failed, keeping version %s", path, current.version)
+            return current
+        if current is not None:
+            logging.info("catalog: reloaded %s (%s -> %s)", path, current.version, fresh.version)
+        _current = fresh
+        _last_check = now
+        return fresh
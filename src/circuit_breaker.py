@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for calls to an unreliable external service.
+
+CLOSED: calls go through and their outcome and latency are recorded in a
+rolling window. When the window holds at least ``min_calls`` outcomes and
+either the error rate reaches ``error_rate`` or the p95 latency reaches
+``p95_latency`` seconds, the breaker trips.
+
+OPEN: calls are rejected without touching the service until ``cooldown``
+seconds have passed.
+
+HALF_OPEN: up to ``half_open_calls`` probe calls are let through. A
+successful probe closes the breaker, a failed one opens it again.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open breaker with error-rate and p95 trips."""
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 50,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        p95_latency: float = 2.0,
+        cooldown: float = 30.0,
+        half_open_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.p95_latency = p95_latency
+        self.cooldown = cooldown
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._transitions: List[Dict[str, Any]] = []
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def available(self) -> bool:
+        """True if a call would currently be let through (does not reserve it)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                return False
+            if self._state == HALF_OPEN:
+                return self._probes < self.half_open_calls
+            return True
+
+    def allow(self) -> bool:
+        """Reserve permission for one call; False means skip the service."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def record(self, success: bool, latency: float):
+        """Record the outcome of a call that ``allow()`` let through."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED if success else OPEN, "probe succeeded" if success else "probe failed")
+                return
+            if self._state == OPEN:
+                # A call admitted before the breaker opened; nothing to decide
+                return
+            self._window.append((success, latency))
+            if len(self._window) < self.min_calls:
+                return
+            error_rate, p95 = self._stats()
+            if error_rate >= self.error_rate:
+                self._transition(OPEN, f"error rate {error_rate:.0%}")
+            elif p95 >= self.p95_latency:
+                self._transition(OPEN, f"p95 latency {p95 * 1000:.0f} ms")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state, window statistics and recent transitions."""
+        with self._lock:
+            self._maybe_half_open()
+            error_rate, p95 = self._stats()
+            return {
+                "name": self.name,
+                "state": self._state,
+                "window_calls": len(self._window),
+                "error_rate": error_rate,
+                "p95_latency": p95,
+                "rejected": self._rejected,
+                "transitions": list(self._transitions),
+            }
+
+    def _stats(self):
+        if not self._window:
+            return 0.0, 0.0
+        failures = sum(1 for ok, _ in self._window if not ok)
+        latencies = sorted(latency for _, latency in self._window)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        return failures / len(self._window), p95
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+            self._transition(HALF_OPEN, "cooldown elapsed")
+
+    def _transition(self, state: str, reason: str):
+        previous, self._state = self._state, state
+        now = self._clock()
+        if state == OPEN:
+            self._opened_at = now
+        if state != HALF_OPEN:
+            self._window.clear()
+        self._probes = 0
+        self._transitions.append({"from": previous, "to": state, "reason": reason, "at": now})
+        del self._transitions[:-20]
+        level = logging.WARNING if state == OPEN else logging.INFO
+        logging.log(level, "%s circuit %s -> %s (%s)", self.name, previous, state, reason)
@@ -6,24 +6,351 @@ This module provides a safe, non-blocking integration point for Vertex AI text
 generation. It tries to import and call the Google Cloud SDK when available and
 when credentials are set via environment variables. On any error it returns
 None so the application can gracefully fall back to local logic.
+
+SDK clients are created once per (project, location, model) and reused
+across calls; ``warmup()`` creates them ahead of the first request.
+
+``VERTEX_PREDICT_URL`` points the wrapper at a REST ``:predict`` endpoint
+instead (a Vertex AI URL with ``VERTEX_PREDICT_TOKEN``, or a local stand-in
+such as ``benchmarks/vertex_stub.py``); no SDK is needed then.
+
+``generate_text_async()`` is the coroutine flavour for the ASGI app. At most
+``VERTEX_MAX_CONCURRENCY`` of its calls are in flight per event loop; the
+rest wait on a semaphore instead of each holding a thread.
 """
+import asyncio
+import concurrent.futures
 import os
 import logging
 import json
+import threading
+import time
+import weakref
+
+from ai_batching import RequestCoalescer
+from circuit_breaker import CircuitBreaker
+from http_json import post_json, post_json_async
+
+# google-cloud-aiplatform takes seconds to import, so by default it is
+# imported on a background thread the first time it is needed (see
+# load_sdk_in_background()); until then calls fall back like an unavailable
+# SDK. VERTEX_SDK_IMPORT=eager imports it in preload() instead, so gunicorn
+# workers share it.
+VERTEX_SDK_IMPORT = os.environ.get("VERTEX_SDK_IMPORT", "background")
+aiplatform = None
+GCLOUD_AVAILABLE = False
+_sdk_state = "unloaded"  # unloaded -> loading -> loaded | missing
+_sdk_lock = threading.Lock()
+
+
+def load_sdk() -> bool:
+    """Import google-cloud-aiplatform now (once); returns GCLOUD_AVAILABLE."""
+    global aiplatform, GCLOUD_AVAILABLE, _sdk_state
+    with _sdk_lock:
+        if _sdk_state in ("loaded", "missing"):
+            return GCLOUD_AVAILABLE
+        _sdk_state = "loading"
+        try:
+            from google.cloud import aiplatform as sdk
+        except Exception:
+            _sdk_state = "missing"
+            return False
+        aiplatform, GCLOUD_AVAILABLE, _sdk_state = sdk, True, "loaded"
+        return True
 
-try:
-    from google.cloud import aiplatform
-    GCLOUD_AVAILABLE = True
-except Exception:
-    GCLOUD_AVAILABLE = False
+
+def load_sdk_in_background():
+    """Start importing the SDK on a daemon thread if it could be used at all."""
+    if _sdk_state != "unloaded" or VERTEX_PREDICT_URL or not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+        return
+    threading.Thread(target=load_sdk, name="vertex-sdk-import", daemon=True).start()
+
+
+# Per-call deadline in seconds; slower calls count as failures for the breaker
+VERTEX_DEADLINE = float(os.environ.get("VERTEX_DEADLINE", "5"))
+
+# Stops calling Vertex AI while it is failing or slow (see circuit_breaker.py)
+breaker = CircuitBreaker(
+    "vertex",
+    window=int(os.environ.get("VERTEX_BREAKER_WINDOW", "50")),
+    min_calls=int(os.environ.get("VERTEX_BREAKER_MIN_CALLS", "10")),
+    error_rate=float(os.environ.get("VERTEX_BREAKER_ERROR_RATE", "0.5")),
+    p95_latency=float(os.environ.get("VERTEX_BREAKER_P95_MS", "2000")) / 1000.0,
+    cooldown=float(os.environ.get("VERTEX_BREAKER_COOLDOWN", "30")),
+)
+
+
+# REST predict endpoint used instead of the SDK when set
+VERTEX_PREDICT_URL = os.environ.get("VERTEX_PREDICT_URL")
+VERTEX_PREDICT_TOKEN = os.environ.get("VERTEX_PREDICT_TOKEN")
+
+# Outbound calls in flight per event loop in generate_text_async()
+VERTEX_MAX_CONCURRENCY = int(os.environ.get("VERTEX_MAX_CONCURRENCY", "100"))
+
+
+def _configured() -> bool:
+    if VERTEX_PREDICT_URL:
+        return True
+    if not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+        logging.debug("gcloud_ai: GOOGLE_APPLICATION_CREDENTIALS not set")
+        return False
+    if not GCLOUD_AVAILABLE:
+        if _sdk_state == "unloaded":
+            if VERTEX_SDK_IMPORT == "background":
+                load_sdk_in_background()
+            else:
+                load_sdk()
+        if not GCLOUD_AVAILABLE:
+            logging.debug("gcloud_ai: google-cloud-aiplatform not installed (or still importing)")
+            return False
+    return True
 
 
 def is_available() -> bool:
-    """Return True if the google-cloud-aiplatform package is installed and
-    application credentials are present in environment.
+    """Return True if a REST predict URL is configured or the
+    google-cloud-aiplatform package is installed and application credentials
+    are present in environment, and the circuit breaker would let a call
+    through.
+    """
+    return _configured() and breaker.available()
+
+
+# Micro-batching of low-level predict calls: up to VERTEX_BATCH_MAX prompts
+# per RPC, waiting at most VERTEX_BATCH_LINGER_MS for a batch to fill.
+# 1 (the default) sends every prompt on its own.
+VERTEX_BATCH_MAX = int(os.environ.get("VERTEX_BATCH_MAX", "1"))
+VERTEX_BATCH_LINGER_MS = float(os.environ.get("VERTEX_BATCH_LINGER_MS", "10"))
+
+# Warm clients keyed by (project, location, model); see get_client()
+_clients = {}
+_clients_lock = threading.Lock()
+
+# The high-level SDK predict() takes no timeout, so it runs on this small
+# pool and is abandoned after VERTEX_DEADLINE. A hung call then costs one of
+# these threads and a breaker failure, never the caller's thread.
+VERTEX_SDK_THREADS = int(os.environ.get("VERTEX_SDK_THREADS", "8"))
+_sdk_executor = None
+
+
+class VertexClient:
+    """Initialized Vertex AI handles for one (project, location, model).
+
+    Created once and reused so calls skip ``aiplatform.init()``, model
+    lookup and gRPC channel / TLS / auth setup.
     """
-    creds = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-    return GCLOUD_AVAILABLE and bool(creds)
+
+    def __init__(self, project, location, model_id):
+        self.project = project
+        self.location = location
+        self.model_id = model_id
+        self._lock = threading.Lock()
+        self._prediction_client = None
+        self._batchers = {}
+
+        aiplatform.init(project=project, location=location)
+
+        # If user provided a high-level TextGenerationModel API is available,
+        # prefer it (newer versions of the SDK expose this helper).
+        self.text_model = None
+        TextModel = getattr(aiplatform, "TextGenerationModel", None)
+        if TextModel and model_id:
+            try:
+                self.text_model = TextModel.from_pretrained(model_id)
+            except Exception:
+                logging.debug(
+                    "gcloud_ai: high-level TextGenerationModel unavailable",
+                    exc_info=True,
+                )
+
+        # Build model resource name if not provided as full path
+        if model_id and model_id.startswith("projects/"):
+            self.endpoint = model_id
+        else:
+            # If project is missing, rely on aiplatform.init to have set it
+            effective_project = project or _default_project()
+            effective_model = model_id or "text-bison@001"
+            self.endpoint = (
+                "projects/" + str(effective_project)
+                + "/locations/" + location
+                + "/models/" + effective_model
+            )
+
+    @property
+    def prediction_client(self):
+        """Low-level PredictionServiceClient, created on first use."""
+        if self._prediction_client is None:
+            with self._lock:
+                if self._prediction_client is None:
+                    self._prediction_client = aiplatform.gapic.PredictionServiceClient()
+        return self._prediction_client
+
+    def predict(self, prompts, max_length):
+        """Send one predict RPC for ``prompts``; returns the predictions."""
+        request = {
+            "endpoint": self.endpoint,
+            "instances": [{"content": prompt} for prompt in prompts],
+            "parameters": {"maxOutputTokens": max_length},
+        }
+        result = self.prediction_client.predict(request=request, timeout=VERTEX_DEADLINE)
+        preds = list(getattr(result, "predictions", None) or [])
+        if len(preds) != len(prompts):
+            raise ValueError(
+                f"gcloud_ai: {len(prompts)} instances sent, {len(preds)} predictions returned"
+            )
+        return preds
+
+    def batcher(self, max_length) -> RequestCoalescer:
+        """Coalescer for prompts sharing the same request parameters."""
+        batcher = self._batchers.get(max_length)
+        if batcher is None:
+            with self._lock:
+                batcher = self._batchers.get(max_length)
+                if batcher is None:
+                    batcher = RequestCoalescer(
+                        lambda prompts: self.predict(prompts, max_length),
+                        max_batch=VERTEX_BATCH_MAX,
+                        linger_ms=VERTEX_BATCH_LINGER_MS,
+                        name="vertex-batch",
+                    )
+                    self._batchers[max_length] = batcher
+        return batcher
+
+
+class RestPredictClient(VertexClient):
+    """Client for a REST ``:predict`` endpoint (``VERTEX_PREDICT_URL``).
+
+    Speaks the Vertex AI REST shape (``{"instances": [...], "parameters":
+    {...}}`` in, ``{"predictions": [...]}`` out) over keep-alive HTTP, with
+    a native coroutine path for the async app.
+    """
+
+    def __init__(self, url, token=None):
+        self.project = self.location = self.model_id = None
+        self._lock = threading.Lock()
+        self._prediction_client = None
+        self._batchers = {}
+        self.text_model = None
+        self.endpoint = url
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _body(self, prompts, max_length):
+        return {
+            "instances": [{"content": prompt} for prompt in prompts],
+            "parameters": {"maxOutputTokens": max_length},
+        }
+
+    def _predictions(self, prompts, result):
+        preds = list(result.get("predictions") or []) if isinstance(result, dict) else []
+        if len(preds) != len(prompts):
+            raise ValueError(
+                f"gcloud_ai: {len(prompts)} instances sent, {len(preds)} predictions returned"
+            )
+        return preds
+
+    def predict(self, prompts, max_length):
+        result = post_json(
+            self.endpoint, self._body(prompts, max_length), self.headers, timeout=VERTEX_DEADLINE
+        )
+        return self._predictions(prompts, result)
+
+    async def predict_async(self, prompts, max_length):
+        result = await post_json_async(
+            self.endpoint, self._body(prompts, max_length), self.headers, timeout=VERTEX_DEADLINE
+        )
+        return self._predictions(prompts, result)
+
+
+def _default_project():
+    initializer = getattr(aiplatform, "initializer", None)
+    config = getattr(initializer, "global_config", None)
+    return getattr(config, "project", None)
+
+
+def _resolve(project=None, location=None, model=None):
+    """Apply environment defaults to explicit parameters."""
+    proj = project or os.environ.get("GOOGLE_CLOUD_PROJECT")
+    loc = location or os.environ.get("VERTEX_LOCATION", "us-central1")
+    model_id = model or os.environ.get("VERTEX_MODEL_ID")
+    return proj, loc, model_id
+
+
+def get_client(project: str = None, location: str = None, model: str = None) -> VertexClient:
+    """Return the shared client for these settings, creating it once.
+
+    Thread-safe: concurrent first calls build a single client.
+    """
+    key = ("rest", VERTEX_PREDICT_URL) if VERTEX_PREDICT_URL else _resolve(project, location, model)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                if VERTEX_PREDICT_URL:
+                    client = RestPredictClient(VERTEX_PREDICT_URL, VERTEX_PREDICT_TOKEN)
+                else:
+                    client = VertexClient(*key)
+                _clients[key] = client
+    return client
+
+
+def batch_metrics():
+    """Per-client micro-batching counters, including batch fill ratio."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {
+        f"{client.endpoint}|{max_length}": batcher.metrics()
+        for client in clients
+        for max_length, batcher in list(client._batchers.items())
+    }
+
+
+def ai_metrics():
+    """Breaker state/transitions, micro-batching and async concurrency counters."""
+    return {
+        "breaker": breaker.snapshot(),
+        "batching": batch_metrics(),
+        "async": {
+            "limit": VERTEX_MAX_CONCURRENCY,
+            "in_flight": _async_in_flight,
+            "waiting": _async_waiting,
+        },
+    }
+
+
+def _prediction_text(pred):
+    """Extract the generated text from one prediction."""
+    if isinstance(pred, dict):
+        # Common keys used by Vertex AI responses
+        for key in ("content", "text", "output"):
+            if key in pred:
+                return pred[key]
+        return json.dumps(pred)
+    return str(pred)
+
+
+def reset_clients():
+    """Drop all cached clients (e.g. in a freshly forked worker)."""
+    with _clients_lock:
+        _clients.clear()
+
+
+def warmup(project: str = None, location: str = None, model: str = None) -> bool:
+    """Create the client and its gRPC channel ahead of the first request.
+
+    Intended for worker boot (e.g. a gunicorn ``post_fork`` hook). Returns
+    True if a client is ready, False if Vertex AI is unavailable or setup
+    failed.
+    """
+    if not is_available():
+        return False
+    try:
+        client = get_client(project, location, model)
+        if client.text_model is None:
+            client.prediction_client
+        return True
+    except Exception:
+        logging.exception("gcloud_ai: Vertex AI warmup failed")
+        return False
 
 
 def generate_text(
@@ -43,84 +370,185 @@ def generate_text(
             `GOOGLE_APPLICATION_CREDENTIALS` to a service account JSON file.
         - Optionally set `GOOGLE_CLOUD_PROJECT`, `VERTEX_LOCATION`, and
             `VERTEX_MODEL_ID`.
+        - Or set `VERTEX_PREDICT_URL` (and `VERTEX_PREDICT_TOKEN`) to call a
+            REST predict endpoint without the SDK.
+        - Set `VERTEX_BATCH_MAX` > 1 (and `VERTEX_BATCH_LINGER_MS`) to
+            coalesce concurrent low-level calls into batched RPCs.
+        - Calls are skipped while the circuit breaker is open; tune it with
+            `VERTEX_DEADLINE` and the `VERTEX_BREAKER_*` variables.
     - This function is intentionally defensive: any import / call errors will
       be caught and logged, and None will be returned so the caller can fall
       back to local behaviour.
     """
-    if not GCLOUD_AVAILABLE:
-        logging.debug("gcloud_ai: google-cloud-aiplatform not installed")
+    if not _configured():
         return None
 
-    if not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
-        logging.debug("gcloud_ai: GOOGLE_APPLICATION_CREDENTIALS not set")
+    if not breaker.allow():
+        logging.debug("gcloud_ai: circuit open, skipping Vertex AI")
         return None
 
-    try:
-        # Prefer explicit parameters or environment values
-        proj = project or os.environ.get("GOOGLE_CLOUD_PROJECT")
-        loc = location or os.environ.get("VERTEX_LOCATION", "us-central1")
-        model_id = model or os.environ.get("VERTEX_MODEL_ID")
+    start = time.monotonic()
+    text = _generate(prompt, project, location, model, max_length)
+    latency = time.monotonic() - start
+    breaker.record(text is not None and latency <= VERTEX_DEADLINE, latency)
+    return text
 
-        # Initialize client (idempotent)
-        aiplatform.init(project=proj, location=loc)
 
-        # If user provided a high-level TextGenerationModel API is available,
-        # try it first (newer versions of the SDK expose this helper).
-        try:
-            TextModel = getattr(aiplatform, "TextGenerationModel", None)
-            if TextModel and model_id:
-                tg = TextModel.from_pretrained(model_id)
-                res = tg.predict(prompt, max_output_tokens=max_length)
+def _sdk_executor_get() -> concurrent.futures.ThreadPoolExecutor:
+    global _sdk_executor
+    if _sdk_executor is None:
+        with _clients_lock:
+            if _sdk_executor is None:
+                _sdk_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=VERTEX_SDK_THREADS, thread_name_prefix="vertex-sdk"
+                )
+    return _sdk_executor
+
+
+def _generate(prompt, project, location, model, max_length):
+    """One Vertex AI generation; returns None on any failure."""
+    start = time.monotonic()
+    try:
+        client = get_client(project, location, model)
+
+        if client.text_model is not None:
+            try:
+                res = _sdk_executor_get().submit(
+                    client.text_model.predict, prompt, max_output_tokens=max_length
+                ).result(timeout=VERTEX_DEADLINE)
                 # Response shape may vary by SDK version
                 if hasattr(res, "text"):
                     return res.text
                 return str(res)
-        except Exception:
-            # Continue to lower-level client if high-level API not available
-            logging.debug(
-                "gcloud_ai: high-level TextGenerationModel failed",
-                exc_info=True,
-            )
-
-        # Use PredictionServiceClient fallback
-        client = aiplatform.gapic.PredictionServiceClient()
+            except concurrent.futures.TimeoutError:
+                logging.warning("gcloud_ai: high-level predict exceeded %.1fs", VERTEX_DEADLINE)
+                return None
+            except Exception:
+                # Continue to lower-level client if high-level API fails
+                logging.debug(
+                    "gcloud_ai: high-level TextGenerationModel failed",
+                    exc_info=True,
+                )
 
-        # Build model resource name if not provided as full path
-        if model_id and model_id.startswith("projects/"):
-            name = model_id
+        if VERTEX_BATCH_MAX > 1:
+            # Coalesce with concurrent callers into one multi-instance RPC
+            remaining = max(0.0, VERTEX_DEADLINE - (time.monotonic() - start))
+            try:
+                pred = client.batcher(max_length).submit(prompt).result(timeout=remaining)
+            except concurrent.futures.TimeoutError:
+                logging.warning("gcloud_ai: batched predict exceeded %.1fs", VERTEX_DEADLINE)
+                return None
         else:
-            # If project is missing, rely on aiplatform.init to have set it
-            effective_project = proj or aiplatform.init().project
-            effective_location = loc
-            effective_model = model_id or "text-bison@001"
-            name = (
-                "projects/" + effective_project
-                + "/locations/" + effective_location
-                + "/models/" + effective_model
-            )
+            pred = client.predict([prompt], max_length)[0]
+        return _prediction_text(pred)
+    except Exception:
+        logging.exception("gcloud_ai: Vertex AI generation failed")
+        return None
 
-        instances = [{"content": prompt}]
-        parameters = {"maxOutputTokens": max_length}
 
-        request = {
-            "endpoint": name,
-            "instances": instances,
-            "parameters": parameters,
-        }
-        result = client.predict(request=request)
-
-        preds = getattr(result, "predictions", None)
-        if preds:
-            first = preds[0]
-            if isinstance(first, dict):
-                # Common keys used by Vertex AI responses
-                for key in ("content", "text", "output"):
-                    if key in first:
-                        return first[key]
-                return json.dumps(first)
-            return str(first)
+# Per event loop; asyncio primitives must not be shared between loops
+_async_limits = weakref.WeakKeyDictionary()
+_async_in_flight = 0
+_async_waiting = 0
+
+
+def _async_limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limit = _async_limits.get(loop)
+    if limit is None:
+        limit = _async_limits[loop] = asyncio.Semaphore(VERTEX_MAX_CONCURRENCY)
+    return limit
+
+
+async def generate_text_async(
+    prompt: str,
+    project: str = None,
+    location: str = "us-central1",
+    model: str = None,
+    max_length: int = 256,
+):
+    """Coroutine version of ``generate_text()``.
+
+    Waits on the per-loop ``VERTEX_MAX_CONCURRENCY`` semaphore, then awaits
+    the call without tying up a thread when the client supports it: the REST
+    client and micro-batching are fully async, SDK calls use the SDK's async
+    methods where present and a worker thread otherwise. Returns None on any
+    failure, like ``generate_text()``.
+    """
+    global _async_in_flight, _async_waiting
 
+    if not _configured():
         return None
+
+    _async_waiting += 1
+    try:
+        limit = _async_limit()
+        await limit.acquire()
+    finally:
+        _async_waiting -= 1
+    _async_in_flight += 1
+    try:
+        if not breaker.allow():
+            logging.debug("gcloud_ai: circuit open, skipping Vertex AI")
+            return None
+        start = time.monotonic()
+        text = None
+        try:
+            text = await _generate_async(prompt, project, location, model, max_length)
+        finally:
+            # Also on cancellation, or a half-open probe would never be settled
+            latency = time.monotonic() - start
+            breaker.record(text is not None and latency <= VERTEX_DEADLINE, latency)
+        return text
+    finally:
+        _async_in_flight -= 1
+        limit.release()
+
+
+async def _generate_async(prompt, project, location, model, max_length):
+    start = time.monotonic()
+    try:
+        client = get_client(project, location, model)
+
+        predict_async = getattr(client.text_model, "predict_async", None)
+        if client.text_model is not None and predict_async is None:
+            # Older SDK without async methods: run the blocking path off-loop
+            return await asyncio.to_thread(_generate, prompt, project, location, model, max_length)
+        if predict_async is not None:
+            try:
+                res = await asyncio.wait_for(
+                    predict_async(prompt, max_output_tokens=max_length), VERTEX_DEADLINE
+                )
+                if hasattr(res, "text"):
+                    return res.text
+                return str(res)
+            except asyncio.TimeoutError:
+                logging.warning("gcloud_ai: high-level predict exceeded %.1fs", VERTEX_DEADLINE)
+                return None
+            except Exception:
+                logging.debug(
+                    "gcloud_ai: high-level TextGenerationModel failed",
+                    exc_info=True,
+                )
+
+        if VERTEX_BATCH_MAX > 1:
+            # The coalescer's own threads do the I/O; just await its future.
+            # shield(): giving up must not cancel a prompt already in a batch
+            remaining = max(0.0, VERTEX_DEADLINE - (time.monotonic() - start))
+            try:
+                pred = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(client.batcher(max_length).submit(prompt))), remaining
+                )
+            except asyncio.TimeoutError:
+                logging.warning("gcloud_ai: batched predict exceeded %.1fs", VERTEX_DEADLINE)
+                return None
+        elif isinstance(client, RestPredictClient):
+            pred = (await client.predict_async([prompt], max_length))[0]
+        else:
+            pred = (await asyncio.to_thread(client.predict, [prompt], max_length))[0]
+        return _prediction_text(pred)
+    except asyncio.CancelledError:
+        raise
     except Exception:
         logging.exception("gcloud_ai: Vertex AI generation failed")
         return None
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Minimal keep-alive JSON-over-HTTP client, blocking and asyncio flavours.
+
+Used to talk to a Vertex AI style REST predict endpoint (or a local stand-in)
+without pulling in a third-party HTTP library:
+
+- ``post_json()`` keeps one ``http.client`` connection per thread and host.
+- ``post_json_async()`` keeps a pool of idle ``asyncio`` streams per event
+  loop and host, so thousands of concurrent calls need no threads at all.
+
+Both raise ``HTTPError`` for non-2xx answers and ``OSError`` /
+``asyncio.TimeoutError`` for transport problems.
+"""
+import asyncio
+import http.client
+import json
+import ssl
+import threading
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    """Non-2xx response."""
+
+    def __init__(self, status: int, body: bytes):
+        super().__init__(f"HTTP {status}: {body[:200]!r}")
+        self.status = status
+        self.body = body
+
+
+def _target(url: str):
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return secure, parts.hostname, port, path
+
+
+def _request_headers(host: str, body: bytes, headers: Optional[Dict[str, str]]):
+    merged = {
+        "Host": host,
+        "Content-Type": "application/json",
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive",
+    }
+    merged.update(headers or {})
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Blocking
+# ---------------------------------------------------------------------------
+
+_local = threading.local()
+
+# A reused keep-alive connection that fails with one of these was closed by
+# the server before it answered, so the request can safely be sent again.
+# Timeouts are not among them: the server may be working on the request.
+_STALE_CONNECTION = (ConnectionResetError, BrokenPipeError)  # includes RemoteDisconnected
+
+
+def post_json(url: str, payload, headers: Dict[str, str] = None, timeout: float = 10.0):
+    """POST ``payload`` as JSON and return the decoded JSON response."""
+    secure, host, port, path = _target(url)
+    body = json.dumps(payload).encode("utf-8")
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    key = (secure, host, port)
+
+    # A pooled connection may have been closed by the server; retry once fresh
+    for attempt in range(2):
+        conn = conns.get(key)
+        reused = conn is not None
+        if conn is None:
+            cls = http.client.HTTPSConnection if secure else http.client.HTTPConnection
+            conn = conns[key] = cls(host, port, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            # http.client only applies the timeout when it connects
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request("POST", path, body, _request_headers(host, body, headers))
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError) as exc:
+            conn.close()
+            del conns[key]
+            if reused and attempt == 0 and isinstance(exc, _STALE_CONNECTION):
+                continue
+            raise
+        if response.will_close:
+            conn.close()
+            del conns[key]
+        if not 200 <= response.status < 300:
+            raise HTTPError(response.status, data)
+        return json.loads(data)
+
+
+# ---------------------------------------------------------------------------
+# asyncio
+# ---------------------------------------------------------------------------
+
+# Idle connections per event loop: {loop: {(secure, host, port): [(reader, writer), ...]}}
+_idle = weakref.WeakKeyDictionary()
+_ssl_context = None
+
+
+def _idle_for(key):
+    loop = asyncio.get_running_loop()
+    return _idle.setdefault(loop, {}).setdefault(key, [])
+
+
+async def _open(secure: bool, host: str, port: int):
+    global _ssl_context
+    context = None
+    if secure:
+        if _ssl_context is None:
+            _ssl_context = ssl.create_default_context()
+        context = _ssl_context
+    return await asyncio.open_connection(host, port, ssl=context)
+
+
+async def _read_response(reader: asyncio.StreamReader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive, body)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed before response")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+        keep_alive = True
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+        keep_alive = True
+    else:
+        body = await reader.read()
+        keep_alive = False
+    if headers.get("connection", "").lower() == "close":
+        keep_alive = False
+    return status, keep_alive, body
+
+
+async def post_json_async(url: str, payload, headers: Dict[str, str] = None, timeout: float = 10.0):
+    """Coroutine version of ``post_json()``; never blocks the event loop."""
+    secure, host, port, path = _target(url)
+    body = json.dumps(payload).encode("utf-8")
+    head = "".join(
+        f"{name}: {value}\r\n" for name, value in _request_headers(host, body, headers).items()
+    )
+    request = f"POST {path} HTTP/1.1\r\n{head}\r\n".encode("latin-1") + body
+    idle = _idle_for((secure, host, port))
+
+    async def exchange(reader, writer):
+        writer.write(request)
+        await writer.drain()
+        return await _read_response(reader)
+
+    for attempt in range(2):
+        reused = bool(idle)
+        reader, writer = idle.pop() if reused else await asyncio.wait_for(
+            _open(secure, host, port), timeout
+        )
+        try:
+            status, keep_alive, data = await asyncio.wait_for(exchange(reader, writer), timeout)
+        except _STALE_CONNECTION:
+            # Includes EOF before the status line (see _read_response)
+            writer.close()
+            if reused and attempt == 0:
+                continue
+            raise
+        except BaseException:
+            # Timeout or cancellation mid-response: the stream is unusable
+            writer.close()
+            raise
+        if keep_alive:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+        if not 200 <= status < 300:
+            raise HTTPError(status, data)
+        return json.loads(data)
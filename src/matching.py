@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Compiled career matching engine.
+
+The catalog's keywords, skills, category names and career names are compiled
+once into an inverted index (pattern -> careers that use it), keyed by the
+pattern's canonical token phrase. A profile's tokens (see
+profile_features.py) are walked once per text field, extending a phrase only
+while it is still the prefix of some pattern, and only the careers it
+actually hits get scored, instead of testing every career's patterns against
+the profile on every call.
+
+Patterns match whole tokens, with the original weights and tie-breaks.
+"""
+import heapq
+from typing import Dict, FrozenSet, List, Tuple
+
+from profile_features import phrase
+
+
+# Score weights, identical to the original per-career loop
+KEYWORD_WEIGHT = 10
+SKILL_WEIGHT = 5
+CATEGORY_WEIGHT = 3
+NAME_WEIGHT = 15
+
+
+class CareerMatcher:
+    """Inverted index over a career catalog.
+
+    Careers are addressed by their position in catalog iteration order, which
+    is also the tie-break order of the original stable sort. ``positions``
+    maps that index back to ``(category, index within category)``.
+    """
+
+    def __init__(self, career_data: Dict):
+        self.positions: List[Tuple[str, int]] = []
+        text_postings: Dict[str, List[Tuple[int, int]]] = {}
+        skill_postings: Dict[str, List[Tuple[int, int]]] = {}
+        name_postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for category, data in career_data.items():
+            for pos, career in enumerate(data["careers"]):
+                idx = len(self.positions)
+                self.positions.append((category, pos))
+                for keyword in career["keywords"]:
+                    text_postings.setdefault(phrase(keyword), []).append((idx, KEYWORD_WEIGHT))
+                text_postings.setdefault(phrase(category), []).append((idx, CATEGORY_WEIGHT))
+                for skill in career["skills"]:
+                    skill_postings.setdefault(phrase(skill), []).append((idx, SKILL_WEIGHT))
+                name_postings.setdefault(phrase(career["name"]), []).append((idx, NAME_WEIGHT))
+
+        self._text = self._compile(text_postings)
+        self._skills = self._compile(skill_postings)
+        self._names = self._compile(name_postings)
+        # Proper prefixes of multi-word patterns, per field
+        self._prefixes = tuple(self._prefix_set(ids) for ids, _ in self._fields())
+
+    @staticmethod
+    def _compile(postings: Dict[str, List[Tuple[int, int]]]):
+        patterns = [pattern for pattern in postings if pattern]
+        ids = {pattern: pattern_id for pattern_id, pattern in enumerate(patterns)}
+        index = [tuple(postings[pattern]) for pattern in patterns]
+        return ids, index
+
+    @staticmethod
+    def _prefix_set(ids: Dict[str, int]) -> FrozenSet[str]:
+        prefixes = set()
+        for pattern in ids:
+            words = pattern.split(" ")
+            prefixes.update(" ".join(words[:n]) for n in range(1, len(words)))
+        return frozenset(prefixes)
+
+    @staticmethod
+    def _find(ids: Dict[str, int], prefixes: FrozenSet[str], tokens: List[str]) -> Tuple[int, ...]:
+        """Ids of the patterns occurring in ``tokens``, each once, in order found."""
+        found = {}
+        n = len(tokens)
+        for start in range(n):
+            gram = tokens[start]
+            end = start + 1
+            while True:
+                pattern_id = ids.get(gram)
+                if pattern_id is not None:
+                    found[pattern_id] = None
+                if end == n or gram not in prefixes:
+                    break
+                gram = f"{gram} {tokens[end]}"
+                end += 1
+        return tuple(found)
+
+    def lookup(self, features) -> Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]:
+        """Pattern ids hit by a ``ProfileFeatures``' text, skills and goals."""
+        tokens = (features.text_tokens, features.skill_tokens, features.goal_tokens)
+        return tuple(
+            self._find(ids, prefixes, field_tokens)
+            for (ids, _), prefixes, field_tokens in zip(self._fields(), self._prefixes, tokens)
+        )
+
+    def text_categories(self, tokens: List[str]) -> Tuple[str, ...]:
+        """Sorted categories of the careers whose keywords occur in ``tokens``."""
+        ids, index = self._text
+        return tuple(sorted({
+            self.positions[idx][0]
+            for pattern_id in self._find(ids, self._prefixes[0], tokens)
+            for idx, _ in index[pattern_id]
+        }))
+
+    def _hits(self, features):
+        if features.text_ids is None:
+            # Features built without a matcher
+            return self.lookup(features)
+        return features.text_ids, features.skill_ids, features.goal_ids
+
+    def score(self, features) -> Dict[int, int]:
+        """Return ``{career_index: score}`` for every career with a hit."""
+        scores: Dict[int, int] = {}
+        for (_, index), pattern_ids in zip(self._fields(), self._hits(features)):
+            for pattern_id in pattern_ids:
+                for idx, weight in index[pattern_id]:
+                    scores[idx] = scores.get(idx, 0) + weight
+        return scores
+
+    @property
+    def n_features(self) -> int:
+        """Number of distinct (field, pattern) features in the index."""
+        return sum(len(ids) for ids, _ in self._fields())
+
+    def _fields(self):
+        return (self._text, self._skills, self._names)
+
+    def feature_postings(self):
+        """Yield ``(feature_id, career_index, weight)`` for every posting."""
+        offset = 0
+        for ids, index in self._fields():
+            for pattern_id, postings in enumerate(index):
+                for idx, weight in postings:
+                    yield offset + pattern_id, idx, weight
+            offset += len(ids)
+
+    def features(self, features) -> List[int]:
+        """Return the feature ids present in a ``ProfileFeatures``' three fields."""
+        found = []
+        offset = 0
+        for (ids, _), pattern_ids in zip(self._fields(), self._hits(features)):
+            found.extend(offset + pattern_id for pattern_id in pattern_ids)
+            offset += len(ids)
+        return found
+
+    def top(self, scores: Dict[int, int], k: int) -> List[Tuple[str, int]]:
+        """Return the positions of the ``k`` best careers, highest first.
+
+        Ties keep catalog order, matching a stable descending sort.
+        ``heapq.nsmallest`` keeps a bounded heap and discards any candidate
+        that cannot beat the current k-th best, so the full list is never
+        sorted.
+        """
+        best = heapq.nsmallest(
+            k, ((-score, idx) for idx, score in scores.items() if score > 0)
+        )
+        return [self.positions[idx] for _, idx in best]
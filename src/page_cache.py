@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Rendered-page cache for the static content routes.
+
+Pages such as ``/about`` or ``/careers/*`` render the same HTML for every
+visitor, so each template is rendered once and kept together with a strong
+ETag and gzip (and, if the ``brotli`` package is installed, brotli)
+encodings. Conditional requests get a 304 without touching Jinja.
+
+The only per-visitor difference in these pages is the "My Results" nav link
+in ``base.html``, so each template is cached in two variants: with and
+without a stored result in the session.
+
+Entries are dropped when any file in the template folder changes (checked at
+most every ``PAGE_CACHE_CHECK_INTERVAL`` seconds).
+"""
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+from flask import render_template, request, session
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+
+class CachedPage:
+    """One rendered page and its precompressed encodings."""
+
+    def __init__(self, html: str):
+        self.body = html.encode("utf-8")
+        self.etag = hashlib.sha1(self.body).hexdigest()[:20]
+        self.encoded = {"gzip": gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if BROTLI_AVAILABLE:
+            self.encoded["br"] = brotli.compress(self.body)
+
+
+class PageCache:
+    """Per-app cache of rendered templates."""
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = os.environ.get("PAGE_CACHE", "1") != "0"
+        self.check_interval = float(os.environ.get("PAGE_CACHE_CHECK_INTERVAL", "1"))
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._templates_mtime = None
+        self._last_check = 0.0
+
+    def _templates_version(self):
+        folder = os.path.join(self.app.root_path, self.app.template_folder)
+        try:
+            return max(entry.stat().st_mtime_ns for entry in os.scandir(folder) if entry.is_file())
+        except (OSError, ValueError):
+            return None
+
+    def _check_templates(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            version = self._templates_version()
+            if version != self._templates_mtime:
+                self._templates_mtime = version
+                self._pages.clear()
+
+    def _negotiate(self, page: CachedPage):
+        """Pick the best precompressed encoding the client accepts."""
+        accepted = request.accept_encodings
+        for encoding in ("br", "gzip"):
+            if encoding in page.encoded and accepted[encoding]:
+                return encoding, page.encoded[encoding]
+        return None, page.body
+
+    def render(self, template: str):
+        """Return a response for ``template``, rendering it only on a miss."""
+        if not self.enabled or self.app.debug:
+            return render_template(template)
+
+        self._check_templates()
+        key = (template, bool(session.get('result_id')))
+        page = self._pages.get(key)
+        if page is None:
+            page = CachedPage(render_template(template))
+            self._pages[key] = page
+
+        encoding, body = self._negotiate(page)
+        etag = page.etag + ("-" + encoding if encoding else "")
+        headers = {
+            "ETag": f'"{etag}"',
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if request.if_none_match.contains_weak(etag):
+            return self.app.response_class(status=304, headers=headers)
+
+        response = self.app.response_class(body, mimetype="text/html", headers=headers)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Per-profile features, derived once and shared by every analysis stage.
+
+``ProfileFeatures`` splits a profile's free-text fields into lowercase tokens
+once; given a compiled ``CareerMatcher`` it also resolves which catalog
+patterns each field contains. Stages then test token membership against
+the field's token set and reuse the matched pattern ids instead of re-lowercasing and re-joining the profile
+and scanning substrings.
+
+Matching is by whole tokens: a pattern hits when its tokens occur
+consecutively in the field, so "ai" matches "AI tools" but not "maintain".
+"""
+import re
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List
+
+# Words keep inner dots and trailing +/# (node.js, c++, c#); anything else splits
+_TOKEN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def phrase(text: str) -> str:
+    """Canonical form of a pattern: its tokens joined by single spaces."""
+    return " ".join(tokenize(text))
+
+
+def contains_phrase(text_phrase: str, term: str) -> bool:
+    """True if canonical ``term`` occurs as whole tokens in canonical ``text_phrase``."""
+    return f" {term} " in f" {text_phrase} "
+
+
+class ProfileFeatures:
+    """Tokens and matched pattern ids of one profile."""
+
+    __slots__ = (
+        "interest_tokens", "goal_tokens", "text_tokens", "skill_tokens",
+        "_interest_set", "_skill_set",
+        "text_ids", "skill_ids", "goal_ids",
+    )
+
+    def __init__(self, profile: Dict, matcher=None):
+        self.interest_tokens = tokenize(str(profile.get("interests") or ""))
+        self.goal_tokens = tokenize(str(profile.get("career_goals") or ""))
+        # Interests and goals are matched together, as in the original ranking
+        self.text_tokens = self.interest_tokens + self.goal_tokens
+        self.skill_tokens = tokenize(" ".join(profile.get("skills", ())))
+        self._interest_set = self._skill_set = None
+
+        if matcher is not None:
+            self.text_ids, self.skill_ids, self.goal_ids = matcher.lookup(self)
+        else:
+            self.text_ids = self.skill_ids = self.goal_ids = None
+
+    # Ordered token lists feed phrase matching; membership tests use these
+    # sets, built on first use since most profiles are matched, not tested
+
+    @property
+    def interest_set(self) -> FrozenSet[str]:
+        if self._interest_set is None:
+            self._interest_set = frozenset(self.interest_tokens)
+        return self._interest_set
+
+    @property
+    def skill_set(self) -> FrozenSet[str]:
+        if self._skill_set is None:
+            self._skill_set = frozenset(self.skill_tokens)
+        return self._skill_set
+
+    @staticmethod
+    def has_any(tokens: AbstractSet[str], words: Iterable[str]) -> bool:
+        """True if any of the single-word ``words`` is in the token set ``tokens``."""
+        return not tokens.isdisjoint(words)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Sampled cProfile dumps of live requests.
+
+When on, one request in ``PROFILE_SAMPLE_RATE`` is profiled; with
+``PROFILE_SLOW_MS`` set, every request is profiled and kept if it took longer
+than that (so that slow requests are caught, at the cost of profiling them
+all). Each kept profile is written as
+``<PROFILE_DIR>/<timestamp>_<method>_<route>_<ms>ms_<pid>.pstats`` and only
+the newest ``PROFILE_KEEP`` files are kept.
+
+``PROFILE_REQUESTS=1`` turns it on at startup. With ``PROFILER_TOKEN`` set,
+``/admin/profiler`` shows the settings (GET) or changes them (POST JSON
+``{"enabled": true, "sample_rate": 100, "slow_ms": 500}``) for every worker:
+the settings are written to ``profiler.json`` in ``PROFILE_DIR``, which each
+worker re-reads when it changes. Only one request per process is profiled at
+a time.
+
+``profile_report.py`` merges the dumps into a top-N report.
+"""
+import cProfile
+import hmac
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+
+from flask import jsonify, request
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "career-advisor-profiles"))
+SETTINGS_FILE = "profiler.json"
+
+
+def _defaults():
+    return {
+        "enabled": os.environ.get("PROFILE_REQUESTS", "0") == "1",
+        "sample_rate": int(os.environ.get("PROFILE_SAMPLE_RATE", "100")),
+        "slow_ms": float(os.environ.get("PROFILE_SLOW_MS", "0")),
+        "keep": int(os.environ.get("PROFILE_KEEP", "50")),
+    }
+
+
+_TRUE = ("1", "true", "on", "yes")
+_FALSE = ("0", "false", "off", "no")
+
+
+def _as_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in _TRUE + _FALSE:
+        return value.strip().lower() in _TRUE
+    raise ValueError("expected true or false")
+
+
+def _as_number(kind, minimum):
+    def coerce(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"expected a number >= {minimum}")
+        try:
+            number = float(value)
+            if kind is int and number != int(number):
+                raise ValueError
+        except (ValueError, OverflowError):
+            raise ValueError(f"expected {'an integer' if kind is int else 'a number'} >= {minimum}") from None
+        if not number >= minimum:
+            raise ValueError(f"expected a number >= {minimum}")
+        return kind(number)
+    return coerce
+
+
+# Setting -> coercion; each raises ValueError for a value it cannot accept
+SETTINGS = {
+    "enabled": _as_bool,
+    "sample_rate": _as_number(int, 1),
+    "slow_ms": _as_number(float, 0),
+    "keep": _as_number(int, 0),
+}
+
+
+def validate_settings(changes: dict) -> dict:
+    """Coerce the known settings in ``changes``; raises ValueError naming the bad one."""
+    valid = {}
+    for key, coerce in SETTINGS.items():
+        if key in changes:
+            try:
+                valid[key] = coerce(changes[key])
+            except ValueError as exc:
+                raise ValueError(f"{key}: {exc}") from None
+    return valid
+
+
+def dump_name(method: str, path: str, elapsed_ms: float, when: float = None) -> str:
+    """File name for one profile: sortable timestamp, route, duration and pid."""
+    when = time.time() if when is None else when
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(when)) + f"{when % 1:.3f}"[1:]
+    route = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "index"
+    return f"{stamp}_{method}_{route}_{elapsed_ms:.0f}ms_{os.getpid()}.pstats"
+
+
+class RequestProfiler:
+    """WSGI middleware profiling a sample of requests of one Flask app."""
+
+    def __init__(self, app, directory: str = None, check_interval: float = 1.0):
+        self.app = app
+        self.directory = directory or PROFILE_DIR
+        self.check_interval = check_interval
+        self.settings = _defaults()
+        self.token = os.environ.get("PROFILER_TOKEN")
+        self._counter = itertools.count(1)
+        self._busy = threading.Lock()
+        self._checked = 0.0
+        self._settings_mtime = None
+        self._wrapped = app.wsgi_app
+        app.wsgi_app = self
+
+    # -- settings shared by all workers ------------------------------------
+
+    def _settings_path(self):
+        return os.path.join(self.directory, SETTINGS_FILE)
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self._settings_path()).st_mtime
+        except OSError:
+            return
+        if mtime == self._settings_mtime:
+            return
+        try:
+            with open(self._settings_path(), encoding="utf-8") as fh:
+                stored = json.load(fh)
+            self.settings = dict(_defaults(), **validate_settings(stored if isinstance(stored, dict) else {}))
+            self._settings_mtime = mtime
+        except (OSError, ValueError):
+            pass
+
+    def configure(self, **changes):
+        """Change the settings here and, through the settings file, in every worker.
+
+        Raises ValueError (and changes nothing) if a value is invalid.
+        """
+        self.settings = dict(self.settings, **validate_settings(changes))
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._settings_path() + f".{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.settings, fh)
+        os.replace(tmp, self._settings_path())
+        self._settings_mtime = os.stat(self._settings_path()).st_mtime
+        return self.settings
+
+    # -- request path -------------------------------------------------------
+
+    def __call__(self, environ, start_response):
+        self._refresh()
+        settings = self.settings
+        if not settings["enabled"]:
+            return self._wrapped(environ, start_response)
+        slow_ms = settings["slow_ms"]
+        sampled = next(self._counter) % max(1, settings["sample_rate"]) == 0
+        if not (sampled or slow_ms) or not self._busy.acquire(blocking=False):
+            return self._wrapped(environ, start_response)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                return self._wrapped(environ, start_response)
+            finally:
+                profiler.disable()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if sampled or elapsed_ms >= slow_ms:
+                    self._save(profiler, environ, elapsed_ms)
+        finally:
+            self._busy.release()
+
+    def _save(self, profiler, environ, elapsed_ms):
+        os.makedirs(self.directory, exist_ok=True)
+        name = dump_name(environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO", "/"), elapsed_ms)
+        profiler.dump_stats(os.path.join(self.directory, name))
+        dumps = sorted(f for f in os.listdir(self.directory) if f.endswith(".pstats"))
+        for old in dumps[:max(0, len(dumps) - self.settings["keep"])]:
+            try:
+                os.unlink(os.path.join(self.directory, old))
+            except OSError:
+                pass
+
+    # -- admin toggle -------------------------------------------------------
+
+    def admin(self):
+        """``/admin/profiler``: requires ``PROFILER_TOKEN`` as a bearer token."""
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not self.token:
+            return jsonify(error="profiler toggle is not configured"), 404
+        if not hmac.compare_digest(supplied.encode(), self.token.encode()):
+            return jsonify(error="forbidden"), 403
+        if request.method == "POST":
+            changes = request.get_json(silent=True)
+            if not isinstance(changes, dict):
+                return jsonify(error="expected a JSON object"), 400
+            try:
+                self.configure(**changes)
+            except ValueError as exc:
+                return jsonify(error=str(exc)), 400
+        else:
+            self._checked = 0.0
+            self._refresh()
+        return jsonify(self.settings)
+
+
+def aggregate(paths, top: int = 30, sort: str = "cumulative", restrict: str = None) -> str:
+    """Merge ``.pstats`` dumps and return the top-N report as text."""
+    out = io.StringIO()
+    stats = pstats.Stats(*paths, stream=out)
+    stats.strip_dirs().sort_stats(sort)
+    if restrict:
+        stats.print_stats(restrict, top)
+    else:
+        stats.print_stats(top)
+    return out.getvalue()
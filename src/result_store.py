@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Server-side storage for analysis results.
+
+The session cookie only carries an opaque result ID; the results dict lives
+here. Two backends:
+
+- ``MemoryResultStore``: per-process LRU with TTL (default).
+- ``SQLiteResultStore``: a SQLite file shared by all workers on the host,
+  rows stored as zlib-compressed compact JSON.
+
+Select with ``RESULT_STORE=memory|sqlite``; ``RESULT_STORE_PATH``,
+``RESULT_TTL`` (seconds) and ``RESULT_STORE_MAX`` (memory entries) tune them.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def _dumps(results: Dict) -> bytes:
+    """Compact serialization: minimal JSON, zlib-compressed."""
+    raw = json.dumps(results, separators=(",", ":"), ensure_ascii=False)
+    return zlib.compress(raw.encode("utf-8"))
+
+
+def _loads(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def new_result_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+class MemoryResultStore:
+    """Bounded in-process LRU of results with per-entry expiry.
+
+    Results are kept as the dicts themselves; nothing leaves the process so
+    there is nothing to serialize.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def put(self, results: Dict) -> str:
+        result_id = new_result_id()
+        with self._lock:
+            self._entries[result_id] = (time.time() + self.ttl, results)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: Optional[str]) -> Optional[Dict]:
+        if not result_id:
+            return None
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return None
+            expires, results = entry
+            if expires < time.time():
+                del self._entries[result_id]
+                return None
+            self._entries.move_to_end(result_id)
+        return results
+
+    def replace(self, result_id: Optional[str], results: Dict):
+        """Overwrite stored results in place, keeping their ID and expiry."""
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is not None:
+                self._entries[result_id] = (entry[0], results)
+
+    def delete(self, result_id: Optional[str]):
+        with self._lock:
+            self._entries.pop(result_id, None)
+
+
+class SQLiteResultStore:
+    """Results in a SQLite file, shared by every worker process."""
+
+    # Expired rows are purged on every Nth put
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str, ttl: float = 3600.0):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._puts = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "id TEXT PRIMARY KEY, expires REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process, so it is fork-safe)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def put(self, results: Dict) -> str:
+        result_id = new_result_id()
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO results (id, expires, data) VALUES (?, ?, ?)",
+            (result_id, now + self.ttl, _dumps(results)),
+        )
+        self._puts += 1
+        if self._puts % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM results WHERE expires < ?", (now,))
+        return result_id
+
+    def get(self, result_id: Optional[str]) -> Optional[Dict]:
+        if not result_id:
+            return None
+        row = self._connect().execute(
+            "SELECT data FROM results WHERE id = ? AND expires >= ?",
+            (result_id, time.time()),
+        ).fetchone()
+        return _loads(row[0]) if row else None
+
+    def replace(self, result_id: Optional[str], results: Dict):
+        """Overwrite stored results in place, keeping their ID and expiry."""
+        if result_id:
+            self._connect().execute(
+                "UPDATE results SET data = ? WHERE id = ?", (_dumps(results), result_id)
+            )
+
+    def delete(self, result_id: Optional[str]):
+        if result_id:
+            self._connect().execute("DELETE FROM results WHERE id = ?", (result_id,))
+
+
+def create_result_store(kind: str = None):
+    """Build the store selected by ``kind`` or the ``RESULT_STORE`` variable."""
+    kind = kind or os.environ.get("RESULT_STORE", "memory")
+    ttl = float(os.environ.get("RESULT_TTL", "3600"))
+    if kind == "sqlite":
+        path = os.environ.get(
+            "RESULT_STORE_PATH", os.path.join(tempfile.gettempdir(), "career_advisor_results.db")
+        )
+        return SQLiteResultStore(path, ttl=ttl)
+    if kind != "memory":
+        raise ValueError(f"Unknown RESULT_STORE {kind!r}; expected 'memory' or 'sqlite'")
+    return MemoryResultStore(int(os.environ.get("RESULT_STORE_MAX", "1000")), ttl=ttl)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing for the request hot path.
+
+``stage("name")`` times a block of work. Durations go into latency
+histograms (Prometheus text format at ``/metrics``) and, for the current
+request, into a ``Server-Timing`` response header so browser devtools show
+where the time went.
+
+Each gunicorn worker writes its histograms to ``<METRICS_DIR>/<master
+pid>/<worker pid>.json`` (at most every ``METRICS_FLUSH_INTERVAL`` seconds
+and on every scrape); ``/metrics`` merges all files under the master's
+directory, so any worker answers for the whole server.
+
+Off unless ``STAGE_METRICS=1``. When off, ``stage()`` returns a shared no-op
+context manager and no request hooks are installed.
+"""
+import bisect
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from flask import Response, request
+from flask.sessions import SecureCookieSessionInterface
+
+ENABLED = os.environ.get("STAGE_METRICS", "0") == "1"
+METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(tempfile.gettempdir(), "career-advisor-metrics"))
+FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+
+# Histogram upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+# Stage timings of the request being served: [(stage, seconds), ...] or None
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+
+class Histograms:
+    """Cumulative latency histograms keyed by (metric, labels)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {(metric, ((label, value), ...)): [bucket counts..., +Inf count, sum]}
+        self._series = {}
+
+    def observe(self, metric: str, labels: tuple, seconds: float):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            series = self._series.get((metric, labels))
+            if series is None:
+                series = self._series[(metric, labels)] = [0] * (len(BUCKETS) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return [[metric, list(labels), list(series)] for (metric, labels), series in self._series.items()]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+histograms = Histograms()
+
+
+@contextmanager
+def _timed(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histograms.observe("stage_duration_seconds", (("stage", name),), elapsed)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, elapsed))
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage; free when metrics are off."""
+    if not ENABLED:
+        return _NOOP
+    return _timed(name)
+
+
+def server_timing(stages) -> str:
+    """``Server-Timing`` value; repeated stages (e.g. in a batch) are summed."""
+    totals = {}
+    for name, seconds in stages:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in totals.items())
+
+
+# ---------------------------------------------------------------------------
+# Cross-worker aggregation
+# ---------------------------------------------------------------------------
+
+def _worker_dir() -> str:
+    # Workers of one gunicorn master share its pid as parent; a restarted
+    # server gets a fresh directory and so starts counting from zero
+    return os.path.join(METRICS_DIR, str(os.getppid()))
+
+
+_last_flush = 0.0
+
+
+def flush(force: bool = False):
+    """Write this worker's histograms for the others to merge."""
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    directory = _worker_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(histograms.snapshot(), fh)
+    os.replace(tmp, path)
+
+
+def collect():
+    """Merge every worker's flushed histograms: {(metric, labels): series}."""
+    flush(force=True)
+    merged = {}
+    directory = _worker_dir()
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as fh:
+                entries = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        for metric, labels, series in entries:
+            key = (metric, tuple(tuple(pair) for pair in labels))
+            total = merged.get(key)
+            if total is None:
+                merged[key] = list(series)
+            else:
+                merged[key] = [a + b for a, b in zip(total, series)]
+    return merged
+
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+HELP = {
+    "stage_duration_seconds": "Time spent in one analysis or request stage",
+    "http_request_duration_seconds": "Time from request start to response, by endpoint",
+}
+
+
+def render() -> str:
+    """Prometheus text exposition of the merged histograms."""
+    lines = []
+    merged = collect()
+    for metric in sorted({metric for metric, _ in merged}):
+        lines.append(f"# HELP {metric} {HELP.get(metric, metric)}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), series in sorted(merged.items()):
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_label_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {series[-1]:.6f}")
+            lines.append(f"{metric}_count{_label_text(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Flask wiring
+# ---------------------------------------------------------------------------
+
+class StageMetrics:
+    """Request hooks and the ``/metrics`` response for one Flask app."""
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = ENABLED
+        if not self.enabled:
+            return
+        app.before_request(self._begin)
+        # Registered first, so it runs after the app's own after_request hooks.
+        # Flask skips save_session for null sessions, so the request is
+        # finished here rather than by the session interface
+        app.after_request(_finish)
+        app.session_interface = TimedSessionInterface()
+
+    @staticmethod
+    def _begin():
+        request.environ["stage_metrics.start"] = begin_request()
+
+    def response(self):
+        """Body for the ``/metrics`` route (404 when metrics are off)."""
+        if not self.enabled:
+            return Response("stage metrics are disabled\n", status=404, mimetype="text/plain")
+        return Response(render(), mimetype="text/plain; version=0.0.4")
+
+
+def begin_request() -> float:
+    """Start collecting the current request's stages; returns its start time."""
+    _request_stages.set([])
+    return time.perf_counter()
+
+
+def end_request(start: float, endpoint: str, method: str, status: int) -> str:
+    """Record a request begun at ``start``; returns its ``Server-Timing`` value."""
+    stages = _request_stages.get() or []
+    total = time.perf_counter() - start
+    histograms.observe(
+        "http_request_duration_seconds",
+        (("endpoint", endpoint or "none"), ("method", method), ("status", str(status))),
+        total,
+    )
+    _request_stages.set(None)
+    flush()
+    return server_timing(stages + [("total", total)])
+
+
+def _finish(response):
+    start = request.environ.pop("stage_metrics.start", None)
+    if start is None:
+        return response
+    response.headers["Server-Timing"] = end_request(start, request.endpoint, request.method, response.status_code)
+    return response
+
+
+class TimedSessionInterface(SecureCookieSessionInterface):
+    """Cookie sessions whose save is timed as the ``session`` stage.
+
+    The save runs after the request has been finished, so it is recorded in
+    the histograms but not in that response's ``Server-Timing`` header.
+    """
+
+    def save_session(self, app, session, response):
+        with stage("session"):
+            super().save_session(app, session, response)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Startup timeline: milestones from process start to the first response.
+
+``mark(name)`` records a milestone; ``report()`` lists them in milliseconds
+since the process started (read from /proc where available, otherwise since
+this module was imported). The app marks its build steps and its first
+response, logs the timeline once, and serves it at ``/api/startup``.
+``benchmarks/bench_startup.py`` adds per-module import times.
+"""
+import logging
+import os
+import threading
+import time
+
+_IMPORTED = time.time()
+
+
+def _process_start() -> float:
+    """Wall-clock time this process started."""
+    try:
+        with open("/proc/self/stat") as fh:
+            start_ticks = int(fh.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as fh:
+            uptime = float(fh.read().split()[0])
+        return time.time() - (uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return _IMPORTED
+
+
+PROCESS_START = _process_start()
+_marks = []
+_lock = threading.Lock()
+
+
+def mark(name: str):
+    with _lock:
+        _marks.append((name, time.time()))
+
+
+def report():
+    """[(milestone, ms since process start), ...] in the order recorded."""
+    with _lock:
+        return [(name, round((when - PROCESS_START) * 1000, 1)) for name, when in _marks]
+
+
+def has(name: str) -> bool:
+    with _lock:
+        return any(existing == name for existing, _ in _marks)
+
+
+def log_report():
+    logging.getLogger("startup").info(
+        "startup timeline (pid %d): %s", os.getpid(),
+        ", ".join(f"{name} {ms:.0f} ms" for name, ms in report()),
+    )
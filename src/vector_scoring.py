@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Optional NumPy scoring backend for scoring many profiles at once.
+
+The catalog's keyword/category, skill and career-name patterns become the
+columns of a profile feature matrix ``X`` (one row per profile, 1 where the
+pattern occurs in the relevant profile field). A weight matrix ``W`` holds
+the 10/5/3/15 points each feature contributes to each career, so a whole
+cohort is scored with one product ``X @ W`` and each profile's hits are ranked
+with one ``lexsort``.
+
+Both matrices are kept in CSR form. Every career name is its own feature, so
+a dense ``W`` would grow with careers²; each feature posts to only a few
+careers, so the CSR ``W`` grows with the number of postings instead, and the
+product only touches the (profile, career) cells that actually score.
+
+Results are identical to ``CareerMatcher.score`` / ``CareerMatcher.top``:
+same whole-token matching, same weights, ties broken by catalog order.
+
+NumPy is optional; check ``NUMPY_AVAILABLE`` before constructing a
+``VectorScorer``.
+"""
+from typing import List, Sequence, Tuple
+
+from matching import CareerMatcher
+from profile_features import ProfileFeatures
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+# Profiles encoded and scored per chunk, keeps peak memory flat for huge cohorts
+CHUNK_PROFILES = 4096
+
+
+class VectorScorer:
+    """Batch scorer over a compiled ``CareerMatcher``."""
+
+    def __init__(self, matcher: CareerMatcher):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("vector_scoring: numpy is not installed")
+        self.matcher = matcher
+        self.n_careers = len(matcher.positions)
+        # W in CSR form: row f's postings are w_cols/w_vals[w_indptr[f]:w_indptr[f + 1]]
+        postings = np.array(list(matcher.feature_postings()), dtype=np.int64).reshape(-1, 3)
+        postings = postings[np.argsort(postings[:, 0], kind="stable")]
+        self.w_indptr = np.zeros(matcher.n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(postings[:, 0], minlength=matcher.n_features), out=self.w_indptr[1:])
+        self.w_cols = postings[:, 1].copy()
+        self.w_vals = postings[:, 2].astype(np.int32)
+
+    def encode(self, profiles: Sequence[ProfileFeatures]):
+        """Encode ``ProfileFeatures`` as ``X``.
+
+        ``X`` is returned in CSR form ``(indptr, indices)``: profiles hit only
+        a handful of the catalog's patterns, so the dense matrix would be
+        almost entirely zeros.
+        """
+        features = self.matcher.features
+        indptr = np.zeros(len(profiles) + 1, dtype=np.int64)
+        indices = []
+        for row, profile in enumerate(profiles):
+            indices.extend(features(profile))
+            indptr[row + 1] = len(indices)
+        return indptr, np.asarray(indices, dtype=np.int64)
+
+    def hits(self, X):
+        """Return the non-zero cells of ``X @ W`` as ``(rows, careers, scores)``.
+
+        Sparse x sparse product: every non-zero of X is expanded into W's
+        postings for that feature, and equal (row, career) cells are summed.
+        Cost follows the number of postings hit, not profiles x careers.
+        """
+        indptr, indices = X
+        n = len(indptr) - 1
+        empty = np.zeros(0, dtype=np.int64)
+        if len(indices) == 0:
+            return empty, empty, empty
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+        starts = self.w_indptr[indices]
+        counts = self.w_indptr[indices + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return empty, empty, empty
+        offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        slots = np.repeat(starts, counts) + offsets
+        cells = np.repeat(rows, counts) * self.n_careers + self.w_cols[slots]
+        cells, inverse = np.unique(cells, return_inverse=True)
+        sums = np.bincount(inverse, weights=self.w_vals[slots]).astype(np.int64)
+        keep = sums > 0
+        cells, sums = cells[keep], sums[keep]
+        return cells // self.n_careers, cells % self.n_careers, sums
+
+    def top_k_hits(self, n: int, hits, k: int):
+        """Per-profile top-k career indices from ``hits()``, best first."""
+        rows, careers, sums = hits
+        # Higher score first, then lower catalog index; rows grouped together
+        order = np.lexsort((careers, -sums, rows))
+        rows, careers = rows[order], careers[order]
+        row_start = np.searchsorted(rows, np.arange(n))
+        rank = np.arange(len(rows)) - row_start[rows]
+        keep = rank < k
+        rows, careers = rows[keep], careers[keep]
+        bounds = np.searchsorted(rows, np.arange(n + 1))
+        careers = careers.tolist()
+        return [careers[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+    def top_positions(self, profiles: Sequence[ProfileFeatures], k: int) -> List[List[Tuple[str, int]]]:
+        """Score a cohort and return each profile's top-k catalog positions."""
+        positions = self.matcher.positions
+        out = []
+        for start in range(0, len(profiles), CHUNK_PROFILES):
+            chunk = profiles[start:start + CHUNK_PROFILES]
+            best = self.top_k_hits(len(chunk), self.hits(self.encode(chunk)), k)
+            out.extend([positions[i] for i in row] for row in best)
+        return out
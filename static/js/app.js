@@ -20,9 +20,6 @@ document.addEventListener('DOMContentLoaded', function() {
     if (document.querySelector('.results-header')) {
         initializeResultsAnimations();
     }
-
-    // Background keep-alive ping every 30s (no UI impact)
-    startKeepAlive();
 });
 
 // Enhanced Multi-step form functionality
@@ -359,41 +356,42 @@ function initializeResultsAnimations() {
     // Typewriter effect for motivation text
     const motivationText = document.querySelector('.motivation-content p');
     if (motivationText) {
-        const text = motivationText.textContent;
-        motivationText.textContent = '';
-        motivationText.style.borderRight = '2px solid #007bff';
-        
-        let i = 0;
-        const typeWriter = () => {
-            if (i < text.length) {
-                motivationText.textContent += text.charAt(i);
-                i++;
-                setTimeout(typeWriter, 50);
-            } else {
-                motivationText.style.borderRight = 'none';
-            }
+        const typeText = (text) => {
+            motivationText.textContent = '';
+            motivationText.style.borderRight = '2px solid #007bff';
+            
+            let i = 0;
+            const typeWriter = () => {
+                if (i < text.length) {
+                    motivationText.textContent += text.charAt(i);
+                    i++;
+                    setTimeout(typeWriter, 50);
+                } else {
+                    motivationText.style.borderRight = 'none';
+                }
+            };
+            typeWriter();
         };
         
-        setTimeout(typeWriter, 1000);
+        const adviceSrc = motivationText.dataset.adviceSrc;
+        if (adviceSrc && window.EventSource) {
+            // The advice was still generating when the page was served
+            const source = new EventSource(adviceSrc);
+            source.addEventListener('advice', (event) => {
+                source.close();
+                typeText(JSON.parse(event.data).advice);
+            });
+            source.onerror = () => {
+                source.close();
+                typeText(motivationText.dataset.adviceFallback);
+            };
+        } else {
+            const text = adviceSrc ? motivationText.dataset.adviceFallback : motivationText.textContent;
+            setTimeout(() => typeText(text), 1000);
+        }
     }
 }
 
-// Keep-alive pinger to prevent free host idle while tab is open
-function startKeepAlive() {
-    const KEEPALIVE_URL = '/_keepalive';
-    const INTERVAL_MS = 30000; // 30 seconds
-
-    const ping = () => {
-        // Use fetch with no-store to avoid caches; swallow errors
-        fetch(KEEPALIVE_URL, { method: 'GET', cache: 'no-store', headers: { 'x-keepalive': '1' } })
-            .catch(() => {});
-    };
-
-    // Prime immediately, then schedule
-    ping();
-    setInterval(ping, INTERVAL_MS);
-}
-
 // Utility functions
 function showNotification(message, type = 'info') {
     const notification = document.createElement('div');
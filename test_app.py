@@ -49,6 +49,500 @@ def test_career_advisor_logic():
         print(f"❌ Career advisor logic error: {e}")
         return False
 
+def test_career_matching():
+    """Test the compiled matcher against a brute-force scan of the catalog"""
+    print("\n🔎 Testing Career Matching...")
+    
+    advisor = WebCareerAdvisor()
+    profiles = [
+        ('I love programming and building web applications', 'I want to become a software developer', 'Python, JavaScript'),
+        ('cybersecurity and ethical hacker work', 'security engineer', 'Kali Linux, Python'),
+        ('maintain design systems', 'ux research', 'Figma, SQL'),
+        ('', '', ''),
+    ]
+    
+    from profile_features import ProfileFeatures, phrase
+    
+    def contains(text, pattern):
+        # Whole tokens: the pattern's words appear consecutively in the text
+        return bool(phrase(pattern)) and f" {phrase(pattern)} " in f" {phrase(text)} "
+    
+    for interests, goals, skills in profiles:
+        advisor.process_user_data({'interests': interests, 'career_goals': goals, 'skills': skills})
+        user_text = f"{interests} {goals}"
+        user_skills = " ".join(s.strip() for s in skills.split(',') if s.strip())
+        
+        expected = []
+        for category, data in advisor.career_data.items():
+            for career in data["careers"]:
+                score = sum(10 for k in career["keywords"] if contains(user_text, k))
+                score += sum(5 for s in career["skills"] if contains(user_skills, s))
+                score += 3 if contains(user_text, category) else 0
+                score += 15 if contains(goals, career["name"]) else 0
+                if score > 0:
+                    expected.append((score, career))
+        expected.sort(key=lambda x: x[0], reverse=True)
+        expected = [career for score, career in expected[:3]]
+        
+        suggestions = advisor.suggest_careers()
+        if expected and suggestions != expected:
+            print(f"❌ Ranking mismatch for interests '{interests}': FAILED")
+            return False
+    
+    # "ai" is a word of its own, not part of "maintain"
+    matcher = advisor._get_matcher()
+    hits = {interests: matcher.score(ProfileFeatures({'interests': interests, 'skills': []}, matcher))
+            for interests in ('maintain', 'AI tools')}
+    if hits['maintain'] or not hits['AI tools']:
+        print("❌ Whole-token matching: FAILED")
+        return False
+
+    # Membership tests use the token sets, still whole tokens only
+    features = ProfileFeatures({'interests': 'Communication, AI', 'skills': ['Node.js', 'Python']})
+    if (features.interest_set != {'communication', 'ai'}
+            or not features.has_any(features.skill_set, ('java', 'python'))
+            or features.has_any(features.skill_set, ('node', 'py'))):
+        print("❌ Token set membership: FAILED")
+        return False
+
+    print("✅ Compiled matcher ranking: SUCCESS")
+    return True
+
+def test_catalog():
+    """Test the frozen, hot-reloadable shared catalog"""
+    print("\n📚 Testing Career Catalog...")
+    
+    import json
+    import os
+    import tempfile
+    import time
+    import catalog
+    
+    advisor = WebCareerAdvisor()
+    try:
+        advisor.career_data["tech"]["careers"][0]["skills"].append("Cobol")
+        print("❌ Catalog is writable: FAILED")
+        return False
+    except (TypeError, AttributeError):
+        pass
+    try:
+        advisor.career_data["new"] = {}
+        print("❌ Catalog is writable: FAILED")
+        return False
+    except TypeError:
+        print("✅ Catalog is frozen: SUCCESS")
+    
+    with open(catalog.DEFAULT_CATALOG_PATH, encoding="utf-8") as fh:
+        data = json.load(fh)
+    saved = {key: os.environ.get(key) for key in ("CAREER_CATALOG_PATH", "CAREER_CATALOG_RELOAD_INTERVAL")}
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    
+    def write(text, bump):
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+    
+    try:
+        write(json.dumps(data), 0)
+        os.environ["CAREER_CATALOG_PATH"] = path
+        os.environ["CAREER_CATALOG_RELOAD_INTERVAL"] = "0.001"
+        time.sleep(0.01)
+        first = catalog.get_catalog()
+        
+        data["design"]["careers"].append(
+            {"name": "Game Designer", "skills": ["Unity"], "keywords": ["games"]})
+        write(json.dumps(data), 10**9)
+        time.sleep(0.01)
+        second = catalog.get_catalog()
+        names = [c["name"] for c in WebCareerAdvisor().career_data["design"]["careers"]]
+        if first.path == path and second.version != first.version and "Game Designer" in names:
+            print("✅ Catalog hot-reload on mtime change: SUCCESS")
+        else:
+            print("❌ Catalog not reloaded: FAILED")
+            return False
+        
+        write("{not json", 2 * 10**9)
+        time.sleep(0.01)
+        if catalog.get_catalog() is second:
+            print("✅ Invalid catalog keeps previous version: SUCCESS")
+        else:
+            print("❌ Invalid catalog replaced the previous version: FAILED")
+            return False
+        return True
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        os.unlink(path)
+        time.sleep(0.01)
+        catalog.get_catalog()
+
+def test_batch_scoring():
+    """Test that batch scoring backends agree with per-profile scoring"""
+    print("\n📊 Testing Batch Scoring...")
+    
+    from vector_scoring import NUMPY_AVAILABLE
+    
+    advisor = WebCareerAdvisor()
+    forms = [
+        {'skills': 'Python, SQL', 'interests': 'data and ai', 'career_goals': 'data scientist'},
+        {'skills': 'Figma', 'interests': 'design', 'career_goals': 'ux designer'},
+        {'skills': 'HTML', 'interests': 'cooking', 'career_goals': 'travel'},
+        {'skills': '', 'interests': '', 'career_goals': ''},
+    ]
+    profiles = [dict(advisor.process_user_data(form)) for form in forms]
+    
+    expected = []
+    for profile in profiles:
+        advisor.user_profile = profile
+        expected.append(advisor.suggest_careers())
+    
+    backends = ['python'] + (['numpy'] if NUMPY_AVAILABLE else [])
+    for backend in backends:
+        if advisor.suggest_careers_batch(profiles, backend=backend) != expected:
+            print(f"❌ {backend} batch scoring mismatch: FAILED")
+            return False
+        print(f"✅ {backend} batch scoring: SUCCESS")
+    
+    if NUMPY_AVAILABLE:
+        import os
+        from catalog import Catalog
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+        from synthetic import generate_catalog, generate_profiles
+        
+        # Large synthetic catalog: W stays sparse and rankings still agree
+        big = Catalog(generate_catalog(2000))
+        scorer = big.vector_scorer()
+        postings = sum(1 for _ in big.matcher.feature_postings())
+        advisor.catalog, advisor.career_data = big, big.data
+        cohort = generate_profiles(big.data, 50)
+        if len(scorer.w_cols) != postings:
+            print(f"❌ W holds {len(scorer.w_cols)} entries for {postings} postings: FAILED")
+            return False
+        if advisor.suggest_careers_batch(cohort, backend='numpy') != advisor.suggest_careers_batch(cohort, backend='python'):
+            print("❌ numpy scoring mismatch on a 2000-career catalog: FAILED")
+            return False
+        print("✅ Sparse weights on a 2000-career catalog: SUCCESS")
+    
+    return True
+
+def test_advice_timeout():
+    """Test that slow AI advice falls back immediately and is cached late"""
+    print("\n⏱️ Testing Advice Timeout...")
+    
+    import time
+    import types
+    import career_advisor
+    
+    release = __import__('threading').Event()
+    
+    def slow_generate_text(prompt, *args):
+        release.wait(5)
+        return "AI advice for you"
+    
+    fake = types.SimpleNamespace(generate_text=slow_generate_text, is_available=lambda: True)
+    real = sys.modules.get('gcloud_ai')
+    sys.modules['gcloud_ai'] = fake
+    try:
+        career_advisor.advice_cache.clear()
+        advisor = WebCareerAdvisor()
+        advisor.process_user_data({'name': 'Slow', 'skills': 'Python', 'interests': 'timeouts'})
+        
+        start = time.monotonic()
+        advice = advisor.generate_advice()
+        elapsed = time.monotonic() - start
+        if advice != "AI advice for you" and elapsed < career_advisor.ADVICE_TIMEOUT + 0.5:
+            print(f"✅ Local fallback after {elapsed:.2f}s: SUCCESS")
+        else:
+            print(f"❌ Advice blocked for {elapsed:.2f}s: FAILED")
+            return False
+        
+        release.set()
+        time.sleep(0.2)
+        if advisor.generate_advice() == "Slow: AI advice for you":
+            print("✅ Late AI result cached: SUCCESS")
+        else:
+            print("❌ Late AI result not cached: FAILED")
+            return False
+        
+        # The model call overlaps the analysis: latency is max(analysis, advice), not the sum
+        def timed_generate_text(prompt, *args):
+            time.sleep(0.3)
+            return "Overlapped advice"
+        
+        sys.modules['gcloud_ai'] = types.SimpleNamespace(generate_text=timed_generate_text, is_available=lambda: True)
+        advisor = WebCareerAdvisor()
+        advisor.process_user_data({'name': 'Overlap', 'skills': 'Elixir', 'interests': 'overlap timing'})
+        analyze_profile = advisor.analyze_profile
+        advisor.analyze_profile = lambda: (time.sleep(0.3), analyze_profile())[1]
+        start = time.monotonic()
+        results = advisor.get_analysis_results()
+        elapsed = time.monotonic() - start
+        if results['advice'] == "Overlap: Overlapped advice" and elapsed < 0.5:
+            print(f"✅ Advice overlapped the analysis ({elapsed:.2f}s for 0.3s + 0.3s): SUCCESS")
+        else:
+            print(f"❌ Advice and analysis ran in sequence ({elapsed:.2f}s): FAILED")
+            return False
+        
+        return True
+    finally:
+        release.set()
+        if real is not None:
+            sys.modules['gcloud_ai'] = real
+        else:
+            sys.modules.pop('gcloud_ai', None)
+
+def test_vertex_client_pool():
+    """Test that Vertex AI clients are created once and reused"""
+    print("\n☁️ Testing Vertex Client Pool...")
+    
+    import os
+    import types
+    import gcloud_ai
+    
+    calls = {'init': 0, 'clients': 0}
+    
+    class StubPredictionClient:
+        def __init__(self):
+            calls['clients'] += 1
+        
+        def predict(self, request, timeout=None):
+            return types.SimpleNamespace(predictions=[{'content': 'Keep going!'}])
+    
+    stub = types.SimpleNamespace(
+        init=lambda **kwargs: calls.__setitem__('init', calls['init'] + 1),
+        gapic=types.SimpleNamespace(PredictionServiceClient=StubPredictionClient),
+    )
+    saved = (getattr(gcloud_ai, 'aiplatform', None), gcloud_ai.GCLOUD_AVAILABLE,
+             os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'))
+    gcloud_ai.aiplatform, gcloud_ai.GCLOUD_AVAILABLE = stub, True
+    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = 'stub.json'
+    gcloud_ai.reset_clients()
+    try:
+        if not gcloud_ai.warmup(project='p', model='m'):
+            print("❌ Warmup failed: FAILED")
+            return False
+        texts = [gcloud_ai.generate_text('hi', project='p', model='m') for _ in range(3)]
+        if texts == ['Keep going!'] * 3 and calls == {'init': 1, 'clients': 1}:
+            print("✅ Client created once and reused: SUCCESS")
+            return True
+        print(f"❌ Client setup repeated {calls}: FAILED")
+        return False
+    finally:
+        gcloud_ai.reset_clients()
+        gcloud_ai.aiplatform = saved[0]
+        gcloud_ai.GCLOUD_AVAILABLE = saved[1]
+        if saved[2] is None:
+            os.environ.pop('GOOGLE_APPLICATION_CREDENTIALS', None)
+        else:
+            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = saved[2]
+
+def test_request_coalescer():
+    """Test that concurrent prompts are coalesced into batched calls"""
+    print("\n📨 Testing Request Coalescer...")
+    
+    from ai_batching import RequestCoalescer
+    
+    sent = []
+    
+    def send_batch(prompts):
+        sent.append(len(prompts))
+        return [prompt.upper() for prompt in prompts]
+    
+    coalescer = RequestCoalescer(send_batch, max_batch=4, linger_ms=50)
+    futures = [coalescer.submit(f"prompt {i}") for i in range(10)]
+    results = [future.result(timeout=5) for future in futures]
+    
+    if results != [f"PROMPT {i}" for i in range(10)]:
+        print("❌ Results routed to the wrong callers: FAILED")
+        return False
+    print("✅ Results split back to callers: SUCCESS")
+    
+    metrics = coalescer.metrics()
+    if sorted(sent) == [2, 4, 4] and metrics['batches'] == 3 and metrics['fill_ratio'] == 10 / 12:
+        print(f"✅ 10 prompts sent in {metrics['batches']} batches: SUCCESS")
+    else:
+        print(f"❌ Unexpected batching {sent}: FAILED")
+        return False
+    
+    # A stalled batch does not hold the caller past VERTEX_DEADLINE
+    import asyncio
+    import threading
+    import time
+    import types
+    import gcloud_ai
+    from circuit_breaker import CircuitBreaker
+    
+    release = threading.Event()
+    stalled = RequestCoalescer(lambda prompts: release.wait(5) and [None] * len(prompts), max_batch=2, linger_ms=1)
+    client = types.SimpleNamespace(text_model=None, batcher=lambda max_length: stalled)
+    saved = (gcloud_ai.get_client, gcloud_ai.VERTEX_BATCH_MAX, gcloud_ai.VERTEX_DEADLINE,
+             gcloud_ai.VERTEX_PREDICT_URL, gcloud_ai.breaker)
+    gcloud_ai.get_client = lambda *args: client
+    gcloud_ai.VERTEX_BATCH_MAX, gcloud_ai.VERTEX_DEADLINE = 2, 0.2
+    gcloud_ai.VERTEX_PREDICT_URL, gcloud_ai.breaker = 'http://127.0.0.1:9/v1/predict', CircuitBreaker("vertex")
+    try:
+        start = time.monotonic()
+        texts = [gcloud_ai.generate_text('hi'), asyncio.run(gcloud_ai.generate_text_async('hi'))]
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+        (gcloud_ai.get_client, gcloud_ai.VERTEX_BATCH_MAX, gcloud_ai.VERTEX_DEADLINE,
+         gcloud_ai.VERTEX_PREDICT_URL, gcloud_ai.breaker) = saved
+    if texts == [None, None] and elapsed < 1:
+        print(f"✅ Stalled batch abandoned at the deadline ({elapsed:.2f}s for two calls): SUCCESS")
+        return True
+    print(f"❌ Stalled batch held the caller {elapsed:.2f}s: FAILED")
+    return False
+
+def test_circuit_breaker():
+    """Test breaker transitions against a fake endpoint with injected faults"""
+    print("\n🔌 Testing Circuit Breaker...")
+    
+    from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+    
+    now = [0.0]
+    breaker = CircuitBreaker("fake", window=10, min_calls=5, error_rate=0.5,
+                             p95_latency=1.0, cooldown=30, clock=lambda: now[0])
+    
+    def fake_endpoint(delay=0.1, fail=False):
+        if not breaker.allow():
+            return None
+        now[0] += delay
+        breaker.record(not fail, delay)
+        return None if fail else "ok"
+    
+    for _ in range(5):
+        fake_endpoint(fail=True)
+    if breaker.state != OPEN or fake_endpoint() is not None:
+        print("❌ Breaker did not open on errors: FAILED")
+        return False
+    print("✅ Opens on error rate and rejects calls: SUCCESS")
+    
+    now[0] += 30
+    if breaker.state != HALF_OPEN or fake_endpoint() != "ok" or breaker.state != CLOSED:
+        print("❌ Half-open probe did not close breaker: FAILED")
+        return False
+    print("✅ Half-open probe closes breaker: SUCCESS")
+    
+    for _ in range(5):
+        fake_endpoint(delay=2.5)
+    if breaker.state != OPEN:
+        print("❌ Breaker did not open on p95 latency: FAILED")
+        return False
+    print("✅ Opens on p95 latency: SUCCESS")
+    
+    transitions = [(t['from'], t['to']) for t in breaker.snapshot()['transitions']]
+    if transitions == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED), (CLOSED, OPEN)]:
+        print("✅ Transitions visible in snapshot: SUCCESS")
+    else:
+        print(f"❌ Unexpected transitions {transitions}: FAILED")
+        return False
+    
+    # A hung high-level SDK predict() is cut off at the deadline and counted
+    import os
+    import threading
+    import time
+    import types
+    import gcloud_ai
+    
+    release = threading.Event()
+    
+    class HungModel:
+        @classmethod
+        def from_pretrained(cls, model_id):
+            return cls()
+        
+        def predict(self, prompt, max_output_tokens=None):
+            release.wait(5)
+            return types.SimpleNamespace(text="too late")
+    
+    stub = types.SimpleNamespace(init=lambda **kwargs: None, TextGenerationModel=HungModel)
+    saved = (getattr(gcloud_ai, 'aiplatform', None), gcloud_ai.GCLOUD_AVAILABLE, gcloud_ai.breaker,
+             gcloud_ai.VERTEX_DEADLINE, os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'))
+    gcloud_ai.aiplatform, gcloud_ai.GCLOUD_AVAILABLE = stub, True
+    gcloud_ai.breaker = CircuitBreaker("vertex", min_calls=1, error_rate=0.5)
+    gcloud_ai.VERTEX_DEADLINE = 0.2
+    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = 'stub.json'
+    gcloud_ai.reset_clients()
+    try:
+        start = time.monotonic()
+        text = gcloud_ai.generate_text('hi', project='p', model='m')
+        elapsed = time.monotonic() - start
+        if text is None and elapsed < 1 and gcloud_ai.breaker.state == OPEN:
+            print(f"✅ Hung SDK call abandoned after {elapsed:.2f}s and recorded: SUCCESS")
+        else:
+            print(f"❌ Hung SDK call returned {text!r} after {elapsed:.2f}s: FAILED")
+            return False
+        
+        metrics = app.test_client().get('/api/ai/metrics').get_json()
+        if metrics['breaker']['state'] == OPEN and metrics['breaker']['transitions']:
+            print("✅ Breaker state served at /api/ai/metrics: SUCCESS")
+        else:
+            print(f"❌ Unexpected AI metrics {metrics}: FAILED")
+            return False
+        
+        # An async half-open probe that times out or is cancelled still settles the breaker
+        import asyncio
+        import logging
+        
+        class HungAsyncModel(HungModel):
+            async def predict_async(self, prompt, max_output_tokens=None):
+                await asyncio.sleep(5)
+        
+        class Records(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.levels = []
+            
+            def emit(self, record):
+                self.levels.append(record.levelno)
+        
+        async def cancelled_probe():
+            task = asyncio.ensure_future(gcloud_ai.generate_text_async('hi', project='p', model='m'))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        
+        gcloud_ai.aiplatform = types.SimpleNamespace(init=lambda **kwargs: None, TextGenerationModel=HungAsyncModel)
+        gcloud_ai.reset_clients()
+        records = Records()
+        logging.getLogger().addHandler(records)
+        try:
+            states = []
+            for probe in (lambda: gcloud_ai.generate_text_async('hi', project='p', model='m'), cancelled_probe):
+                now[0] = 0.0
+                gcloud_ai.breaker = CircuitBreaker("vertex", min_calls=1, cooldown=30, clock=lambda: now[0])
+                gcloud_ai.breaker.record(False, 0.0)
+                now[0] = 30.0
+                asyncio.run(probe())
+                states.append(gcloud_ai.breaker.state)
+                now[0] = 60.0
+                states.append(gcloud_ai.breaker.available())
+        finally:
+            logging.getLogger().removeHandler(records)
+        if states == [OPEN, True, OPEN, True] and logging.ERROR not in records.levels:
+            print("✅ Timed-out or cancelled async probe reopens the breaker, no traceback: SUCCESS")
+        else:
+            print(f"❌ Async probe left the breaker {states}, log levels {records.levels}: FAILED")
+            return False
+        return True
+    finally:
+        release.set()
+        gcloud_ai.reset_clients()
+        gcloud_ai.aiplatform, gcloud_ai.GCLOUD_AVAILABLE, gcloud_ai.breaker, gcloud_ai.VERTEX_DEADLINE = saved[:4]
+        if saved[4] is None:
+            os.environ.pop('GOOGLE_APPLICATION_CREDENTIALS', None)
+        else:
+            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = saved[4]
+
 def test_flask_routes():
     """Test Flask routes"""
     print("\n🌐 Testing Flask Routes...")
@@ -92,7 +586,7 @@ def test_flask_routes():
         
         # Test results page (should work after form submission)
         with client.session_transaction() as sess:
-            if 'results' in sess:
+            if 'result_id' in sess:
                 response = client.get('/results')
                 if response.status_code == 200:
                     print("✅ Results page (GET /results): SUCCESS")
@@ -114,6 +608,243 @@ def test_flask_routes():
         print(f"❌ Flask routes error: {e}")
         return False
 
+def test_streamed_advice():
+    """Test that /results renders before the AI advice, which follows over SSE"""
+    print("\n📡 Testing Streamed Advice...")
+    
+    import threading
+    import time
+    import types
+    import career_advisor
+    
+    release = threading.Event()
+    
+    def slow_generate_text(prompt, *args):
+        release.wait(5)
+        return "Streamed advice"
+    
+    real = sys.modules.get('gcloud_ai')
+    sys.modules['gcloud_ai'] = types.SimpleNamespace(generate_text=slow_generate_text, is_available=lambda: True)
+    try:
+        career_advisor.advice_cache.clear()
+        client = app.test_client()
+        start = time.monotonic()
+        client.post('/assess', data={'name': 'Stream', 'skills': 'Haskell', 'interests': 'streaming'})
+        response = client.get('/results')
+        elapsed = time.monotonic() - start
+        if response.status_code == 200 and b'data-advice-src' in response.data and elapsed < 0.5:
+            print(f"✅ Results page served in {elapsed:.2f}s with the advice pending: SUCCESS")
+        else:
+            print(f"❌ Results page waited {elapsed:.2f}s for the advice: FAILED")
+            return False
+        
+        threading.Timer(0.2, release.set).start()
+        response = client.get('/results/advice')
+        body = response.get_data(as_text=True)
+        if response.mimetype == 'text/event-stream' and 'event: advice' in body and 'Stream: Streamed advice' in body:
+            print("✅ Advice delivered as a server-sent event: SUCCESS")
+        else:
+            print(f"❌ /results/advice returned {response.status_code} {body!r}: FAILED")
+            return False
+        
+        response = client.get('/results')
+        if b'Stream: Streamed advice' in response.data and b'data-advice-src' not in response.data:
+            print("✅ Delivered advice stored with the results: SUCCESS")
+        else:
+            print("❌ Reloaded results page is still pending: FAILED")
+            return False
+        
+        # A failed generation is not retried by reconnects; its fallback is kept
+        calls = []
+        
+        def failing_generate_text(prompt, *args):
+            calls.append(prompt)
+            time.sleep(0.1)
+            raise RuntimeError("model down")
+        
+        sys.modules['gcloud_ai'] = types.SimpleNamespace(generate_text=failing_generate_text, is_available=lambda: True)
+        advisor = WebCareerAdvisor()
+        advisor.process_user_data({'name': 'Retry', 'skills': 'Fortran', 'interests': 'reconnects'})
+        pending = advisor.start_analysis()
+        time.sleep(0.2)
+        for _ in range(2):
+            WebCareerAdvisor().finish_analysis(pending)
+        client.post('/assess', data={'name': 'Retry', 'skills': 'Fortran', 'interests': 'reconnects'})
+        first, second = (client.get('/results/advice').get_data(as_text=True).split('event: ')[-1] for _ in range(2))
+        if len(calls) == 2 and first == second and first.startswith('advice'):
+            print("✅ One generation per submission, stored outcome on reconnect: SUCCESS")
+        else:
+            print(f"❌ {len(calls)} generations, {first!r} then {second!r}: FAILED")
+            return False
+        
+        if app.test_client().get('/results/advice').status_code == 204:
+            print("✅ No results, no stream (204): SUCCESS")
+        else:
+            print("❌ /results/advice without results did not return 204: FAILED")
+            return False
+        
+        return True
+    finally:
+        release.set()
+        if real is not None:
+            sys.modules['gcloud_ai'] = real
+        else:
+            sys.modules.pop('gcloud_ai', None)
+
+def test_batch_api():
+    """Test the JSON batch assessment endpoint"""
+    print("\n📦 Testing Batch API...")
+    
+    client = app.test_client()
+    profiles = [
+        {'name': 'A', 'skills': ['Python', 'SQL'], 'interests': 'data and ai', 'career_goals': 'data scientist'},
+        {'name': 'B', 'skills': 'Figma, Prototyping', 'interests': 'design', 'career_goals': 'ux designer'},
+    ]
+    
+    try:
+        response = client.post('/api/assess/batch', json=profiles)
+        results = response.get_json().get('results', [])
+        if response.status_code == 200 and len(results) == 2 and results[0]['career_suggestions'][0]['name'] == 'Data Scientist':
+            print("✅ Batch assessment (POST /api/assess/batch): SUCCESS")
+        else:
+            print(f"❌ Batch assessment failed with status {response.status_code}")
+            return False
+        
+        response = client.post('/api/assess/batch?stream=1', json={'profiles': profiles})
+        lines = response.get_data(as_text=True).splitlines()
+        if response.mimetype == 'application/x-ndjson' and len(lines) == 2:
+            print("✅ Streaming batch assessment (NDJSON): SUCCESS")
+        else:
+            print("❌ Streaming batch assessment: FAILED")
+            return False
+        
+        # Slow model: the whole batch waits for one advice deadline, not one per profile
+        import time
+        import types
+        import career_advisor
+        release = __import__('threading').Event()
+        
+        def slow_generate_text(prompt, *args):
+            release.wait(5)
+            return "Slow AI advice"
+        
+        real = sys.modules.get('gcloud_ai')
+        sys.modules['gcloud_ai'] = types.SimpleNamespace(generate_text=slow_generate_text, is_available=lambda: True)
+        try:
+            career_advisor.advice_cache.clear()
+            many = [dict(profiles[i % 2], name=f'Slow batch {i}') for i in range(40)]
+            start = time.monotonic()
+            response = client.post('/api/assess/batch', json=many)
+            elapsed = time.monotonic() - start
+        finally:
+            release.set()
+            if real is not None:
+                sys.modules['gcloud_ai'] = real
+            else:
+                sys.modules.pop('gcloud_ai', None)
+        results = response.get_json().get('results', [])
+        if len(results) == 40 and all(r['advice'] for r in results) and elapsed < career_advisor.ADVICE_TIMEOUT + 1:
+            print(f"✅ Slow-model batch of 40 finished in {elapsed:.2f}s: SUCCESS")
+        else:
+            print(f"❌ Slow-model batch took {elapsed:.2f}s: FAILED")
+            return False
+        
+        response = client.post('/api/assess/batch', json={'profiles': 'not a list'})
+        if response.status_code == 400:
+            print("✅ Batch input validation: SUCCESS")
+        else:
+            print(f"❌ Batch validation returned status {response.status_code}")
+            return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batch API error: {e}")
+        return False
+
+def test_result_store():
+    """Test the server-side result stores"""
+    print("\n🗄️ Testing Result Store...")
+    
+    import os
+    import tempfile
+    from result_store import MemoryResultStore, SQLiteResultStore
+    
+    results = {'advice': 'Keep going!', 'career_suggestions': [{'name': 'Data Scientist', 'skills': ['SQL']}]}
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = [MemoryResultStore(max_entries=2), SQLiteResultStore(os.path.join(tmp, 'results.db'))]
+        for store in stores:
+            name = type(store).__name__
+            result_id = store.put(results)
+            if store.get(result_id) != results or store.get('missing') is not None:
+                print(f"❌ {name} round trip: FAILED")
+                return False
+            store.replace(result_id, dict(results, advice='Streamed in'))
+            if store.get(result_id)['advice'] != 'Streamed in':
+                print(f"❌ {name} replace: FAILED")
+                return False
+            store.delete(result_id)
+            if store.get(result_id) is not None:
+                print(f"❌ {name} delete: FAILED")
+                return False
+            store.ttl = -1
+            if store.get(store.put(results)) is not None:
+                print(f"❌ {name} expiry: FAILED")
+                return False
+            print(f"✅ {name} round trip, replace, delete and expiry: SUCCESS")
+    
+    client = app.test_client()
+    client.post('/assess', data={'name': 'Cookie', 'skills': 'Python, SQL', 'interests': 'data', 'career_goals': 'analyst'})
+    cookie = client.get_cookie('session')
+    if cookie is not None and len(cookie.value) < 200:
+        print(f"✅ Session cookie holds only the result ID ({len(cookie.value)} bytes): SUCCESS")
+        return True
+    print("❌ Session cookie still carries the results: FAILED")
+    return False
+
+def test_page_cache():
+    """Test cached static pages: ETags, 304s, gzip and the results nav variant"""
+    print("\n🗃️ Testing Page Cache...")
+    
+    import gzip
+    
+    client = app.test_client()
+    
+    try:
+        response = client.get('/about')
+        etag = response.headers.get('ETag')
+        if response.status_code == 200 and etag:
+            print("✅ Cached page carries an ETag: SUCCESS")
+        else:
+            print(f"❌ About page returned {response.status_code} without ETag: FAILED")
+            return False
+        
+        response = client.get('/about', headers={'If-None-Match': etag})
+        if response.status_code == 304:
+            print("✅ Conditional request answered with 304: SUCCESS")
+        else:
+            print(f"❌ Conditional request returned {response.status_code}: FAILED")
+            return False
+        
+        plain = client.get('/about').data
+        response = client.get('/about', headers={'Accept-Encoding': 'gzip'})
+        if response.headers.get('Content-Encoding') == 'gzip' and gzip.decompress(response.data) == plain:
+            print("✅ Precompressed gzip variant: SUCCESS")
+        else:
+            print("❌ Gzip variant missing or different: FAILED")
+            return False
+        
+        client.post('/assess', data={'name': 'Nav', 'skills': 'Python', 'interests': 'coding', 'career_goals': 'developer'})
+        if b'My Results' in client.get('/about').data and b'My Results' not in plain:
+            print("✅ Results nav variant cached separately: SUCCESS")
+            return True
+        print("❌ Results nav link missing after assessment: FAILED")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Page cache error: {e}")
+        return False
+
 def test_static_files():
     """Test static file serving"""
     print("\n📁 Testing Static Files...")
@@ -143,6 +874,945 @@ def test_static_files():
         print(f"❌ Static files error: {e}")
         return False
 
+def test_asset_pipeline():
+    """Test asset minification, fingerprinting and precompression"""
+    print("\n🧱 Testing Asset Pipeline...")
+    
+    import gzip
+    import os
+    import shutil
+    import tempfile
+    from assets import build, minify_css, minify_js
+    
+    js = "const url = 'http://x'; // comment\nconst re = /^a\\/b$/g;\nconst t = `${a}//${`${b}`}`; /* block */\n"
+    if minify_js(js) != "const url = 'http://x';\nconst re = /^a\\/b$/g;\nconst t = `${a}//${`${b}`}`;\n":
+        print("❌ JS minifier changed strings or regex literals: FAILED")
+        return False
+    if minify_css("a  >  b { color : red ; /* x */ }\n.u { background: url('a, > b'); }") != "a>b{color : red}.u{background: url('a, > b')}":
+        print("❌ CSS minifier changed strings: FAILED")
+        return False
+    print("✅ Minifiers keep strings and regex literals intact: SUCCESS")
+    
+    with tempfile.TemporaryDirectory() as static_dir:
+        for name in ('css/style.css', 'js/app.js'):
+            os.makedirs(os.path.join(static_dir, os.path.dirname(name)), exist_ok=True)
+            shutil.copy(os.path.join(app.static_folder, name), os.path.join(static_dir, name))
+        manifest = build(static_dir)
+        for name, hashed in manifest.items():
+            built = os.path.join(static_dir, 'dist', hashed)
+            with open(built, 'rb') as fh, gzip.open(built + '.gz') as gz:
+                if hashed == name or fh.read() != gz.read():
+                    print(f"❌ {name} not fingerprinted or compressed: FAILED")
+                    return False
+            if os.path.getsize(built) >= os.path.getsize(os.path.join(static_dir, name)):
+                print(f"❌ {name} not minified: FAILED")
+                return False
+        print("✅ Fingerprinted, minified and gzipped build: SUCCESS")
+        
+        from flask import Flask
+        from assets import AssetManifest
+        site = Flask(__name__, static_folder=static_dir, static_url_path='/static')
+        assets = AssetManifest(site)
+        hashed = manifest['css/style.css']
+        client = site.test_client()
+        
+        response = client.get(f'/assets/{hashed}', headers={'Accept-Encoding': 'gzip'})
+        plain = client.get(f'/assets/{hashed}', headers={'Accept-Encoding': 'identity'})
+        if (response.status_code == 200 and response.headers.get('Content-Encoding') == 'gzip'
+                and 'immutable' in response.headers.get('Cache-Control', '')
+                and 'Content-Encoding' not in plain.headers and gzip.decompress(response.data) == plain.data):
+            print("✅ /assets/ serves negotiated, immutable files: SUCCESS")
+        else:
+            print(f"❌ /assets/ returned {response.status_code} {dict(response.headers)}: FAILED")
+            return False
+        if client.get('/assets/css/unknown.css').status_code != 404:
+            print("❌ Unknown asset not rejected: FAILED")
+            return False
+        print("✅ Unknown assets are 404: SUCCESS")
+        
+        with site.test_request_context():
+            built_url = assets.asset_url('css/style.css')
+            site.debug = True
+            debug_url = assets.asset_url('css/style.css')
+            site.debug = False
+        stat = os.stat(os.path.join(static_dir, 'dist', 'manifest.json'))
+        os.utime(os.path.join(static_dir, 'css/style.css'), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        stale = Flask(__name__, static_folder=static_dir, static_url_path='/static')
+        with stale.test_request_context():
+            stale_url = AssetManifest(stale).asset_url('css/style.css')
+        if built_url == f'/assets/{hashed}' and debug_url == stale_url == '/static/css/style.css':
+            print("✅ Debug mode and edited sources use /static/: SUCCESS")
+        else:
+            print(f"❌ asset_url gave {built_url}, {debug_url}, {stale_url}: FAILED")
+            return False
+    return True
+
+def test_async_mode():
+    """Test async advice, the async Vertex wrapper and the ASGI entrypoint"""
+    print("\n⚡ Testing Async Mode...")
+    
+    import asyncio
+    import os
+    import time
+    import types
+    import career_advisor
+    import gcloud_ai
+    
+    async def fast_generate(prompt, *args):
+        return "Async AI advice"
+    
+    async def slow_generate(prompt, *args):
+        await asyncio.sleep(5)
+        return "Too late"
+    
+    real = sys.modules.get('gcloud_ai')
+    try:
+        career_advisor.advice_cache.clear()
+        advisor = WebCareerAdvisor()
+        advisor.process_user_data({'name': 'Async', 'skills': 'Go', 'interests': 'event loops'})
+        sys.modules['gcloud_ai'] = types.SimpleNamespace(generate_text_async=fast_generate, is_available=lambda: True)
+        if asyncio.run(advisor.generate_advice_async()) == "Async: Async AI advice":
+            print("✅ generate_advice_async uses the model: SUCCESS")
+        else:
+            print("❌ generate_advice_async ignored the model: FAILED")
+            return False
+        
+        advisor.process_user_data({'name': 'Slow Async', 'skills': 'Go, Rust', 'interests': 'event loops'})
+        sys.modules['gcloud_ai'] = types.SimpleNamespace(generate_text_async=slow_generate, is_available=lambda: True)
+        start = time.monotonic()
+        advice = asyncio.run(advisor.generate_advice_async())
+        elapsed = time.monotonic() - start
+        if advice in career_advisor.ADVICE_POOL and elapsed < career_advisor.ADVICE_TIMEOUT + 0.5:
+            print(f"✅ Async local fallback after {elapsed:.2f}s: SUCCESS")
+        else:
+            print(f"❌ Async advice blocked for {elapsed:.2f}s: FAILED")
+            return False
+    finally:
+        sys.modules['gcloud_ai'] = real
+    
+    # generate_text_async against the local stub model, with a concurrency cap
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+    from vertex_stub import STUB_TEXT, StubModel
+    
+    stub = StubModel(latency_ms=50)
+    saved = gcloud_ai.VERTEX_PREDICT_URL, gcloud_ai.VERTEX_MAX_CONCURRENCY
+    
+    async def call_stub():
+        server = await asyncio.start_server(stub.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        gcloud_ai.VERTEX_PREDICT_URL = f'http://127.0.0.1:{port}/v1/predict'
+        gcloud_ai.VERTEX_MAX_CONCURRENCY = 2
+        try:
+            return await asyncio.gather(*(gcloud_ai.generate_text_async(f"prompt {i}") for i in range(6)))
+        finally:
+            server.close()
+    
+    try:
+        gcloud_ai.reset_clients()
+        texts = asyncio.run(call_stub())
+    finally:
+        gcloud_ai.VERTEX_PREDICT_URL, gcloud_ai.VERTEX_MAX_CONCURRENCY = saved
+        gcloud_ai.reset_clients()
+    if texts == [STUB_TEXT] * 6 and stub.max_in_flight <= 2:
+        print(f"✅ generate_text_async via REST stub, max {stub.max_in_flight} in flight: SUCCESS")
+    else:
+        print(f"❌ generate_text_async returned {texts}, {stub.max_in_flight} in flight: FAILED")
+        return False
+    
+    # A timeout on a reused keep-alive connection is not retried: one upstream request
+    import http_json
+    import threading
+    
+    def timed_out_requests(call):
+        slow = StubModel(latency_ms=0)
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(asyncio.start_server(slow.handle, '127.0.0.1', 0))
+        url = f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1/predict'
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            return call(url, slow)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            server.close()
+    
+    def sync_call(url, slow):
+        http_json.post_json(url, {'instances': [{}]}, timeout=1)
+        slow.latency_ms = 500
+        try:
+            http_json.post_json(url, {'instances': [{}]}, timeout=0.2)
+        except TimeoutError:
+            pass
+        return slow.requests - 1
+    
+    def async_call(url, slow):
+        async def calls():
+            await http_json.post_json_async(url, {'instances': [{}]}, timeout=1)
+            slow.latency_ms = 500
+            try:
+                await http_json.post_json_async(url, {'instances': [{}]}, timeout=0.2)
+            except asyncio.TimeoutError:
+                pass
+        asyncio.run(calls())
+        return slow.requests - 1
+    
+    sent = (timed_out_requests(sync_call), timed_out_requests(async_call))
+    if sent == (1, 1):
+        print("✅ Timed-out POST sent once on a reused connection: SUCCESS")
+    else:
+        print(f"❌ Timed-out POST sent {sent} times (sync, async): FAILED")
+        return False
+    
+    # ASGI routes, sharing the session cookie with the Flask half
+    from urllib.parse import urlencode
+    from backend import asgi
+    
+    async def request(method, path, body=b'', headers=()):
+        scope = {'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': b'',
+                 'headers': [(k.encode(), v.encode()) for k, v in headers], 'scheme': 'http',
+                 'http_version': '1.1', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1)}
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+        
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+        
+        async def send(message):
+            sent.append(message)
+        
+        await asgi.app(scope, receive, send)
+        start = sent[0]
+        response_headers = {k.decode().lower(): v.decode() for k, v in start['headers']}
+        return start['status'], response_headers, b''.join(m.get('body', b'') for m in sent[1:])
+    
+    form = urlencode({'name': 'ASGI User', 'skills': 'Python, SQL', 'interests': 'data analysis'}).encode()
+    status, headers, _ = asyncio.run(request(
+        'POST', '/assess', form, [('content-type', 'application/x-www-form-urlencoded')]))
+    if status == 302 and headers.get('location') == '/results' and 'set-cookie' in headers:
+        print("✅ ASGI form submission (POST /assess): SUCCESS")
+    else:
+        print(f"❌ ASGI /assess returned {status} {headers}: FAILED")
+        return False
+    
+    name, _, value = headers['set-cookie'].split(';')[0].partition('=')
+    flask_client = asgi.flask_app.test_client()
+    flask_client.set_cookie(name, value)
+    response = flask_client.get('/results')
+    if response.status_code == 200 and b'ASGI User' in response.data:
+        print("✅ Flask /results reads the ASGI session: SUCCESS")
+    else:
+        print(f"❌ Flask /results returned {response.status_code}: FAILED")
+        return False
+    
+    status, headers, body = asyncio.run(request('GET', '/results/advice', headers=[('cookie', f'{name}={value}')]))
+    if status == 200 and headers['content-type'].startswith('text/event-stream') and b'event: advice' in body:
+        print("✅ ASGI advice event (GET /results/advice): SUCCESS")
+    else:
+        print(f"❌ ASGI /results/advice returned {status} {body!r}: FAILED")
+        return False
+    
+    # Multipart forms parse like Flask's request.form; the store runs off the loop
+    import tempfile
+    import threading
+    import stage_metrics
+    store = asgi.result_store
+    store_threads = []
+    real_put = store.put
+
+    def recording_put(results):
+        store_threads.append(threading.current_thread() is threading.main_thread())
+        return real_put(results)
+
+    multipart = (b'--XyZ\r\nContent-Disposition: form-data; name="name"\r\n\r\nMultipart User\r\n'
+                 b'--XyZ\r\nContent-Disposition: form-data; name="skills"\r\n\r\nPython\r\n'
+                 b'--XyZ\r\nContent-Disposition: form-data; name="interests"\r\n\r\ndata\r\n--XyZ--\r\n')
+    saved_metrics = stage_metrics.ENABLED, stage_metrics.METRICS_DIR, asgi.stage_metrics.enabled
+    with tempfile.TemporaryDirectory() as tmp:
+        stage_metrics.ENABLED, stage_metrics.METRICS_DIR, asgi.stage_metrics.enabled = True, tmp, True
+        store.put = recording_put
+        try:
+            status, headers, _ = asyncio.run(request(
+                'POST', '/assess', multipart, [('content-type', 'multipart/form-data; boundary=XyZ')]))
+            scraped = stage_metrics.render()
+        finally:
+            store.put = real_put
+            stage_metrics.ENABLED, stage_metrics.METRICS_DIR, asgi.stage_metrics.enabled = saved_metrics
+            stage_metrics.histograms.clear()
+            stage_metrics._last_flush = 0.0
+    timing = [part.split(';')[0] for part in headers.get('server-timing', '').split(', ')]
+    if status == 302 and headers.get('location') == '/results' and store_threads == [False]:
+        print("✅ ASGI multipart /assess, result store off the event loop: SUCCESS")
+    else:
+        print(f"❌ ASGI multipart /assess returned {status} {headers}, store on loop {store_threads}: FAILED")
+        return False
+    if ('store' in timing and timing[-1] == 'total'
+            and 'http_request_duration_seconds_count{endpoint="assess",method="POST",status="302"} 1' in scraped):
+        print("✅ ASGI routes report Server-Timing and request histograms: SUCCESS")
+    else:
+        print(f"❌ ASGI Server-Timing {timing}: FAILED")
+        return False
+
+    status, _, body = asyncio.run(request('GET', '/about'))
+    if status == 200 and b'<html' in body.lower():
+        print("✅ Other routes served by Flask via ASGI: SUCCESS")
+    else:
+        print(f"❌ GET /about via ASGI returned {status}: FAILED")
+        return False
+    
+    status, _, body = asyncio.run(request(
+        'POST', '/api/assess/batch', b'[{"name": "A", "skills": ["Python"]}, {"name": "B"}]',
+        [('content-type', 'application/json')]))
+    results = __import__('json').loads(body).get('results', []) if status == 200 else []
+    if [r['user_profile']['name'] for r in results] == ['A', 'B']:
+        print("✅ ASGI batch API: SUCCESS")
+    else:
+        print(f"❌ ASGI batch API returned {status}: FAILED")
+        return False
+    
+    return True
+
+def test_stage_metrics():
+    """Test stage timing: Server-Timing header and /metrics merged across workers"""
+    print("\n⏱️ Testing Stage Metrics...")
+    
+    import json
+    import os
+    import tempfile
+    from flask import Flask
+    import stage_metrics
+    from stage_metrics import StageMetrics, stage
+    
+    try:
+        response = app.test_client().get('/metrics')
+        if response.status_code == 404 and 'Server-Timing' not in app.test_client().get('/about').headers:
+            print("✅ Metrics off by default (no /metrics, no header): SUCCESS")
+        else:
+            print(f"❌ Disabled metrics answered {response.status_code}: FAILED")
+            return False
+        
+        saved = stage_metrics.ENABLED, stage_metrics.METRICS_DIR
+        with tempfile.TemporaryDirectory() as tmp:
+            stage_metrics.ENABLED, stage_metrics.METRICS_DIR = True, tmp
+            stage_metrics.histograms.clear()
+            try:
+                timed_app = Flask('timed')
+                timed_app.secret_key = 'test'
+                metrics = StageMetrics(timed_app)
+                
+                @timed_app.route('/work')
+                def work():
+                    with stage('analyze'):
+                        pass
+                    with stage('score'):
+                        pass
+                    return 'ok'
+                
+                timed_app.add_url_rule('/metrics', 'metrics', metrics.response)
+                client = timed_app.test_client()
+                header = client.get('/work').headers.get('Server-Timing', '')
+                names = [part.split(';')[0] for part in header.split(', ')]
+                if names == ['analyze', 'score', 'total']:
+                    print("✅ Server-Timing lists each stage and the total: SUCCESS")
+                else:
+                    print(f"❌ Unexpected Server-Timing {header!r}: FAILED")
+                    return False
+                
+                # Without a secret key Flask never saves the (null) session;
+                # the request is still timed and counted
+                keyless_app = Flask('keyless')
+                StageMetrics(keyless_app)
+                keyless_app.add_url_rule('/plain', 'plain', lambda: 'ok')
+                header = keyless_app.test_client().get('/plain').headers.get('Server-Timing', '')
+                if not header.startswith('total;dur='):
+                    print(f"❌ Null-session request got Server-Timing {header!r}: FAILED")
+                    return False
+                
+                # Another worker's flushed histograms are merged into the scrape
+                other = os.path.join(stage_metrics._worker_dir(), 'other-worker.json')
+                with open(other, 'w') as fh:
+                    json.dump([['stage_duration_seconds', [['stage', 'analyze']],
+                                [0] * len(stage_metrics.BUCKETS) + [2, 3.0]]], fh)
+                text = client.get('/metrics').get_data(as_text=True)
+                if ('stage_duration_seconds_count{stage="analyze"} 3' in text
+                        and 'stage_duration_seconds_count{stage="session"}' in text
+                        and 'http_request_duration_seconds_count{endpoint="work",method="GET",status="200"} 1' in text
+                        and 'http_request_duration_seconds_count{endpoint="plain",method="GET",status="200"} 1' in text
+                        and '# TYPE stage_duration_seconds histogram' in text):
+                    print("✅ /metrics merges workers in Prometheus format: SUCCESS")
+                    return True
+                print("❌ /metrics output missing merged series: FAILED")
+                return False
+            finally:
+                stage_metrics.ENABLED, stage_metrics.METRICS_DIR = saved
+                stage_metrics.histograms.clear()
+        
+    except Exception as e:
+        print(f"❌ Stage metrics error: {e}")
+        return False
+
+def test_request_profiler():
+    """Test sampled request profiling: admin toggle, dump names, rotation, report"""
+    print("\n🔬 Testing Request Profiler...")
+    
+    import os
+    import tempfile
+    import time
+    from flask import Flask
+    from request_profiler import RequestProfiler, aggregate
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            profiled_app = Flask('profiled')
+            profiler = RequestProfiler(profiled_app, directory=tmp, check_interval=0)
+            profiler.token = 'secret'
+            profiled_app.add_url_rule('/admin/profiler', 'admin', profiler.admin, methods=['GET', 'POST'])
+            
+            def slow_page():
+                time.sleep(0.03)
+                return 'slow'
+            profiled_app.add_url_rule('/fast', 'fast', lambda: 'fast')
+            profiled_app.add_url_rule('/slow/page', 'slow', slow_page)
+            client = profiled_app.test_client()
+            auth = {'Authorization': 'Bearer secret'}
+            
+            denied = client.post('/admin/profiler', json={'enabled': True}, headers={'Authorization': 'Bearer nope'})
+            if denied.status_code != 403 or os.listdir(tmp):
+                print(f"❌ Toggle without the token returned {denied.status_code}: FAILED")
+                return False
+            client.post('/admin/profiler', json={'enabled': True, 'sample_rate': 1, 'keep': 3}, headers=auth)
+            for _ in range(5):
+                client.get('/fast')
+            dumps = sorted(f for f in os.listdir(tmp) if f.endswith('.pstats'))
+            if len(dumps) == 3 and all('_GET_fast_' in name for name in dumps):
+                print("✅ Every sampled request dumped, rotated to the newest 3: SUCCESS")
+            else:
+                print(f"❌ Unexpected dumps {dumps}: FAILED")
+                return False
+            
+            # Another worker picks the settings up from the shared file
+            other = RequestProfiler(Flask('other'), directory=tmp, check_interval=0)
+            other._refresh()
+            if other.settings['enabled'] and other.settings['keep'] == 3:
+                print("✅ Settings shared with other workers: SUCCESS")
+            else:
+                print("❌ Other worker did not see the toggle: FAILED")
+                return False
+            
+            # Bad types are refused and leave the settings alone; strings are coerced
+            bad = [client.post('/admin/profiler', json=body, headers=auth).status_code
+                   for body in ({'sample_rate': 'lots'}, {'enabled': 'maybe'}, {'keep': -1}, {'slow_ms': [1]})]
+            coerced = client.post('/admin/profiler', json={'enabled': 'false', 'sample_rate': '100'}, headers=auth)
+            settings = coerced.get_json()
+            if (bad == [400] * 4 and settings['enabled'] is False and settings['sample_rate'] == 100
+                    and client.get('/fast').status_code == 200):
+                print("✅ Invalid profiler settings rejected with 400: SUCCESS")
+            else:
+                print(f"❌ Settings validation: {bad} {settings}: FAILED")
+                return False
+            
+            client.post('/admin/profiler', json={'enabled': True, 'sample_rate': 1000000, 'slow_ms': 20}, headers=auth)
+            for name in os.listdir(tmp):
+                if name.endswith('.pstats'):
+                    os.unlink(os.path.join(tmp, name))
+            client.get('/fast')
+            client.get('/slow/page')
+            dumps = [f for f in os.listdir(tmp) if f.endswith('.pstats')]
+            if len(dumps) == 1 and '_GET_slow_page_' in dumps[0]:
+                print("✅ Only requests over slow_ms kept: SUCCESS")
+            else:
+                print(f"❌ Slow-request dumps were {dumps}: FAILED")
+                return False
+            
+            report = aggregate([os.path.join(tmp, name) for name in dumps], top=10, sort='tottime')
+            if 'slow_page' in report and 'sleep' in report:
+                print("✅ Aggregated report lists the hot functions: SUCCESS")
+                return True
+            print("❌ Report missing the profiled functions: FAILED")
+            return False
+        
+    except Exception as e:
+        print(f"❌ Request profiler error: {e}")
+        return False
+
+def test_app_factory():
+    """Test create_app(): independent apps, preloaded templates, fork reinit"""
+    print("\n🏭 Testing App Factory...")
+    
+    from backend.app import create_app, reinit_after_fork
+    import gcloud_ai
+    
+    try:
+        second = create_app({'TESTING': True, 'SECRET_KEY': 'other', 'RESULT_STORE': 'memory'})
+        if second is app or second.extensions['result_store'] is app.extensions['result_store']:
+            print("❌ create_app() returned shared state: FAILED")
+            return False
+        client = second.test_client()
+        client.post('/assess', data={'name': 'Factory', 'skills': 'Python', 'interests': 'coding', 'career_goals': 'developer'})
+        if client.get('/results').status_code == 200 and client.get('/careers/design').status_code == 200:
+            print("✅ Second app serves the full route set on its own store: SUCCESS")
+        else:
+            print("❌ Routes missing on a factory-built app: FAILED")
+            return False
+        
+        cached = second.jinja_env.cache
+        if cached is not None and any(key[1] == 'results.html' for key in cached.keys()):
+            print("✅ Templates compiled before the first request: SUCCESS")
+        else:
+            print("❌ Templates not precompiled: FAILED")
+            return False
+        
+        gcloud_ai._clients[('stale',)] = object()
+        reinit_after_fork()
+        if ('stale',) not in gcloud_ai._clients:
+            print("✅ Fork hook drops inherited AI clients: SUCCESS")
+        else:
+            print("❌ Inherited AI clients survived the fork hook: FAILED")
+            return False
+        
+        # Several gunicorn workers share results through SQLite unless told otherwise
+        import os
+        import runpy
+        saved = {key: os.environ.get(key) for key in ('WEB_CONCURRENCY', 'RESULT_STORE')}
+        stores = []
+        try:
+            for workers in ('2', '1'):
+                os.environ['WEB_CONCURRENCY'] = workers
+                os.environ.pop('RESULT_STORE', None)
+                runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py'))
+                stores.append(os.environ.get('RESULT_STORE'))
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+        if stores == ['sqlite', None]:
+            print("✅ Multi-worker gunicorn defaults to the SQLite result store: SUCCESS")
+            return True
+        print(f"❌ gunicorn result stores {stores}: FAILED")
+        return False
+        
+    except Exception as e:
+        print(f"❌ App factory error: {e}")
+        return False
+
+def test_cold_start():
+    """Test cold-start mode: deferred SDK import, startup timeline, bytecode cache"""
+    print("\n🧊 Testing Cold Start...")
+    
+    import os
+    import tempfile
+    import threading
+    import backend.app as backend_app
+    import gcloud_ai
+    
+    try:
+        app.test_client().get('/')
+        timeline = app.test_client().get('/api/startup').get_json()
+        names = [name for name, _ in timeline['timeline']]
+        if {'imports done', 'templates compiled', 'first response'} <= set(names):
+            print("✅ Startup timeline reaches the first response: SUCCESS")
+        else:
+            print(f"❌ Startup timeline was {names}: FAILED")
+            return False
+        
+        saved = (gcloud_ai._sdk_state, gcloud_ai.VERTEX_PREDICT_URL, os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'))
+        gcloud_ai._sdk_state, gcloud_ai.VERTEX_PREDICT_URL = 'unloaded', None
+        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = '/nonexistent.json'
+        real_load_sdk = gcloud_ai.load_sdk
+        loaded = threading.Event()
+        loader = []
+        
+        def recording_load_sdk():
+            # The import may finish before the test could see its thread
+            loader.append(threading.current_thread().name)
+            try:
+                return real_load_sdk()
+            finally:
+                loaded.set()
+        
+        gcloud_ai.load_sdk = recording_load_sdk
+        try:
+            configured = gcloud_ai._configured()
+            loaded.wait(30)
+            if (not configured and loader == ['vertex-sdk-import']
+                    and gcloud_ai._sdk_state in ('loaded', 'missing')):
+                print("✅ SDK imported in the background, request not blocked: SUCCESS")
+            else:
+                print(f"❌ SDK import state {gcloud_ai._sdk_state}, configured={configured}: FAILED")
+                return False
+        finally:
+            gcloud_ai.load_sdk = real_load_sdk
+            gcloud_ai._sdk_state, gcloud_ai.VERTEX_PREDICT_URL = saved[:2]
+            if saved[2] is None:
+                os.environ.pop('GOOGLE_APPLICATION_CREDENTIALS', None)
+            else:
+                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = saved[2]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            saved_dir = backend_app.JINJA_CACHE_DIR
+            backend_app.JINJA_CACHE_DIR = tmp
+            try:
+                backend_app.create_app({'TESTING': True})
+            finally:
+                backend_app.JINJA_CACHE_DIR = saved_dir
+            if len(os.listdir(tmp)) >= 10:
+                print("✅ Templates written to the bytecode cache: SUCCESS")
+            else:
+                print(f"❌ Bytecode cache holds {len(os.listdir(tmp))} entries: FAILED")
+                return False
+        
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'js', 'app.js')) as fh:
+            if 'startKeepAlive' not in fh.read():
+                print("✅ Keep-alive pinger retired: SUCCESS")
+                return True
+        print("❌ static/js/app.js still pings /_keepalive: FAILED")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Cold start error: {e}")
+        return False
+
+def test_analysis_memo():
+    """Test memoized analysis: canonical fingerprint, per-request advice, LRU, invalidation"""
+    print("\n🧠 Testing Analysis Memo...")
+    
+    from analysis_memo import AnalysisMemo, analysis_memo, profile_fingerprint
+    
+    try:
+        analysis_memo.clear()
+        first = WebCareerAdvisor()
+        first.process_user_data({'name': 'Ada', 'skills': 'Python, SQL, python', 'interests': 'Data  Analysis',
+                                 'career_goals': 'Data Scientist', 'timeline': '1 year'})
+        second = WebCareerAdvisor()
+        second.process_user_data({'name': 'Grace', 'skills': 'sql,PYTHON', 'interests': ' data analysis ',
+                                  'career_goals': 'data scientist', 'timeline': '1 Year'})
+        a = first.get_analysis_results()
+        b = second.get_analysis_results()
+        stats = analysis_memo.stats()
+        if (profile_fingerprint(first.user_profile) == profile_fingerprint(second.user_profile)
+                and a['career_suggestions'] is b['career_suggestions'] and stats['hits'] == 1 and stats['misses'] == 1):
+            print("✅ Same fingerprint served from the memo: SUCCESS")
+        else:
+            print(f"❌ Memo not shared across equivalent profiles: {stats}: FAILED")
+            return False
+        
+        if a['user_profile']['name'] == 'Ada' and b['user_profile']['name'] == 'Grace' and b['advice']:
+            print("✅ Name and advice stay per request: SUCCESS")
+        else:
+            print("❌ Per-request fields leaked between hits: FAILED")
+            return False
+        
+        memo = AnalysisMemo(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            memo.put((key,), 'v1', {'key': key})
+        evicted = memo.get(('a',), 'v1') is None and memo.get(('c',), 'v1') is not None
+        invalidated = memo.get(('c',), 'v2') is None and memo.stats()['invalidations'] == 1
+        if evicted and invalidated and memo.stats()['evictions'] == 1:
+            print("✅ LRU eviction and catalog-version invalidation: SUCCESS")
+        else:
+            print(f"❌ Memo bookkeeping wrong: {memo.stats()}: FAILED")
+            return False
+        
+        metrics = app.test_client().get('/api/cache/metrics').get_json()
+        if metrics['analysis']['hits'] >= 1 and 'hit_ratio' in metrics['analysis']:
+            print("✅ Counters served at /api/cache/metrics: SUCCESS")
+            return True
+        print("❌ /api/cache/metrics missing analysis counters: FAILED")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Analysis memo error: {e}")
+        return False
+
+def test_advice_cache():
+    """Test the two-tier advice cache: LRU/TTL, shared SQLite tier, single-flight"""
+    print("\n🗄️ Testing Advice Cache...")
+    
+    import os
+    import tempfile
+    import threading
+    import time
+    import types
+    import career_advisor
+    from advice_cache import ELSEWHERE, AdviceCache
+    
+    real = sys.modules.get('gcloud_ai')
+    release = threading.Event()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'advice.db')
+            first = AdviceCache(max_entries=2, ttl=60, path=path)
+            for key in ('a', 'b', 'c'):
+                first.put(('k', key), f'advice {key}')
+            # Another worker sees all three through L2, then serves them from L1
+            second = AdviceCache(max_entries=2, ttl=60, path=path)
+            shared = second.get(('k', 'a')) == 'advice a' and second.get(('k', 'a')) == 'advice a'
+            stats = second.stats()
+            if shared and first.stats()['evictions'] == 1 and stats['l2_hits'] == 1 and stats['l1_hits'] == 1:
+                print(f"✅ Bounded L1, shared L2 ({stats['l2_size']} rows): SUCCESS")
+            else:
+                print(f"❌ Tiers wrong: {first.stats()} {stats}: FAILED")
+                return False
+            
+            short = AdviceCache(max_entries=2, ttl=0.05, path=None)
+            short.put('k', 'v')
+            time.sleep(0.1)
+            if short.get('k') is None and short.stats()['expirations'] == 1:
+                print("✅ Entries expire after the TTL: SUCCESS")
+            else:
+                print(f"❌ Expired entry served: {short.stats()}: FAILED")
+                return False
+            
+            # A worker holding the lease stops the others from generating too
+            pending = types.SimpleNamespace(done=lambda: False, add_done_callback=lambda fn: None)
+            first.single_flight('lease', lambda: pending)
+            if second.single_flight('lease', lambda: pending) is ELSEWHERE:
+                print("✅ In-flight lease shared across workers: SUCCESS")
+            else:
+                print("❌ Second worker started a duplicate generation: FAILED")
+                return False
+            
+            # Concurrent misses start one generation even without L2, and the
+            # async path takes its lease off the loop
+            import asyncio
+            import concurrent.futures
+            starts = []
+            
+            def start_slowly():
+                starts.append(1)
+                time.sleep(0.05)
+                return concurrent.futures.Future()
+            
+            local = AdviceCache(path=None)
+            with concurrent.futures.ThreadPoolExecutor(8) as pool:
+                flights = list(pool.map(lambda _: local.single_flight('same', start_slowly), range(8)))
+            
+            async def async_flights():
+                loop = asyncio.get_running_loop()
+                return await asyncio.gather(*(first.single_flight_async('async', lambda: loop.create_future())
+                                              for _ in range(8)))
+            async_starts = asyncio.run(async_flights())
+            if len(starts) == 1 and len(set(map(id, flights))) == 1 and len(set(map(id, async_starts))) == 1:
+                print("✅ Concurrent misses share one placeholder, sync and async: SUCCESS")
+            else:
+                print(f"❌ {len(starts)} generations for concurrent misses: FAILED")
+                return False
+            
+            # ...and picks up its result from L2 when it lands
+            threading.Timer(0.1, first.put, ('lease', 'Leased advice')).start()
+            if second.poll('lease', 2) == 'Leased advice' and second.poll('missing', 0.1) is None:
+                print("✅ Waiting worker polls the shared result: SUCCESS")
+            else:
+                print("❌ Waiting worker never saw the result: FAILED")
+                return False
+        
+        # Concurrent misses for one profile make one model call
+        calls = []
+        
+        def slow_generate_text(prompt, *args):
+            calls.append(prompt)
+            release.wait(5)
+            return "Shared AI advice"
+        
+        sys.modules['gcloud_ai'] = types.SimpleNamespace(generate_text=slow_generate_text, is_available=lambda: True)
+        career_advisor.advice_cache.clear()
+        
+        def ask():
+            advisor = WebCareerAdvisor()
+            advisor.process_user_data({'name': 'Flight', 'skills': 'Rust', 'interests': 'caches'})
+            advisor.generate_advice()
+        
+        threads = [threading.Thread(target=ask) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        release.set()
+        time.sleep(0.2)
+        stats = career_advisor.advice_cache.stats()
+        if len(calls) == 1 and stats['coalesced'] == 7 and stats['size'] == 1:
+            print("✅ Single-flight: 8 concurrent misses, 1 generation: SUCCESS")
+        else:
+            print(f"❌ {len(calls)} generations for one key: {stats}: FAILED")
+            return False
+        
+        # The prompt and key ignore the name and skill order; the name is added locally
+        advisor = WebCareerAdvisor()
+        advisor.process_user_data({'name': 'Other Person', 'skills': 'rust ', 'interests': 'Caches!'})
+        prompt, key = advisor._advice_request()
+        same_key = key == WebCareerAdvisor()._advice_request({'name': 'Flight', 'skills': ['Rust'], 'interests': 'caches'})[1]
+        if same_key and 'Other' not in prompt and advisor.generate_advice() == "Other Person: Shared AI advice" and len(calls) == 1:
+            print("✅ Name-free prompt shared across names, personalized locally: SUCCESS")
+        else:
+            print(f"❌ Name leaked into the prompt or key: {prompt!r} {key!r}: FAILED")
+            return False
+        
+        from advice_prompt import personalize
+        first_key = advisor._advice_request({'skills': ['SQL', 'Python', 'python'], 'interests': 'I love data and AI'})[1]
+        second_key = advisor._advice_request({'skills': ['python', 'sql'], 'interests': 'AI, data'})[1]
+        if first_key == second_key and personalize("You got this.", "Ada") == "Ada, you got this.":
+            print("✅ Skill order and interest wording collapse to one key: SUCCESS")
+        else:
+            print(f"❌ Equivalent profiles keyed apart: {first_key} {second_key}: FAILED")
+            return False
+        
+        metrics = app.test_client().get('/api/cache/metrics').get_json()
+        if metrics['advice']['generations'] == 1 and 'hit_ratio' in metrics['advice']:
+            print("✅ Advice counters served at /api/cache/metrics: SUCCESS")
+            return True
+        print("❌ /api/cache/metrics missing advice counters: FAILED")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Advice cache error: {e}")
+        return False
+    finally:
+        release.set()
+        if real is not None:
+            sys.modules['gcloud_ai'] = real
+        else:
+            sys.modules.pop('gcloud_ai', None)
+
+def test_advice_corpus():
+    """Test the precomputed, memory-mapped advice corpus and its generator"""
+    print("\n📦 Testing Advice Corpus...")
+    
+    import asyncio
+    import os
+    import tempfile
+    import time
+    import types
+    import career_advisor
+    from advice_corpus import AdviceCorpus, advice_corpus, catalog_signatures, generate_corpus, write_corpus
+    from advice_prompt import PROMPT_VERSION
+    
+    real = sys.modules.get('gcloud_ai')
+    previous = advice_corpus.path
+    try:
+        advisor = WebCareerAdvisor()
+        matcher = advisor._get_matcher()
+        signatures = catalog_signatures(advisor.career_data, matcher)
+        
+        in_flight = [0, 0]
+        
+        async def fake_generate(prompt, *args):
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return f"You can do it ({len(prompt)})."
+        
+        start = time.monotonic()
+        entries = asyncio.run(generate_corpus(signatures[:10], fake_generate, rate=50, concurrency=3))
+        elapsed = time.monotonic() - start
+        if len(entries) == 10 and in_flight[1] <= 3 and elapsed >= 9 / 50:
+            print(f"✅ Generated 10 entries, {in_flight[1]} in flight, {elapsed:.2f}s at 50/s: SUCCESS")
+        else:
+            print(f"❌ Generation not bounded: {len(entries)} entries, {in_flight[1]} in flight, {elapsed:.2f}s: FAILED")
+            return False
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'advice.bin')
+            write_corpus(path, entries, advisor.catalog.version)
+            corpus = AdviceCorpus(path)
+            if all(corpus.get(key) == text for key, text in entries.items()) and corpus.get(signatures[-1]) is None:
+                print(f"✅ {len(corpus)} entries read back through mmap: SUCCESS")
+            else:
+                print("❌ Corpus lookups wrong: FAILED")
+                return False
+            
+            stale = os.path.join(tmp, 'stale.bin')
+            with open(path, 'rb') as fh:
+                data = bytearray(fh.read())
+            data[6:8] = (PROMPT_VERSION + 1).to_bytes(2, 'little')
+            with open(stale, 'wb') as fh:
+                fh.write(data)
+            if len(AdviceCorpus(stale)) == 0 and len(AdviceCorpus(os.path.join(tmp, 'missing.bin'))) == 0:
+                print("✅ Corpus for another prompt version ignored: SUCCESS")
+            else:
+                print("❌ Stale corpus loaded: FAILED")
+                return False
+            
+            # generate_advice answers from the corpus without calling the model
+            calls = []
+            sys.modules['gcloud_ai'] = types.SimpleNamespace(
+                generate_text=lambda prompt, *args: calls.append(prompt) or "Live advice", is_available=lambda: True)
+            career_advisor.advice_cache.clear()
+            advice_corpus.load(path)
+            skills = advisor.career_data['tech']['careers'][0]['skills']
+            advisor.process_user_data({'name': 'Ada', 'skills': ', '.join(reversed(skills)), 'interests': 'tech'})
+            expected = entries.get(advisor._advice_request()[1])
+            advice = advisor.generate_advice()
+            if expected and advice == 'Ada, ' + expected[0].lower() + expected[1:] and not calls:
+                print("✅ generate_advice served from the corpus, no model call: SUCCESS")
+            else:
+                print(f"❌ Corpus not consulted: {advice!r}, {len(calls)} calls: FAILED")
+                return False
+            advice_corpus.load(previous)
+            
+            # The CLI works under the default background SDK import
+            import precompute_advice
+            gcloud_ai = real
+            google = types.ModuleType('google')
+            google.cloud = types.ModuleType('google.cloud')
+            sdk = types.ModuleType('google.cloud.aiplatform')
+            
+            def slow_import(name):
+                # The real SDK takes seconds to import
+                if name != 'aiplatform':
+                    raise AttributeError(name)
+                time.sleep(0.2)
+                return sdk
+            google.cloud.__getattr__ = slow_import
+            saved = (gcloud_ai.aiplatform, gcloud_ai.GCLOUD_AVAILABLE, gcloud_ai._sdk_state,
+                     gcloud_ai.VERTEX_SDK_IMPORT, gcloud_ai.VERTEX_PREDICT_URL, gcloud_ai.generate_text_async)
+            saved_env = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+            saved_argv = sys.argv
+            sys.modules['gcloud_ai'] = gcloud_ai
+            sys.modules.update({'google': google, 'google.cloud': google.cloud})
+            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = os.path.join(tmp, 'credentials.json')
+            gcloud_ai.aiplatform, gcloud_ai.GCLOUD_AVAILABLE, gcloud_ai._sdk_state = None, False, 'unloaded'
+            gcloud_ai.VERTEX_SDK_IMPORT, gcloud_ai.VERTEX_PREDICT_URL = 'background', None
+            gcloud_ai.generate_text_async = fake_generate
+            built = os.path.join(tmp, 'built.bin')
+            sys.argv = ['precompute_advice.py', '--output', built, '--rate', '0']
+            try:
+                status = precompute_advice.main()
+            finally:
+                sys.argv = saved_argv
+                (gcloud_ai.aiplatform, gcloud_ai.GCLOUD_AVAILABLE, gcloud_ai._sdk_state,
+                 gcloud_ai.VERTEX_SDK_IMPORT, gcloud_ai.VERTEX_PREDICT_URL, gcloud_ai.generate_text_async) = saved
+                for name in ('google', 'google.cloud'):
+                    sys.modules.pop(name, None)
+                if saved_env is None:
+                    os.environ.pop('GOOGLE_APPLICATION_CREDENTIALS', None)
+                else:
+                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = saved_env
+            if status == 0 and len(AdviceCorpus(built)) == len(signatures):
+                print(f"✅ precompute_advice.py built {len(signatures)} entries via the SDK: SUCCESS")
+            else:
+                print(f"❌ precompute_advice.py exited {status} without building the corpus: FAILED")
+                return False
+        
+        metrics = app.test_client().get('/api/cache/metrics').get_json()
+        if 'entries' in metrics['advice_corpus']:
+            print("✅ Corpus counters served at /api/cache/metrics: SUCCESS")
+            return True
+        print("❌ /api/cache/metrics missing corpus counters: FAILED")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Advice corpus error: {e}")
+        return False
+    finally:
+        advice_corpus.load(previous)
+        if real is not None:
+            sys.modules['gcloud_ai'] = real
+        else:
+            sys.modules.pop('gcloud_ai', None)
+
 def run_all_tests():
     """Run all tests"""
     print("🚀 Starting Career & Skills Advisor Tests")
@@ -150,8 +1820,28 @@ def run_all_tests():
     
     tests = [
         ("Career Advisor Logic", test_career_advisor_logic),
+        ("Career Matching", test_career_matching),
+        ("Career Catalog", test_catalog),
+        ("Batch Scoring", test_batch_scoring),
+        ("Advice Timeout", test_advice_timeout),
+        ("Vertex Client Pool", test_vertex_client_pool),
+        ("Request Coalescer", test_request_coalescer),
+        ("Circuit Breaker", test_circuit_breaker),
         ("Flask Routes", test_flask_routes), 
-        ("Static Files", test_static_files)
+        ("Batch API", test_batch_api),
+        ("Result Store", test_result_store),
+        ("Page Cache", test_page_cache),
+        ("Static Files", test_static_files),
+        ("Asset Pipeline", test_asset_pipeline),
+        ("Async Mode", test_async_mode),
+        ("Stage Metrics", test_stage_metrics),
+        ("Request Profiler", test_request_profiler),
+        ("App Factory", test_app_factory),
+        ("Cold Start", test_cold_start),
+        ("Analysis Memo", test_analysis_memo),
+        ("Advice Cache", test_advice_cache),
+        ("Advice Corpus", test_advice_corpus),
+        ("Streamed Advice", test_streamed_advice)
     ]
     
     passed = 0